@@ -0,0 +1,4 @@
+import logging
+
+# per-request logs of the http client would dominate the measurements
+logging.getLogger('httpx').setLevel(logging.WARNING)
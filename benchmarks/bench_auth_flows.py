@@ -0,0 +1,98 @@
+'''
+end-to-end login and confirm_signup time of AuthService against emulated latencies
+
+    python -m benchmarks.bench_auth_flows [iterations] [upstream_ms] [cache_ms]
+
+- concurrent: AuthService, independent steps side by side
+- sequential: the same steps one after the other (the previous flows)
+
+every upstream call costs `upstream_ms` and every cache round trip `cache_ms`,
+login fetches the user profile.
+'''
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List
+from src.domain.auth.model.auth_model import SignupDTO, LoginDTO
+from src.domain.auth.service.auth_service import AuthService
+from src.infra.cache.memory_cache_adapter import MemoryCacheAdapter
+from src.config.conf import LOCAL_REGION
+from testing.stand_in import ServiceApiStandIn
+from .bench_cache_backends import RoundTripCounter, auth_upstream
+from .util import summarize, report
+
+
+FLOWS = ['confirm_signup', 'login']
+
+
+class SequentialAuthService(AuthService):
+    '''
+    login and confirm_signup one step at a time
+    '''
+
+    async def confirm_signup(self, host: str, token):
+        user = await self.cache.get(token)
+        await self.cache.mdelete([token, user['email']])
+        auth_res = await self.req.simple_post(f'{host}/v1/signup', json={
+            'region': LOCAL_REGION,
+            'email': user['email'],
+            'password': user['password'],
+        })
+        await self.cache_auth_res(str(auth_res['user_id']), auth_res)
+        auth_res = self.apply_token(auth_res)
+        return {'auth': self.filter_auth_res(auth_res)}
+
+    async def login(self, auth_host: str, user_host: str, body: LoginDTO):
+        auth_res = await self.req.simple_post(f'{auth_host}/v1/login', json=body.dict())
+        user_id = auth_res['user_id']
+        await self.cache_auth_res(str(user_id), auth_res)
+        user_res = await self.req.simple_get(f'{user_host}/v1/users/{user_id}/profile')
+        auth_res = self.apply_token(auth_res)
+        return {'auth': self.filter_auth_res(auth_res), 'user': user_res}
+
+
+def upstream(method: str, url: str, body: Any):
+    if url.endswith('/profile'):
+        return {'user_id': int(url.split('/')[-2]), 'name': 'user'}
+    return auth_upstream(method, url, body)
+
+
+async def replay(cls, iterations: int, upstream_latency: float, cache_latency: float) -> (Dict):
+    cache = RoundTripCounter(MemoryCacheAdapter(max_size=100000), cache_latency)
+    service = cls(ServiceApiStandIn(upstream, upstream_latency), cache, login_user_profile=True)
+    samples: Dict[str, List[float]] = {flow: [] for flow in FLOWS}
+
+    async def measure(flow: str, call):
+        before = time.perf_counter()
+        await call
+        samples[flow].append(time.perf_counter() - before)
+
+    for i in range(iterations):
+        email = f'user-{i}@example.com'
+        password = 'secret'
+        # signup itself is unchanged, it only sets up the token
+        await service.signup('auth', SignupDTO(email=email, password=password, confirm_password=password))
+        await measure('confirm_signup', service.confirm_signup('auth', f'token:{email}'))
+        await measure('login', service.login('auth', 'user', LoginDTO(email=email, password=password)))
+
+    return {flow: summarize(samples[flow]) for flow in FLOWS}
+
+
+async def main(iterations: int, upstream_latency: float, cache_latency: float):
+    results = {
+        'sequential': await replay(SequentialAuthService, iterations, upstream_latency, cache_latency),
+        'concurrent': await replay(AuthService, iterations, upstream_latency, cache_latency),
+    }
+    report('auth_flows', {
+        'iterations': iterations,
+        'upstream_ms': upstream_latency * 1000,
+        'cache_ms': cache_latency * 1000,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    upstream_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    cache_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    asyncio.run(main(iterations, upstream_ms / 1000, cache_ms / 1000))
@@ -0,0 +1,148 @@
+'''
+replays the AuthService cache access patterns against every ICache backend
+
+    python -m benchmarks.bench_cache_backends [iterations] [latency_ms] [redis_url]
+
+backends:
+- dynamodb:          DynamoDbCacheAdapter over the blocking DynamoDB stand-in
+- memory:            MemoryCacheAdapter (in-process only)
+- tiered_dynamodb:   TieredCacheAdapter, L1 in front of the DynamoDB stand-in
+- redis:             RedisCacheAdapter over fakeredis, or a real server with `redis_url`
+
+every emulated round trip costs `latency_ms`, so the numbers compare round trips
+rather than the speed of the in-process stand-ins.
+'''
+import asyncio
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from fakeredis import aioredis
+from redis.asyncio import Redis
+from src.domain.cache import ICache
+from src.domain.auth.model.auth_model import SignupDTO, LoginDTO, NewTokenDTO
+from src.domain.auth.service.auth_service import AuthService
+from src.infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
+from src.infra.cache.memory_cache_adapter import MemoryCacheAdapter
+from src.infra.cache.redis_cache_adapter import RedisCacheAdapter
+from src.infra.cache.tiered_cache_adapter import TieredCacheAdapter
+from testing.stand_in import DynamoDbStandIn, ServiceApiStandIn, dynamodb_resource
+from .util import summarize, report
+
+
+FLOWS = ['signup', 'confirm_signup', 'login', 'refresh', 'logout']
+
+
+class RoundTripCounter:
+    '''
+    every ICache call of the redis adapter is one pipelined round trip,
+    count it and emulate its `latency`
+    '''
+
+    def __init__(self, cache: ICache, latency: float = 0):
+        self.cache = cache
+        self.latency = latency
+        self.round_trips = 0
+
+    def __getattr__(self, name: str) -> (Any):
+        fn = getattr(self.cache, name)
+
+        async def call(*args, **kwargs):
+            self.round_trips += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await fn(*args, **kwargs)
+        return call
+
+
+def auth_upstream(method: str, url: str, body: Any):
+    if url.endswith('/v1/signup/email'):
+        return {'token': f'token:{body["email"]}'}
+
+    email = body['email']
+    user_id = int(email.split('@')[0].split('-')[1])
+    return {'user_id': user_id, 'region': 'jp', 'email': email, 'created_at': 0}
+
+
+def backends(latency: float, redis_url: str = None) -> (Dict[str, Callable[[], Tuple[ICache, Callable[[], int]]]]):
+    '''
+    name -> factory of (cache, round trip counter)
+    '''
+    def dynamodb():
+        client = DynamoDbStandIn(latency=latency)
+        return DynamoDbCacheAdapter(dynamodb_resource(client), table='cache'), lambda: client.round_trips
+
+    def memory():
+        return MemoryCacheAdapter(max_size=100000), lambda: 0
+
+    def tiered_dynamodb():
+        client = DynamoDbStandIn(latency=latency)
+        l2 = DynamoDbCacheAdapter(dynamodb_resource(client), table='cache')
+        return TieredCacheAdapter(l2, MemoryCacheAdapter(max_size=100000)), lambda: client.round_trips
+
+    def redis():
+        if redis_url:
+            proxy = RoundTripCounter(RedisCacheAdapter(Redis.from_url(redis_url, decode_responses=True)))
+        else:
+            proxy = RoundTripCounter(RedisCacheAdapter(aioredis.FakeRedis(decode_responses=True)), latency)
+        return proxy, lambda: proxy.round_trips
+
+    return {
+        'dynamodb': dynamodb,
+        'memory': memory,
+        'tiered_dynamodb': tiered_dynamodb,
+        'redis': redis,
+    }
+
+
+async def replay(cache: ICache, round_trips: Callable[[], int], iterations: int) -> (Dict):
+    service = AuthService(ServiceApiStandIn(auth_upstream), cache)
+    samples: Dict[str, List[float]] = {flow: [] for flow in FLOWS}
+    trips: Dict[str, int] = {flow: 0 for flow in FLOWS}
+
+    async def measure(flow: str, call):
+        before_trips = round_trips()
+        before = time.perf_counter()
+        res = await call
+        samples[flow].append(time.perf_counter() - before)
+        trips[flow] += round_trips() - before_trips
+        return res
+
+    for i in range(iterations):
+        email = f'user-{i}@example.com'
+        password = 'secret'
+        await measure('signup', service.signup('auth', SignupDTO(
+            email=email, password=password, confirm_password=password)))
+        await measure('confirm_signup', service.confirm_signup('auth', f'token:{email}'))
+        await measure('login', service.login('auth', 'user', LoginDTO(email=email, password=password)))
+        # the client keeps the refresh token, read it outside of the measured flows
+        user = await cache.get(str(i))
+        await measure('refresh', service.get_new_token_pair(NewTokenDTO(
+            user_id=i, refresh_token=user['refresh_token'])))
+        await measure('logout', service.logout(i))
+
+    results = {}
+    for flow in FLOWS:
+        result = summarize(samples[flow])
+        result.update({'round_trips_per_op': round(trips[flow] / iterations, 2)})
+        results[flow] = result
+    return results
+
+
+async def main(iterations: int, latency: float, redis_url: str = None):
+    results = {}
+    for name, factory in backends(latency, redis_url).items():
+        cache, round_trips = factory()
+        results[name] = await replay(cache, round_trips, iterations)
+
+    report('cache_backends', {
+        'iterations': iterations,
+        'latency_ms': latency * 1000,
+        'backends': results,
+    })
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2
+    redis_url = sys.argv[3] if len(sys.argv) > 3 else None
+    asyncio.run(main(iterations, latency_ms / 1000, redis_url))
@@ -0,0 +1,151 @@
+'''
+Lambda cold start: init (`import main`), peak memory and the first invocation,
+each run in a fresh interpreter, plus a `-X importtime` breakdown per module
+
+    python -m benchmarks.bench_cold_start [runs] [tree] [budget]
+
+`tree` measures another checkout, e.g. the tree before a change:
+    git worktree add /tmp/before <commit> && python -m benchmarks.bench_cold_start 10 /tmp/before
+
+`budget`: a json file of limits (default benchmarks/cold_start_budget.json),
+the script exits with 1 when the p50 of a measurement exceeds its limit
+'''
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from .util import summarize, report
+
+
+BUDGET = os.path.join(os.path.dirname(__file__), 'cold_start_budget.json')
+
+# `-X importtime` self time is summed per group, the first matching prefix wins
+GROUPS = [
+    'src.config', 'src.router', 'src.domain', 'src.infra', 'src.app', 'src',
+    'boto3', 'botocore', 'fastapi', 'starlette', 'pydantic', 'email_validator',
+    'mangum', 'httpx', 'httpcore', 'jwt', 'redis', 'orjson',
+]
+# cumulative time of every submodule of these packages, and of these modules
+SUBMODULES_OF = ['src.config.', 'src.router.v1.']
+MODULES = ['main', 'mangum', 'fastapi', 'pydantic', 'boto3', 'botocore', 'httpx']
+
+
+# runs inside the fresh interpreter, prints the timings in secs
+PROBE = '''
+import json, time
+before = time.perf_counter()
+import main
+init = time.perf_counter() - before
+
+event = {
+    'resource': '/gateway/{term}', 'path': '/gateway/yolo', 'httpMethod': 'GET',
+    'headers': {'host': 'localhost'}, 'multiValueHeaders': {'host': ['localhost']},
+    'queryStringParameters': None, 'multiValueQueryStringParameters': None,
+    'pathParameters': {'term': 'yolo'}, 'requestContext': {'resourcePath': '/gateway/{term}',
+    'httpMethod': 'GET', 'path': '/gateway/yolo', 'stage': 'test', 'identity': {'sourceIp': '127.0.0.1'}},
+    'body': None, 'isBase64Encoded': False,
+}
+before = time.perf_counter()
+res = main.handler(event, None)
+first = time.perf_counter() - before
+assert res['statusCode'] == 200, res
+
+import resource
+peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'init': init, 'first_request': first, 'peak_rss_mb': peak_rss_kb / 1024}))
+'''
+
+
+def probe(tree: str, importtime: bool = False) -> (Tuple[Dict[str, float], str]):
+    '''
+    return the probe's timings and its stderr (the importtime log)
+    '''
+    env = dict(os.environ)
+    env.setdefault('TESTING', 'ci')
+    env.setdefault('AWS_DEFAULT_REGION', 'ap-northeast-1')
+    env.pop('STAGE', None)
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE]
+    res = subprocess.run(args, cwd=tree, env=env, check=True, capture_output=True, text=True)
+    return json.loads(res.stdout.strip().splitlines()[-1]), res.stderr
+
+
+def group_of(module: str) -> (str):
+    for group in GROUPS:
+        if module == group or module.startswith(group + '.'):
+            return group
+    return 'other'
+
+
+def import_breakdown(log: str) -> (Dict):
+    '''
+    `import time: self [us] | cumulative | imported package` -> ms per group and per module
+    '''
+    groups = defaultdict(float)
+    modules = {}
+    for line in log.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        groups[group_of(module)] += int(self_us) / 1000
+        if module in MODULES or any(module.startswith(p) for p in SUBMODULES_OF):
+            modules[module] = round(int(cumulative_us) / 1000, 1)
+
+    return {
+        'groups_ms': {k: round(v, 1) for k, v in sorted(groups.items(), key=lambda kv: -kv[1])},
+        'modules_ms': dict(sorted(modules.items(), key=lambda kv: -kv[1])),
+    }
+
+
+def over_budget(results: Dict, budget: Dict) -> (List[str]):
+    '''
+    budget: {'init_ms', 'first_request_ms', 'peak_rss_mb', 'groups_ms': {group: ms}}
+    '''
+    exceeded = []
+    for key, measured in (('init_ms', results['init']['p50_ms']),
+                          ('first_request_ms', results['first_request']['p50_ms']),
+                          ('peak_rss_mb', results['peak_rss_mb'])):
+        if key in budget and measured > budget[key]:
+            exceeded.append(f'{key}: {measured} > {budget[key]}')
+
+    for group, limit in budget.get('groups_ms', {}).items():
+        measured = results['imports']['groups_ms'].get(group, 0)
+        if measured > limit:
+            exceeded.append(f'groups_ms.{group}: {measured} > {limit}')
+    return exceeded
+
+
+def main(runs: int, tree: str, budget_file: str = BUDGET) -> (int):
+    samples: Dict[str, List[float]] = {'init': [], 'first_request': [], 'peak_rss_mb': []}
+    # the first run warms the OS file cache of the .pyc files
+    probe(tree)
+    for _ in range(runs):
+        timings, _ = probe(tree)
+        for k, v in timings.items():
+            samples[k].append(v)
+    # importtime slows the imports down, it runs apart from the timed runs
+    _, importtime_log = probe(tree, importtime=True)
+
+    results = {'tree': os.path.abspath(tree), 'runs': runs}
+    results.update({k: summarize(samples[k]) for k in ('init', 'first_request')})
+    results['peak_rss_mb'] = round(max(samples['peak_rss_mb']), 1)
+    results['imports'] = import_breakdown(importtime_log)
+
+    exceeded = []
+    if budget_file and os.path.exists(budget_file):
+        with open(budget_file) as f:
+            budget = json.load(f)
+        exceeded = over_budget(results, budget)
+        results['budget'] = {'file': budget_file, 'exceeded': exceeded}
+
+    report('cold_start', results)
+    return 1 if exceeded else 0
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    tree = sys.argv[2] if len(sys.argv) > 2 else '.'
+    budget_file = sys.argv[3] if len(sys.argv) > 3 else BUDGET
+    sys.exit(main(runs, tree, budget_file))
@@ -0,0 +1,48 @@
+'''
+concurrent cache reads: boto3 called on the event loop vs DynamoDbCacheAdapter's bounded executor,
+against a local DynamoDB stand-in with an emulated round trip
+
+    python -m benchmarks.bench_dynamodb_cache [requests] [concurrency] [latency_ms]
+'''
+import asyncio
+import sys
+import time
+from src.infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
+from testing.stand_in import DynamoDbStandIn, dynamodb_resource
+from .util import Stopwatch, summarize, report
+
+
+class BlockingDynamoDbCache(DynamoDbCacheAdapter):
+    # the behavior before the executor: boto3 runs on the event loop
+    async def run(self, op, **kwargs):
+        return getattr(self.client, op)(**kwargs)
+
+
+async def run(cache: DynamoDbCacheAdapter, requests: int, concurrency: int):
+    samples = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            before = time.perf_counter()
+            await cache.get(f'user:{i % 100}')
+            samples.append(time.perf_counter() - before)
+
+    with Stopwatch() as sw:
+        await asyncio.gather(*[one(i) for i in range(requests)])
+    return summarize(samples, sw.elapsed)
+
+
+async def main(requests: int, concurrency: int, latency: float):
+    results = {}
+    for name, cls in (('blocking', BlockingDynamoDbCache), ('executor', DynamoDbCacheAdapter)):
+        resource = dynamodb_resource(DynamoDbStandIn(latency=latency))
+        results[name] = await run(cls(resource, table='cache'), requests, concurrency)
+    report('dynamodb_cache', results)
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.005
+    asyncio.run(main(requests, concurrency, latency))
@@ -0,0 +1,55 @@
+'''
+per-call httpx.AsyncClient vs the shared AsyncHttpClientPool, against a local upstream stand-in
+
+    python -m benchmarks.bench_http_client [requests] [concurrency]
+'''
+import asyncio
+import sys
+import time
+import httpx
+from src.app.template.service_response import ServiceApiResponse
+from src.infra.client.async_http_client_pool import AsyncHttpClientPool
+from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from testing.stand_in import UpstreamStandIn
+from .util import Stopwatch, summarize, report
+
+
+async def per_call_client(url: str):
+    # the behavior before the shared pool: a new client (and connection) per request
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url)
+        return ServiceApiResponse.parse(response)
+
+
+async def run(call, url: str, requests: int, concurrency: int):
+    samples = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            before = time.perf_counter()
+            await call(f'{url}/v1/users/{i}/profile')
+            samples.append(time.perf_counter() - before)
+
+    with Stopwatch() as sw:
+        await asyncio.gather(*[one(i) for i in range(requests)])
+    return summarize(samples, sw.elapsed)
+
+
+async def main(requests: int, concurrency: int):
+    with UpstreamStandIn() as upstream:
+        results = {}
+        results['per_call_client'] = await run(per_call_client, upstream.url, requests, concurrency)
+
+        pool = AsyncHttpClientPool()
+        adapter = AsyncServiceApiAdapter(pool)
+        results['shared_pool'] = await run(adapter.get, upstream.url, requests, concurrency)
+        await pool.aclose()
+
+    report('http_client', results)
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(requests, concurrency))
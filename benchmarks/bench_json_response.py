@@ -0,0 +1,73 @@
+'''
+rendering the {code, msg, data} envelope: starlette's JSONResponse (stdlib json) vs FastJSONResponse,
+over SearchMentorProfileListVO and ReservationListVO payloads,
+as plain dicts and as pydantic models (stdlib needs jsonable_encoder first)
+
+    python -m benchmarks.bench_json_response [items] [iterations]
+'''
+import sys
+import time
+from typing import Callable, Dict
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from src.config.constant import BookingStatus, ProfessionCategory, RoleType
+from src.domain.search.model.search_model import SearchMentorProfileListVO
+from src.domain.user.model.reservation_model import ReservationListVO
+from src.infra.util import json_util
+from src.router.res.response import FastJSONResponse, res_err_format
+from .util import Stopwatch, summarize, report
+
+
+def profession(i: int) -> (Dict):
+    return {'id': i, 'category': ProfessionCategory.EXPERTISE, 'subject': f'subject {i}', 'metadata': {'desc': 'd' * 40}}
+
+
+def search_mentors(items: int) -> (SearchMentorProfileListVO):
+    return SearchMentorProfileListVO(next_id=items, mentors=[{
+        'user_id': i, 'name': f'mentor {i}', 'avator': 'https://cdn.example.com/a.png', 'timezone': 9,
+        'industry': {**profession(i), 'category': ProfessionCategory.INDUSTRY},
+        'position': 'engineer', 'company': 'company', 'linkedin_profile': 'https://linkedin.com/in/x',
+        'personal_statement': 'p' * 200, 'about': 'a' * 600, 'seniority_level': 'senior',
+        'expertises': [profession(j) for j in range(5)], 'updated_at': 1700000000, 'views': i,
+    } for i in range(items)])
+
+
+def reservations(items: int) -> (ReservationListVO):
+    return ReservationListVO(next_id=items, reservations=[{
+        'id': i, 'schedule_id': i, 'my_status': BookingStatus.ACCEPT,
+        'start_datetime': 1700000000, 'end_datetime': 1700003600, 'message': 'm' * 100,
+        'participant': {'user_id': i, 'role': RoleType.MENTEE, 'name': f'user {i}', 'avator': None,
+                        'position': 'engineer', 'company': 'company', 'industry': profession(i),
+                        'status': BookingStatus.PENDING},
+    } for i in range(items)])
+
+
+def run(render: Callable[[], bytes], iterations: int) -> (Dict):
+    samples = []
+    with Stopwatch() as sw:
+        for _ in range(iterations):
+            before = time.perf_counter()
+            render()
+            samples.append(time.perf_counter() - before)
+    result = summarize(samples, sw.elapsed)
+    result.update({'bytes': len(render())})
+    return result
+
+
+def main(items: int, iterations: int):
+    results = {'serializer': 'orjson' if json_util.orjson is not None else 'json'}
+    for name, model in (('search_mentors', search_mentors(items)), ('reservations', reservations(items))):
+        as_dict = jsonable_encoder(model)
+        results[name] = {
+            'stdlib_dict': run(lambda: JSONResponse(res_err_format(as_dict, 'ok', '0')).body, iterations),
+            'fast_dict': run(lambda: FastJSONResponse(res_err_format(as_dict, 'ok', '0')).body, iterations),
+            'stdlib_model': run(lambda: JSONResponse(res_err_format(jsonable_encoder(model), 'ok', '0')).body, iterations),
+            'fast_model': run(lambda: FastJSONResponse(res_err_format(model, 'ok', '0')).body, iterations),
+        }
+    report('json_response', results)
+
+
+if __name__ == '__main__':
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    main(items, iterations)
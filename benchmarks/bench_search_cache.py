@@ -0,0 +1,111 @@
+'''
+mentor search pages under a skewed (zipf-like) query distribution
+
+    python -m benchmarks.bench_search_cache [requests] [distinct_queries] [upstream_ms] [ttl_secs]
+
+the same query is sent with its filters shuffled and repeated, as clients do;
+- no_cache:  every request calls the search service
+- raw_key:   pages cached under the query as sent
+- canonical: pages cached under the canonical query (SearchService)
+'''
+import asyncio
+import random
+import sys
+import time
+from typing import Any, Dict, List
+from src.config.constant import SortingBy, Sorting
+from src.domain.search.model.search_model import SearchMentorProfileDTO
+from src.domain.search.search_service import SearchService, FILTERS
+from testing.stand_in import ServiceApiStandIn
+from .util import summarize, report
+
+
+SKILLS = ['python', 'go', 'java', 'rust', 'sql', 'aws', 'k8s', 'react']
+TOPICS = ['career', 'interview', 'startup', 'management', 'salary']
+
+
+def queries(n: int, rnd: random.Random) -> (List[Dict[str, Any]]):
+    distinct = []
+    for _ in range(n):
+        distinct.append({
+            'filter_skills': rnd.sample(SKILLS, rnd.randint(1, 3)),
+            'filter_topics': rnd.sample(TOPICS, rnd.randint(0, 2)),
+            'next_id': rnd.choice([None, None, None, 20, 40]),
+        })
+    return distinct
+
+
+def variant(q: Dict[str, Any], rnd: random.Random) -> (SearchMentorProfileDTO):
+    # the same query, its filters in another order, sometimes repeated
+    skills = q['filter_skills'] + rnd.sample(q['filter_skills'], rnd.randint(0, 1))
+    rnd.shuffle(skills)
+    topics = list(q['filter_topics'])
+    rnd.shuffle(topics)
+    return SearchMentorProfileDTO(filter_skills=skills, filter_topics=topics or None,
+                                  sorting_by=SortingBy.UPDATED_TIME, sorting=Sorting.DESC,
+                                  next_id=q['next_id'])
+
+
+def raw_params(query: SearchMentorProfileDTO):
+    params = []
+    for name in FILTERS:
+        params.extend((name, v) for v in getattr(query, name) or [])
+    return params + [('sorting_by', query.sorting_by.value), ('sorting', str(query.sorting.value)),
+                     ('next_id', str(query.next_id))]
+
+
+async def replay(service: SearchService, workload: List[SearchMentorProfileDTO], raw: bool = False) -> (Dict):
+    samples = []
+    before_all = time.perf_counter()
+    for query in workload:
+        before = time.perf_counter()
+        if raw:
+            # cache under the query as sent
+            key = service.page_key(raw_params(query))
+            found, _, _ = service.pages.lookup(key)
+            if found:
+                service.hits += 1
+            else:
+                service.misses += 1
+                body = await service.req.simple_get('search/v1/mentors', params=raw_params(query))
+                service.pages.put(key, body, expire_at=time.time() + service.ttl)
+        else:
+            await service.get_page_body(query)
+        samples.append(time.perf_counter() - before)
+
+    result = summarize(samples, time.perf_counter() - before_all)
+    result.update(service.stats())
+    return result
+
+
+async def main(requests: int, distinct_queries: int, upstream_latency: float, ttl: float):
+    rnd = random.Random(42)
+    distinct = queries(distinct_queries, rnd)
+    # zipf-like: the k-th most popular query is picked with weight 1/k
+    weights = [1 / (k + 1) for k in range(distinct_queries)]
+    workload = [variant(q, rnd) for q in rnd.choices(distinct, weights=weights, k=requests)]
+
+    def new_service(page_ttl: float) -> (SearchService):
+        upstream = ServiceApiStandIn(lambda method, url, params: {'mentors': [], 'next_id': None},
+                                     upstream_latency)
+        return SearchService(upstream, 'search', ttl=page_ttl)
+
+    report('search_cache', {
+        'requests': requests,
+        'distinct_queries': distinct_queries,
+        'upstream_ms': upstream_latency * 1000,
+        'ttl_secs': ttl,
+        'results': {
+            'no_cache': await replay(new_service(0), workload),
+            'raw_key': await replay(new_service(ttl), workload, raw=True),
+            'canonical': await replay(new_service(ttl), workload),
+        },
+    })
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    distinct_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    upstream_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    ttl_secs = float(sys.argv[4]) if len(sys.argv) > 4 else 30
+    asyncio.run(main(requests, distinct_queries, upstream_ms / 1000, ttl_secs))
@@ -0,0 +1,91 @@
+'''
+parsing a large upstream payload: the pydantic ServiceApiResponse (before) vs the lean one,
+retained/peak allocation (tracemalloc) and time of parse() + `.data`
+
+    python -m benchmarks.bench_service_response [mentors] [iterations]
+'''
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Union
+import httpx
+from pydantic import BaseModel
+from src.app.template.service_response import ServiceApiResponse
+from .util import summarize, report
+
+
+class PydanticServiceApiResponse(BaseModel):
+    # the behavior before: validated, body kept as bytes, str and dict
+    status_code: int = 200
+    headers: Dict = None
+    res_json: Dict = None
+    res_content: Any = None
+    res_text: str = None
+    data: Optional[Union[Dict, List, bool]] = None
+
+    @staticmethod
+    def parse(response: httpx.Response = None) -> 'PydanticServiceApiResponse':
+        parsed_data = response.json()
+        data = parsed_data.get('data', {})
+        return PydanticServiceApiResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            res_json=parsed_data,
+            res_content=response.content,
+            res_text=response.text,
+            data=data,
+        )
+
+
+def mentor_payload(mentors: int) -> (bytes):
+    mentor = {
+        'user_id': 1, 'name': 'mentor', 'location': 'Tokyo', 'personal_statement': 'x' * 400,
+        'about': 'y' * 800, 'seniority_level': 'senior', 'expertises': [{'id': i, 'subject': 's'} for i in range(10)],
+        'experiences': [{'id': i, 'category': 'work', 'metadata': {'desc': 'z' * 200}} for i in range(5)],
+    }
+    return json.dumps({'code': '0', 'msg': 'ok', 'data': {'mentors': [mentor] * mentors}}).encode()
+
+
+def new_response(content: bytes) -> (httpx.Response):
+    response = httpx.Response(200, content=content, headers={'content-type': 'application/json'})
+    response.read()
+    return response
+
+
+def measure(cls, content: bytes, iterations: int) -> (Dict):
+    samples = []
+    for _ in range(iterations):
+        response = new_response(content)
+        before = time.perf_counter()
+        cls.parse(response).data
+        samples.append(time.perf_counter() - before)
+
+    # held by the parsed response on top of the body bytes
+    response = new_response(content)
+    tracemalloc.start()
+    res = cls.parse(response)
+    res.data
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(samples)
+    result.update({
+        'retained_kb': round(retained / 1024, 1),
+        'peak_alloc_kb': round(peak / 1024, 1),
+    })
+    return result
+
+
+def main(mentors: int, iterations: int):
+    content = mentor_payload(mentors)
+    results = {'payload_kb': round(len(content) / 1024, 1)}
+    for name, cls in (('pydantic', PydanticServiceApiResponse), ('lean', ServiceApiResponse)):
+        results[name] = measure(cls, content, iterations)
+    report('service_response', results)
+
+
+if __name__ == '__main__':
+    mentors = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    main(mentors, iterations)
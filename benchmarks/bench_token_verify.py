@@ -0,0 +1,42 @@
+'''
+verify_token per request: PyJWT decode every time vs the verified-token cache,
+the same session token is checked over and over as on a protected route
+
+    python -m benchmarks.bench_token_verify [requests] [sessions]
+'''
+import asyncio
+import sys
+import time
+from src.router.req.authorization import gen_token, verify_token, verified_tokens
+from testing.stand_in import new_request
+from .util import Stopwatch, summarize, report
+
+
+async def run(requests: int, sessions: int, cached: bool):
+    verified_tokens.clear()
+    verified_tokens.max_size = sessions if cached else 0
+    tokens = [gen_token({'user_id': user_id, 'region': 'jp'}, ['region', 'user_id'])
+              for user_id in range(1, sessions + 1)]
+    reqs = [new_request(user_id, token) for user_id, token in enumerate(tokens, 1)]
+    samples = []
+    with Stopwatch() as sw:
+        for i in range(requests):
+            before = time.perf_counter()
+            await verify_token(reqs[i % sessions])
+            samples.append(time.perf_counter() - before)
+    return summarize(samples, sw.elapsed)
+
+
+async def main(requests: int, sessions: int):
+    max_size = verified_tokens.max_size
+    results = {}
+    for name, cached in (('decode', False), ('cached', True)):
+        results[name] = await run(requests, sessions, cached)
+    verified_tokens.max_size = max_size
+    report('token_verify', results)
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    asyncio.run(main(requests, sessions))
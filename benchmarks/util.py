@@ -0,0 +1,50 @@
+import json
+import sys
+import time
+from typing import Dict, List
+
+'''
+shared helpers of the benchmark scripts
+'''
+
+
+def percentile(samples: List[float], pct: float) -> (float):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(samples: List[float], elapsed: float = None) -> (Dict):
+    '''
+    samples: latency of each operation in secs
+    elapsed: wall time of the whole run in secs (defaults to the sum of samples)
+    '''
+    elapsed = elapsed if elapsed is not None else sum(samples)
+    count = len(samples)
+    return {
+        'count': count,
+        'ops_per_sec': round(count / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(samples) / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+class Stopwatch:
+    def __enter__(self) -> ('Stopwatch'):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(benchmark: str, results: Dict, out=sys.stdout):
+    '''
+    one JSON document per benchmark run, machine-readable
+    '''
+    out.write(json.dumps({'benchmark': benchmark, 'results': results}, indent=2))
+    out.write('\n')
@@ -15,10 +15,22 @@ from src.router.v1 import (
     search,
 )
 from src.config import exception
+from src.router.res.response import FastJSONResponse
+from src.config.conf import TIMING_ENABLED, SERVER_TIMING_HEADER, METRICS_ENDPOINT
+from src.config.service_client import (
+    service_client,
+    startup_service_client,
+    shutdown_service_client,
+)
+from src.config.cache import shutdown_cache
+from src.config.taxonomy import startup_taxonomy
+from src.config.prefetch import cancel_prefetch
+from src.infra.util.timing import TimingMiddleware, latencies
 
 STAGE = os.environ.get('STAGE')
 root_path = '/' if not STAGE else f'/{STAGE}'
-app = FastAPI(title='X-Career: BFF', root_path=root_path)
+app = FastAPI(title='X-Career: BFF', root_path=root_path,
+              default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,8 +38,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['Server-Timing'] if TIMING_ENABLED and SERVER_TIMING_HEADER else [],
 )
 
+# outermost: the route time includes CORS and the exception handlers
+if TIMING_ENABLED:
+    app.add_middleware(TimingMiddleware, server_timing=SERVER_TIMING_HEADER)
+
 router_v1 = APIRouter(prefix='/api/v1')
 router_v1.include_router(auth.router)
 router_v1.include_router(user.router)
@@ -39,6 +56,29 @@ app.include_router(router_v1)
 exception.include_app(app)
 
 
+@app.on_event('startup')
+async def startup():
+    await startup_service_client()
+    await startup_taxonomy()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await shutdown_service_client()
+    await shutdown_cache()
+
+
+# latency histograms of this container since its cold start, internal: off unless METRICS_ENDPOINT
+@app.get('/gateway/metrics')
+async def metrics():
+    if not METRICS_ENDPOINT:
+        raise HTTPException(status_code=404, detail='Not Found')
+    return {
+        'latency': latencies.snapshot(),
+        'upstream': service_client.stats(),
+    }
+
+
 @app.get('/gateway/{term}')
 async def info(term: str):
     if term != 'yolo':
@@ -47,4 +87,14 @@ async def info(term: str):
     return JSONResponse(content={'mention': 'You only live once.'})
 
 # Mangum Handler, this is so important
-handler = Mangum(app)
+# lifespan 'off': Mangum would run startup/shutdown on every invocation,
+# the shared http client pool should survive across invocations of a warm container
+mangum_handler = Mangum(app, lifespan='off')
+
+
+def handler(event, context):
+    try:
+        return mangum_handler(event, context)
+    finally:
+        # the container may be frozen once the response is returned
+        cancel_prefetch()
@@ -1,27 +1,52 @@
+import json
 from fastapi import status
-from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 import httpx
 
-class ClientResponse(BaseModel):
 
-    status_code: int = status.HTTP_200_OK
-    headers: Dict = None    # BaseModel 不支援 native dict, any
-    # response body
-    res_json: Dict = None   # BaseModel 不支援 native dict, any
-    res_content: Any = None # BaseModel 不支援 native dict, any
-    res_text: str = None
+class ClientResponse:
+    '''
+    an upstream response on the internal hop, no validation:
+    the body bytes are kept once, text and json are decoded on first access
+    '''
+    __slots__ = ('status_code', 'headers', 'res_content', '_text', '_json')
 
+    def __init__(self, status_code: int = status.HTTP_200_OK, headers: Any = None,
+                 res_content: bytes = b'', res_json: Optional[Dict] = None):
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {}
+        # response body
+        self.res_content = res_content
+        self._text = None
+        self._json = res_json
+
+    @property
+    def res_text(self) -> (str):
+        if self._text is None:
+            self._text = self.res_content.decode('utf-8') if self.res_content else ''
+        return self._text
+
+    @property
+    def res_json(self) -> (Dict):
+        return self.decode()._json
+
+    def decode(self) -> ('ClientResponse'):
+        '''
+        decode the json body once, a malformed body raises here;
+        the adapters call it eagerly so that the error surfaces inside their handling
+        '''
+        if self._json is None:
+            # json.loads reads the bytes directly, no intermediate str
+            self._json = json.loads(self.res_content) if self.res_content else {}
+        return self
 
     @staticmethod
     def parse(response: httpx.Response = None) -> 'ClientResponse':
-        if response:
-            return ClientResponse(
-                status_code=response.status_code,
-                headers=response.headers,
-                res_json=response.json(),
-                res_content=response.content,
-                res_text=response.text,
-            )
-
-        return None
\ No newline at end of file
+        if response is None:
+            return None
+
+        return ClientResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            res_content=response.content,
+        )
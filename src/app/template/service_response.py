@@ -1,32 +1,84 @@
+import copy
 import json
 from typing import Dict, Optional, List, Union
 from .client_response import ClientResponse
 import httpx
 
 
+_UNSET = object()
+
+
 class ServiceApiResponse(ClientResponse):
-    data: Optional[Union[Dict, List, bool]] = None
+    '''
+    `data`: the `data` of the service envelope {code, msg, data},
+    a json string in `data` is decoded as well
+    '''
+    __slots__ = ('_data',)
+
+    def __init__(self, *args, data: Optional[Union[Dict, List, bool]] = _UNSET, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._data = data
+
+    @property
+    def data(self) -> (Optional[Union[Dict, List, bool]]):
+        if self._data is _UNSET:
+            self._data = self.__parse_data()
+        return self._data
+
+    def __parse_data(self):
+        if not self.res_content:
+            return None
+
+        res_json = self.res_json
+        if not isinstance(res_json, dict):
+            return None
+
+        raw_data = res_json.get('data', {})
+        # Ensure `data` is parsed properly
+        if isinstance(raw_data, str):
+            try:
+                return json.loads(raw_data)
+            except json.JSONDecodeError:
+                return raw_data  # only a string
+        return raw_data
+
+    @property
+    def etag(self) -> (Optional[str]):
+        '''
+        the strong ETag (version) supplied upstream, if any
+        '''
+        etag = self.headers.get('etag', None)
+        if not etag or etag.startswith('W/'):
+            return None
+        return etag
+
+    def copy(self, deep: bool = False) -> ('ServiceApiResponse'):
+        '''
+        the body bytes are shared, a deep copy owns its decoded json/data
+        '''
+        res = ServiceApiResponse(
+            status_code=self.status_code,
+            headers=self.headers,
+            res_content=self.res_content,
+        )
+        res._json, res._data = self._json, self._data
+        if deep:
+            # one deepcopy keeps `data` pointing into `res_json`
+            decoded = self._data is not _UNSET
+            res._json, data = copy.deepcopy((self._json, self._data if decoded else None))
+            res._data = data if decoded else _UNSET
+        return res
 
     @staticmethod
     def parse(response: httpx.Response = None) -> 'ServiceApiResponse':
-        if response:
-            parsed_data = response.json()
-            raw_data = parsed_data.get('data', {})
-            # Ensure `data` is parsed properly
-            if isinstance(raw_data, str):
-                try:
-                    data = json.loads(raw_data)
-                except json.JSONDecodeError:
-                    data = raw_data  # only a string
-            else:
-                data = raw_data
-            return ServiceApiResponse(
-                status_code=response.status_code,
-                headers=response.headers,
-                res_json=parsed_data,
-                res_content=response.content,
-                res_text=response.text,
-                data=data
-            )
-
-        return None
+        '''
+        304 Not Modified (or 204) comes without a body, its `data` is None
+        '''
+        if response is None:
+            return None
+
+        return ServiceApiResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            res_content=response.content,
+        )
@@ -1,7 +1,33 @@
-# from .redis import redis
-# from ..infra.cache.redis_cache_adapter import RedisCacheAdapter
-# # gw_cache = RedisCacheAdapter(redis)
+from .conf import CACHE_BACKEND, CACHE_L1_SIZE, CACHE_L1_MAX_AGE, TIMING_ENABLED
+from ..infra.cache.memory_cache_adapter import MemoryCacheAdapter
+from ..infra.cache.tiered_cache_adapter import TieredCacheAdapter
+from ..infra.cache.timed_cache_adapter import TimedCacheAdapter
 
-from .dynamodb import dynamodb
-from ..infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
-gw_cache = DynamoDbCacheAdapter(dynamodb)
+
+# the backend is picked at deploy time by env `CACHE_BACKEND`
+if CACHE_BACKEND == 'redis':
+    from .redis import redis
+    from ..infra.cache.redis_cache_adapter import RedisCacheAdapter
+    gw_cache = RedisCacheAdapter(redis)
+
+else:
+    from .dynamodb import get_dynamodb
+    from ..infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
+    # the boto3 resource is created by the first cache call
+    gw_cache = DynamoDbCacheAdapter(get_dynamodb)
+
+# the backend calls only, L1 hits cost no round trip
+if TIMING_ENABLED:
+    gw_cache = TimedCacheAdapter(gw_cache, 'redis' if CACHE_BACKEND == 'redis' else 'dynamodb')
+
+if CACHE_L1_SIZE > 0:
+    gw_cache = TieredCacheAdapter(
+        gw_cache,
+        MemoryCacheAdapter(max_size=CACHE_L1_SIZE),
+        max_age=CACHE_L1_MAX_AGE,
+    )
+
+
+async def shutdown_cache():
+    if CACHE_BACKEND == 'redis':
+        await redis.close(close_connection_pool=True)
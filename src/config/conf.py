@@ -12,6 +12,8 @@ JWT_SECRET = os.getenv('JWT_SECRET', None)
 JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
 # TODO: default = 60 mins (3600 secs)
 TOKEN_EXPIRE_TIME = int(os.getenv('TOKEN_EXPIRE_TIME', 30))
+# verified tokens remembered per container until their 'exp', 0 disables it
+TOKEN_VERIFY_CACHE_SIZE = int(os.getenv('TOKEN_VERIFY_CACHE_SIZE', '4096'))
 
 BATCH = int(os.getenv('BATCH', '10'))
 
@@ -21,20 +23,110 @@ REQUEST_INTERVAL_TTL = int(os.getenv('REQUEST_INTERVAL_TTL', 8))
 SHORT_TERM_TTL = int(os.getenv('SHORT_TERM_TTL', 1800))
 # default = 3 days (3 * 86400 secs)
 LONG_TERM_TTL = int(os.getenv('LONG_TERM_TTL', 3 * 86400))
+# interests/industries/expertises are refreshed in the background after TAXONOMY_TTL secs
+TAXONOMY_TTL = int(os.getenv('TAXONOMY_TTL', 3600))
+
+# the home screen sections are fetched concurrently, each one within this deadline (secs)
+HOME_SECTION_DEADLINE = float(os.getenv('HOME_SECTION_DEADLINE', '1.5'))
+
+# mentor search result pages are cached in memory per canonical query, 0 = disabled
+SEARCH_PAGE_TTL = float(os.getenv('SEARCH_PAGE_TTL', '30'))
+SEARCH_PAGE_CACHE_SIZE = int(os.getenv('SEARCH_PAGE_CACHE_SIZE', '1024'))
+
+# opt-in background warm-up of the next pages and top profiles of a served page (constant PREFETCH items),
+# at most PREFETCH_CONCURRENCY calls at a time; on Lambda the calls still pending are cancelled
+# when the invocation returns, worth it on long-lived containers only
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'false').lower() == 'true'
+PREFETCH_CONCURRENCY = int(os.getenv('PREFETCH_CONCURRENCY', '2'))
+PREFETCH_MAX_PENDING = int(os.getenv('PREFETCH_MAX_PENDING', '32'))
+# opt-in: mentor profiles served or prefetched are cached in memory for secs, 0 = disabled;
+# an edit invalidates the container that handled it only, the others may serve the old profile until the ttl
+MENTOR_PROFILE_TTL = float(os.getenv('MENTOR_PROFILE_TTL', '0'))
+MENTOR_PROFILE_CACHE_SIZE = int(os.getenv('MENTOR_PROFILE_CACHE_SIZE', '1024'))
+
+# page size of the upstream cursor walked by the reservation export
+EXPORT_BATCH = int(os.getenv('EXPORT_BATCH', '50'))
 
 # filter auth response fields
 AUTH_RESPONSE_FIELDS = os.getenv('AUTH_RESPONSE_FIELDS', 'email,account_type,region,online')
 AUTH_RESPONSE_FIELDS = AUTH_RESPONSE_FIELDS.strip().split(',')
+# login fetches the user profile alongside the session cache write (user service API pending)
+LOGIN_USER_PROFILE = os.getenv('LOGIN_USER_PROFILE', 'false').lower() == 'true'
 
 
 # cache
+# backend: 'dynamodb' | 'redis'
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'dynamodb').lower()
+# opt-in in-process L1 in front of the cache backend, 0 = disabled;
+# the auth/session keys (logout, refresh-token rotation, throttles) may then be stale
+# on other containers for up to CACHE_L1_MAX_AGE
+CACHE_L1_SIZE = int(os.getenv('CACHE_L1_SIZE', '0'))
+# default = 10 secs, the longest a L1 entry can miss a write of another container
+CACHE_L1_MAX_AGE = int(os.getenv('CACHE_L1_MAX_AGE', '10'))
 # dynamodb
 TABLE_CACHE = os.getenv('TABLE_CACHE', 'dev_x_career_bff_cache')
+# boto3 is blocking, cache calls run on a bounded thread pool of this size
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv('DYNAMODB_MAX_POOL_CONNECTIONS', '20'))
+DYNAMODB_CONNECT_TIMEOUT = float(os.getenv('DYNAMODB_CONNECT_TIMEOUT', '2'))
+DYNAMODB_READ_TIMEOUT = float(os.getenv('DYNAMODB_READ_TIMEOUT', '3'))
+DYNAMODB_MAX_ATTEMPTS = int(os.getenv('DYNAMODB_MAX_ATTEMPTS', '3'))
 # redis
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
 REDIS_USER = os.getenv('REDIS_USERNAME', None)
 REDIS_PASS = os.getenv('REDIS_PASSWORD', None)
+REDIS_SSL = os.getenv('REDIS_SSL', 'false').lower() == 'true'
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '20'))
+# timeouts in secs
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '2'))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '2'))
+
+
+# http client (upstream services)
+# keep-alive pool size per upstream host
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '50'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+# default = 60 secs, idle keep-alive connections are closed after it
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60'))
+# timeouts in secs
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+HTTP_WRITE_TIMEOUT = float(os.getenv('HTTP_WRITE_TIMEOUT', '10'))
+HTTP_POOL_TIMEOUT = float(os.getenv('HTTP_POOL_TIMEOUT', '3'))
+# per upstream host, e.g. 'user.example.com=1:5,localhost:8010=1:3' (host[:port]=connect:read)
+HTTP_HOST_TIMEOUTS = os.getenv('HTTP_HOST_TIMEOUTS', '')
+# retries of idempotent GETs, bounded to a ratio of the requests per host
+HTTP_GET_RETRIES = int(os.getenv('HTTP_GET_RETRIES', '2'))
+HTTP_RETRY_BASE_DELAY = float(os.getenv('HTTP_RETRY_BASE_DELAY', '0.05'))
+HTTP_RETRY_BUDGET_RATIO = float(os.getenv('HTTP_RETRY_BUDGET_RATIO', '0.1'))
+HTTP_RETRY_BUDGET_RESERVE = int(os.getenv('HTTP_RETRY_BUDGET_RESERVE', '10'))
+# secs, one upstream call with all its retries ends within it (the function timeout is 30, 0 = unbounded)
+HTTP_CALL_DEADLINE = float(os.getenv('HTTP_CALL_DEADLINE', '12'))
+# consecutive failures opening the circuit of a host (0 disables), secs before a probe
+HTTP_BREAKER_FAILURES = int(os.getenv('HTTP_BREAKER_FAILURES', '5'))
+HTTP_BREAKER_RESET_TIMEOUT = float(os.getenv('HTTP_BREAKER_RESET_TIMEOUT', '10'))
+# hedged GETs: a second attempt after the host's p{percentile} latency, at most {ratio} extra requests
+HTTP_HEDGE = os.getenv('HTTP_HEDGE', 'false').lower() == 'true'
+HTTP_HEDGE_PERCENTILE = float(os.getenv('HTTP_HEDGE_PERCENTILE', '95'))
+HTTP_HEDGE_MIN_DELAY = float(os.getenv('HTTP_HEDGE_MIN_DELAY', '0.02'))
+HTTP_HEDGE_BUDGET_RATIO = float(os.getenv('HTTP_HEDGE_BUDGET_RATIO', '0.05'))
+# opt-in: pick the fastest healthy measured region host per service from the observed traffic, else `default`
+REGION_HOST_LATENCY_AWARE = os.getenv('REGION_HOST_LATENCY_AWARE', 'false').lower() == 'true'
+REGION_HOST_EWMA_ALPHA = float(os.getenv('REGION_HOST_EWMA_ALPHA', '0.2'))
+REGION_HOST_MAX_ERROR_RATE = float(os.getenv('REGION_HOST_MAX_ERROR_RATE', '0.5'))
+REGION_HOST_EJECT_FAILURES = int(os.getenv('REGION_HOST_EJECT_FAILURES', '5'))
+REGION_HOST_EJECT_SECS = float(os.getenv('REGION_HOST_EJECT_SECS', '30'))
+REGION_HOST_REFRESH_SECS = float(os.getenv('REGION_HOST_REFRESH_SECS', '60'))
+# HTTP/2 requires the optional package `h2` (pip install httpx[http2])
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'false').lower() == 'true'
+# concurrent identical GETs share one upstream call
+HTTP_SINGLE_FLIGHT = os.getenv('HTTP_SINGLE_FLIGHT', 'false').lower() == 'true'
+# per request timing of the upstream/cache/jwt calls in `Server-Timing`, latency histograms per route and dependency
+TIMING_ENABLED = os.getenv('TIMING_ENABLED', 'true').lower() == 'true'
+# opt-in: the `Server-Timing` header reveals the internal calls, the histograms are kept without it
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'false').lower() == 'true'
+# opt-in: GET /gateway/metrics (upstream hosts, breaker states, latency histograms), 404 otherwise
+METRICS_ENDPOINT = os.getenv('METRICS_ENDPOINT', 'false').lower() == 'true'
 
 
 # schedule
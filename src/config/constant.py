@@ -42,6 +42,11 @@ class ReservationListState(Enum):
     HISTORY = 'history'
 
 
+class ExportFormat(Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
 class SortingBy(Enum):
     UPDATED_TIME = 'updated_time'
     # VIEW = 'view'
@@ -1,13 +1,50 @@
+import threading
+from typing import Any
 import boto3
-from .conf import TESTING, AWS_PROFILE
+from botocore.config import Config
+from .conf import (
+    TESTING,
+    AWS_PROFILE,
+    DYNAMODB_MAX_POOL_CONNECTIONS,
+    DYNAMODB_CONNECT_TIMEOUT,
+    DYNAMODB_READ_TIMEOUT,
+    DYNAMODB_MAX_ATTEMPTS,
+)
 import logging
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
 
-if TESTING == 'local':
-    session = boto3.Session(profile_name=AWS_PROFILE)
-else:
-    session = boto3.Session()
-dynamodb = session.resource('dynamodb')
+dynamodb_options = {
+    # one keep-alive connection per cache worker thread
+    'max_pool_connections': DYNAMODB_MAX_POOL_CONNECTIONS,
+    'connect_timeout': DYNAMODB_CONNECT_TIMEOUT,
+    'read_timeout': DYNAMODB_READ_TIMEOUT,
+    'retries': {'max_attempts': DYNAMODB_MAX_ATTEMPTS, 'mode': 'standard'},
+}
+# `tcp_keepalive` is only supported by newer botocore
+if 'tcp_keepalive' in Config.OPTION_DEFAULTS:
+    dynamodb_options.update({'tcp_keepalive': True})
+dynamodb_config = Config(**dynamodb_options)
+
+
+__dynamodb = None
+__lock = threading.Lock()
+
+
+def get_dynamodb() -> (Any):
+    '''
+    the session and resource are created on first use (not on the cold-start import),
+    then shared by the process
+    '''
+    global __dynamodb
+    if __dynamodb is None:
+        with __lock:
+            if __dynamodb is None:
+                if TESTING == 'local':
+                    session = boto3.Session(profile_name=AWS_PROFILE)
+                else:
+                    session = boto3.Session()
+                __dynamodb = session.resource('dynamodb', config=dynamodb_config)
+    return __dynamodb
@@ -0,0 +1,12 @@
+from .conf import MENTOR_PROFILE_TTL, MENTOR_PROFILE_CACHE_SIZE
+from .service_client import service_client
+from ..domain.mentor.mentor_service import MentorService
+
+
+# shared by the mentor routes and the search prefetch
+mentor_service = MentorService(
+    service_client,
+    None,
+    profile_ttl=MENTOR_PROFILE_TTL,
+    profile_cache_size=MENTOR_PROFILE_CACHE_SIZE,
+)
@@ -0,0 +1,22 @@
+from .conf import PREFETCH_ENABLED, PREFETCH_CONCURRENCY, PREFETCH_MAX_PENDING
+from ..infra.util.prefetcher import Prefetcher
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+prefetcher = Prefetcher(PREFETCH_CONCURRENCY, PREFETCH_MAX_PENDING) if PREFETCH_ENABLED else None
+
+
+def cancel_prefetch():
+    '''
+    a frozen container would resume stale prefetches on its next invocation, drop them
+    '''
+    if prefetcher is None:
+        return
+    try:
+        cancelled = prefetcher.cancel()
+        if cancelled:
+            log.debug('prefetch cancelled, tasks:%s', cancelled)
+    except Exception as e:
+        log.error('cancel_prefetch fail, err:%s', e.__str__())
@@ -0,0 +1,27 @@
+from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio.connection import Connection, SSLConnection
+from .conf import (
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_USER,
+    REDIS_PASS,
+    REDIS_SSL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+)
+
+# no connection is opened until the first command
+redis_pool = ConnectionPool(
+    connection_class=SSLConnection if REDIS_SSL else Connection,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    username=REDIS_USER,
+    password=REDIS_PASS,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_keepalive=True,
+    decode_responses=True,
+)
+redis = Redis(connection_pool=redis_pool)
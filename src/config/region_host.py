@@ -1,5 +1,14 @@
 import os
 from fastapi import HTTPException, status
+from .conf import (
+    REGION_HOST_LATENCY_AWARE,
+    REGION_HOST_EWMA_ALPHA,
+    REGION_HOST_MAX_ERROR_RATE,
+    REGION_HOST_EJECT_FAILURES,
+    REGION_HOST_EJECT_SECS,
+    REGION_HOST_REFRESH_SECS,
+)
+from ..infra.client.region_host_registry import RegionHostRegistry
 import logging as log
 
 log.basicConfig(filemode='w', level=log.INFO)
@@ -33,26 +42,58 @@ class RegionException(HTTPException):
         self.status_code = status.HTTP_400_BAD_REQUEST
 
 
-def get_auth_region_host(region: str = 'default'):
-    try:
-        default_host = auth_region_hosts['default']
-        return auth_region_hosts.get(region, default_host)
-    except Exception as e:
-        log.error(f'get_auth_region_host fail, region:%s err:%s', region, e.__str__())
-        raise RegionException(region=region)
+def region_host_registry(service: str, hosts: dict):
+    return RegionHostRegistry(
+        service,
+        hosts,
+        alpha=REGION_HOST_EWMA_ALPHA,
+        max_error_rate=REGION_HOST_MAX_ERROR_RATE,
+        eject_failures=REGION_HOST_EJECT_FAILURES,
+        eject_secs=REGION_HOST_EJECT_SECS,
+        refresh_secs=REGION_HOST_REFRESH_SECS,
+    )
 
-def get_user_region_host(region: str = 'default'):
-    try:
-        default_host = user_region_hosts['default']
-        return user_region_hosts.get(region, default_host)
-    except Exception as e:
-        log.error(f'get_user_region_host fail, region:%s err:%s', region, e.__str__())
-        raise RegionException(region=region)
 
-def get_search_region_host(region: str = 'default'):
+auth_registry = region_host_registry('auth', auth_region_hosts)
+user_registry = region_host_registry('user', user_region_hosts)
+search_registry = region_host_registry('search', search_region_hosts)
+registries = (auth_registry, user_registry, search_registry)
+
+
+def observe_region_host(url: str, secs: float, ok: bool):
+    '''
+    fed by the service client with the outcome of every upstream call
+    '''
+    for registry in registries:
+        if registry.record(url, secs, ok):
+            return
+
+
+def __region_host(registry: RegionHostRegistry, region: str = None, latency_aware: bool = REGION_HOST_LATENCY_AWARE):
     try:
-        default_host = search_region_hosts['default']
-        return search_region_hosts.get(region, default_host)
+        if region is not None:
+            return registry.get(region)
+        if latency_aware:
+            return registry.pick()
+        return registry.default
     except Exception as e:
-        log.error(f'get_search_region_host fail, region:%s err:%s', region, e.__str__())
+        log.error(f'get_%s_region_host fail, region:%s err:%s', registry.service, region, e.__str__())
         raise RegionException(region=region)
+
+
+def get_auth_region_host(region: str = None):
+    '''
+    the host of `region`, else `default`: the auth flows span requests
+    (signup -> confirm_signup, reset password email -> reset) whose state
+    stays in one region, their host is never picked by latency
+    '''
+    return __region_host(auth_registry, region, latency_aware=False)
+
+def get_user_region_host(region: str = None):
+    '''
+    the host of `region`, or without region the fastest healthy one (REGION_HOST_LATENCY_AWARE)
+    '''
+    return __region_host(user_registry, region)
+
+def get_search_region_host(region: str = None):
+    return __region_host(search_registry, region)
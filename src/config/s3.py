@@ -1,7 +1,16 @@
+import threading
+from typing import Any
 import boto3
 
-s3_resource = boto3.resource('s3')
+__s3_resource = None
+__lock = threading.Lock()
 
 
-def get_s3_resource():
-    return s3_resource
+def get_s3_resource() -> (Any):
+    # created on first use, off the cold-start path
+    global __s3_resource
+    if __s3_resource is None:
+        with __lock:
+            if __s3_resource is None:
+                __s3_resource = boto3.resource('s3')
+    return __s3_resource
@@ -1,4 +1,107 @@
-import requests
+from .conf import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_WRITE_TIMEOUT,
+    HTTP_POOL_TIMEOUT,
+    HTTP2_ENABLED,
+    HTTP_SINGLE_FLIGHT,
+    HTTP_HOST_TIMEOUTS,
+    HTTP_GET_RETRIES,
+    HTTP_RETRY_BASE_DELAY,
+    HTTP_RETRY_BUDGET_RATIO,
+    HTTP_RETRY_BUDGET_RESERVE,
+    HTTP_CALL_DEADLINE,
+    HTTP_BREAKER_FAILURES,
+    HTTP_BREAKER_RESET_TIMEOUT,
+    HTTP_HEDGE,
+    HTTP_HEDGE_PERCENTILE,
+    HTTP_HEDGE_MIN_DELAY,
+    HTTP_HEDGE_BUDGET_RATIO,
+    TIMING_ENABLED,
+)
+from .region_host import auth_region_hosts, user_region_hosts, search_region_hosts, observe_region_host, registries
+from ..infra.client.async_http_client_pool import AsyncHttpClientPool
 from ..infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from ..infra.client.stream_proxy import StreamProxy
+from ..infra.util.timing import record
 
-service_client = AsyncServiceApiAdapter()
+
+
+def host_timeouts(conf: str):
+    '''
+    'host[:port]=connect:read,...' -> {host[:port]: (connect, read)}
+    '''
+    timeouts = {}
+    for item in filter(None, [i.strip() for i in conf.split(',')]):
+        host, timeout = item.rsplit('=', 1)
+        connect, read = timeout.split(':')
+        timeouts[host.strip()] = (float(connect), float(read))
+    return timeouts
+
+
+# one pool per process, reused by a warm Lambda container
+http_client_pool = AsyncHttpClientPool(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT,
+    write_timeout=HTTP_WRITE_TIMEOUT,
+    pool_timeout=HTTP_POOL_TIMEOUT,
+    http2=HTTP2_ENABLED,
+    host_timeouts=host_timeouts(HTTP_HOST_TIMEOUTS),
+)
+
+service_client = AsyncServiceApiAdapter(
+    http_client_pool,
+    single_flight=HTTP_SINGLE_FLIGHT,
+    get_retries=HTTP_GET_RETRIES,
+    retry_base_delay=HTTP_RETRY_BASE_DELAY,
+    retry_budget_ratio=HTTP_RETRY_BUDGET_RATIO,
+    retry_budget_reserve=HTTP_RETRY_BUDGET_RESERVE,
+    call_deadline=HTTP_CALL_DEADLINE,
+    breaker_failures=HTTP_BREAKER_FAILURES,
+    breaker_reset_timeout=HTTP_BREAKER_RESET_TIMEOUT,
+    hedge=HTTP_HEDGE,
+    hedge_percentile=HTTP_HEDGE_PERCENTILE,
+    hedge_min_delay=HTTP_HEDGE_MIN_DELAY,
+    hedge_budget_ratio=HTTP_HEDGE_BUDGET_RATIO,
+)
+service_client.add_listener(observe_region_host)
+
+
+def upstream_name(url: str) -> (str):
+    for registry in registries:
+        if registry.owns(url) is not None:
+            return f'upstream_{registry.service}'
+    return 'upstream'
+
+
+def observe_upstream_timing(url: str, secs: float, ok: bool):
+    # every attempt, retries and hedges included
+    record(upstream_name(url), secs)
+
+
+if TIMING_ENABLED:
+    service_client.add_listener(observe_upstream_timing)
+
+# pass-through routes share the pool, the breakers and the listeners
+stream_proxy = StreamProxy(http_client_pool, service_client)
+
+
+def region_hosts():
+    hosts = set()
+    for region_hosts in (auth_region_hosts, user_region_hosts, search_region_hosts):
+        hosts.update(region_hosts.values())
+    return hosts
+
+
+async def startup_service_client():
+    http_client_pool.open(region_hosts())
+
+
+async def shutdown_service_client():
+    await http_client_pool.aclose()
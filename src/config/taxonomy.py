@@ -0,0 +1,11 @@
+from .conf import TAXONOMY_TTL
+from .region_host import get_user_region_host
+from .service_client import service_client
+from ..domain.user.taxonomy_service import TaxonomyService
+
+# one taxonomy per process, reused by a warm Lambda container
+taxonomy_service = TaxonomyService(service_client, get_user_region_host, TAXONOMY_TTL)
+
+
+async def startup_taxonomy():
+    await taxonomy_service.load()
@@ -1,4 +1,5 @@
-from typing import Any, List, Dict, Tuple
+import asyncio
+from typing import Any, List, Dict, Optional, Tuple
 from ....router.req.authorization import (
     gen_token, 
     gen_refresh_token, 
@@ -18,10 +19,11 @@ log.basicConfig(filemode='w', level=log.INFO)
 
 
 class AuthService:
-    def __init__(self, req: IServiceApi, cache: ICache):
+    def __init__(self, req: IServiceApi, cache: ICache, login_user_profile: bool = LOGIN_USER_PROFILE):
         self.__cls_name = self.__class__.__name__
         self.req = req
         self.cache = cache
+        self.login_user_profile = login_user_profile
         self.ttl_secs = {'ttl_secs': REQUEST_INTERVAL_TTL}
 
 
@@ -51,9 +53,10 @@ class AuthService:
             raise TooManyRequestsException(msg='frequently request', data=self.ttl_secs)
         
         if data:
-            await self.cache.delete(email)
+            keys = [email]
             if 'token' in data:
-                await self.cache.delete(data.get('token'))
+                keys.append(data.get('token'))
+            await self.cache.mdelete(keys)
 
 
     # return status_code, msg, err
@@ -83,8 +86,10 @@ class AuthService:
             'email': email,
             'password': password,
         }
-        await self.cache.set(token, email_playload, ex=REQUEST_INTERVAL_TTL)
-        await self.cache.set(email, {'token':token}, ex=REQUEST_INTERVAL_TTL)
+        await self.cache.mset({
+            token: email_playload,
+            email: {'token':token},
+        }, ex=REQUEST_INTERVAL_TTL)
 
     '''
     email resend check
@@ -125,13 +130,14 @@ class AuthService:
         if not data or not 'email' in data or not 'password' in data:
             raise NotFoundException(msg='Email or password not found')
         
-        await self.cache.set(new_token, data, ex=REQUEST_INTERVAL_TTL)
-        await self.cache.delete(old_token)
-
         email = data.get('email')
-        data = await self.cache.get(email)
-        data.update({'token': new_token})
-        await self.cache.set(email, data, ex=REQUEST_INTERVAL_TTL)
+        email_data = await self.cache.get(email) or {}
+        email_data.update({'token': new_token})
+        await self.cache.mset({
+            new_token: data,
+            email: email_data,
+        }, ex=REQUEST_INTERVAL_TTL)
+        await self.cache.delete(old_token)
 
 
     # return status_code, msg, err
@@ -160,16 +166,27 @@ class AuthService:
     async def confirm_signup(self, host: str, token):
         # token: {email, passowrd}
         user = await self.cache.get(token)
-        await self.__verify_confirm_token(token, user)
+        keys = self.__verify_confirm_token(token, user)
 
         # 'registering': empty data
         email = user.get('email', None)
-        auth_res = await self.req.simple_post(f'{host}/v1/signup',
-                                        json={
-                                            'region': LOCAL_REGION,
-                                            'email': email,
-                                            'password': user['password'],
-                                        })
+        # the signup token is spent either way, its cleanup runs alongside the signup
+        cleanup, signup = await asyncio.gather(
+            self.cache.mdelete(keys),
+            self.req.simple_post(f'{host}/v1/signup',
+                                 json={
+                                     'region': LOCAL_REGION,
+                                     'email': email,
+                                     'password': user['password'],
+                                 }),
+            return_exceptions=True)
+        if isinstance(cleanup, BaseException):
+            log.error(f'{self.__cls_name}.confirm_signup:[cache cleanup fail],\
+                keys:%s, error:%s', keys, cleanup)
+        if isinstance(signup, BaseException):
+            raise signup
+
+        auth_res = signup
         # user_res = await self.req.simple_put(f'{user_host}/v1/mentors/mentor_profile/create',
         #                                 json={
         #                                     'region': body.region,
@@ -182,16 +199,20 @@ class AuthService:
         auth_res = self.filter_auth_res(auth_res)
         return {'auth': auth_res}
     
-    async def __verify_confirm_token(self, token: str, user: Dict):
+    def __verify_confirm_token(self, token: str, user: Dict) -> (List[str]):
+        '''
+        the cache keys to clean up once the token is verified
+        '''
         if not user or not 'email' in user:
             raise ClientException(msg='Invalid or expired token.')
 
         if user == {}:
             raise DuplicateUserException(msg='registering')
 
-        await self.cache.delete(token)
+        keys = [token]
         if 'email' in user:
-            await self.cache.delete(user.get('email'))
+            keys.append(user.get('email'))
+        return keys
 
 
     def __verify_confirmcode(self, code: str, user: Any):
@@ -268,14 +289,13 @@ class AuthService:
         auth_res = await self.__req_login(auth_host, body)
         user_id = auth_res.get('user_id')
 
-        # cache auth data
-        await self.cache_auth_res(str(user_id), auth_res)
+        # cache auth data and fetch the profile concurrently,
+        # a failed cache write fails the login, a failed profile fetch does not
+        _, user_res = await asyncio.gather(
+            self.cache_auth_res(str(user_id), auth_res),
+            self.__req_user_profile(user_host, user_id),
+        )
         auth_res = self.apply_token(auth_res)
-
-        # 育志看一下這 API
-        # user_res = await self.req.simple_get(f'{user_host}/v1/users/{user_id}/profile')
-        user_res = None
-
         auth_res = self.filter_auth_res(auth_res)
         return {
             'auth': auth_res,
@@ -288,6 +308,18 @@ class AuthService:
         if not auth_res or not 'user_id' in auth_res:
             raise UnauthorizedException(msg='Invalid user.')
         return auth_res
+
+    async def __req_user_profile(self, user_host: str, user_id: int) -> (Optional[Dict]):
+        # 育志看一下這 API
+        if not self.login_user_profile:
+            return None
+
+        try:
+            return await self.req.simple_get(f'{user_host}/v1/users/{user_id}/profile')
+        except Exception as e:
+            log.error(f'{self.__cls_name}.__req_user_profile:[request exception], \
+                host:%s, user_id:%s, error:%s', user_host, user_id, e)
+            return None
         
 
     async def cache_auth_res(self, user_id_key: str, auth_res: Dict):
@@ -424,20 +456,22 @@ class AuthService:
             raise TooManyRequestsException(msg='frequently request', data=self.ttl_secs)
         
         if data:
-            await self.cache.delete(f'reset_pw:{email}')
+            keys = [f'reset_pw:{email}']
             # 將用不到的 verify_token 刪除
             verify_token = data.get('token', None)
             if verify_token:
-                await self.cache.delete(verify_token)
+                keys.append(verify_token)
+            await self.cache.mdelete(keys)
 
 
     async def __cache_token_by_reset_password(self, verify_token: str, email: EmailStr):
-        await self.cache.set(f'reset_pw:{email}', {'token':verify_token}, REQUEST_INTERVAL_TTL)
-        await self.cache.set(verify_token, email, REQUEST_INTERVAL_TTL)
+        await self.cache.mset({
+            f'reset_pw:{email}': {'token':verify_token},
+            verify_token: email,
+        }, REQUEST_INTERVAL_TTL)
         
     async def __cache_remove_by_reset_password(self, verify_token: str, email: EmailStr):
-        await self.cache.delete(f'reset_pw:{email}')
-        await self.cache.delete(verify_token)
+        await self.cache.mdelete([f'reset_pw:{email}', verify_token])
         
 
     async def update_password(self, auth_host: str, user_id: int, body: UpdatePasswordDTO):
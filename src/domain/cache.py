@@ -16,6 +16,19 @@ class ICache(ABC):
     async def delete(self, key: str):
         pass
 
+    # return the found keys only
+    @abstractmethod
+    async def mget(self, keys: List[str], with_ttl: bool = False) -> (Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    async def mset(self, mapping: Dict[str, Any], ex: int = None) -> (bool):
+        pass
+
+    @abstractmethod
+    async def mdelete(self, keys: List[str]):
+        pass
+
     @abstractmethod
     async def smembers(self, key: str) -> (Optional[Set[Any]]):
         pass
@@ -1,18 +1,85 @@
+import time
+from typing import Optional
 import logging as log
 
 from src.config.constant import MENTOR_ROUTER_URL, USER_SERVICE_PREFIX, API_VERSION, MENTORS
 from src.domain.cache import ICache
+from ...app.template.service_response import ServiceApiResponse
 from ...infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from ...infra.cache.memory_cache_adapter import MemoryCacheAdapter
 
 log.basicConfig(filemode='w', level=log.INFO)
 
 
+def user_service_url(path: str) -> (str):
+    '''
+    e.g. 'mentors/1/profile' -> {MENTOR_ROUTER_URL}/user-service/api/v1/mentors/1/profile
+    '''
+    return f'{MENTOR_ROUTER_URL}{USER_SERVICE_PREFIX}{API_VERSION}{path.lstrip("/")}'
+
+
 class MentorService:
-    def __init__(self, service_api: AsyncServiceApiAdapter, cache: ICache):
+    def __init__(self,
+                 service_api: AsyncServiceApiAdapter,
+                 cache: ICache,
+                 profile_ttl: float = 0,
+                 profile_cache_size: int = 1024,
+                 ):
         self.__cls_name = self.__class__.__name__
         self.service_api: AsyncServiceApiAdapter = service_api
         self.cache = cache
+        # recently served or prefetched profiles, kept in memory for `profile_ttl` secs (0 = disabled)
+        self.profile_ttl = profile_ttl
+        self.profiles = MemoryCacheAdapter(max_size=profile_cache_size)
+        self.profile_hits = 0
+        # bumped by every invalidation, a fetch overlapping a profile write is not cached
+        self.__writes = 0
+
+    def __profile_url(self, user_id: int) -> (str):
+        return user_service_url(f'{MENTORS}/{user_id}/profile')
+
+    def __cached_profile(self, user_id: int) -> (Optional[ServiceApiResponse]):
+        if self.profile_ttl <= 0:
+            return None
+        found, res, _ = self.profiles.lookup(str(user_id))
+        return res if found else None
+
+    def __cache_profile(self, user_id: int, res: ServiceApiResponse, writes: int):
+        if writes != self.__writes:
+            return
+        # a 304 has no body to serve later
+        if self.profile_ttl > 0 and res is not None and res.status_code == 200:
+            self.profiles.put(str(user_id), res, expire_at=time.time() + self.profile_ttl)
+
+    async def get_mentor_profile(self, user_id: int, if_none_match: Optional[str] = None) -> (ServiceApiResponse):
+        '''
+        the client's If-None-Match is forwarded, a versioned upstream answers 304 without body;
+        a cached profile is shared, read-only
+        '''
+        cached = self.__cached_profile(user_id)
+        if cached is not None:
+            self.profile_hits += 1
+            return cached
+
+        headers = {'If-None-Match': if_none_match} if if_none_match else None
+        writes = self.__writes
+        res = await self.service_api.get(url=self.__profile_url(user_id), headers=headers)
+        self.__cache_profile(user_id, res, writes)
+        return res
+
+    def invalidate_profile(self, user_id: int):
+        '''
+        after the upstream write of the profile
+        '''
+        self.__writes += 1
+        self.profiles.invalidate(str(user_id))
 
-    async def get_mentor_profile(self, user_id: int):
-        req_url = MENTOR_ROUTER_URL + USER_SERVICE_PREFIX + API_VERSION+ MENTORS+'/' + str(user_id) + '/profile'
-        return self.service_api.get_with_statuscode(url=req_url)
+    async def warm_profile(self, user_id: int):
+        '''
+        fetch a profile into the cache unless it is there already
+        '''
+        if self.profile_ttl <= 0 or self.__cached_profile(user_id) is not None:
+            return
+        writes = self.__writes
+        res = await self.service_api.get(url=self.__profile_url(user_id))
+        self.__cache_profile(user_id, res, writes)
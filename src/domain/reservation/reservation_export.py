@@ -0,0 +1,128 @@
+import io
+import csv
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+from ...app.template.service_api import IServiceApi
+from ...config.constant import ExportFormat, ReservationListState
+from ...infra.util.json_util import dumps
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+CSV_COLUMNS = [
+    'id',
+    'schedule_id',
+    'participant_user_id',
+    'participant_role',
+    'participant_name',
+    'my_status',
+    'start_datetime',
+    'end_datetime',
+    'message',
+]
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv',
+}
+
+# (reservations, next_id)
+Page = Tuple[List[Dict], Optional[int]]
+
+
+def csv_row(reservation: Dict) -> (List[Any]):
+    participant = reservation.get('participant', None) or {}
+    return [
+        reservation.get('id', None),
+        reservation.get('schedule_id', None),
+        participant.get('user_id', None),
+        participant.get('role', None),
+        participant.get('name', None),
+        reservation.get('my_status', None),
+        reservation.get('start_datetime', None),
+        reservation.get('end_datetime', None),
+        reservation.get('message', None),
+    ]
+
+
+class ReservationExportService:
+    '''
+    a user's whole reservation list as NDJSON or CSV rows, the upstream `next_id`
+    cursor is walked server side one page at a time:
+    - only the page being written and the next one are held in memory
+    - the next page is fetched while the current one is written out
+    - a page failing after the first one aborts the stream, it never ends cleanly
+    '''
+
+    def __init__(self, req: IServiceApi, user_host: Union[str, Callable[[], str]], batch: int = 50):
+        self.__cls_name = self.__class__.__name__
+        self.req = req
+        # a fixed host or a resolver picking one per export
+        self.user_host = user_host
+        self.batch = batch
+
+    async def __page(self, user_host: str, user_id: int, state: ReservationListState,
+                     next_id: Optional[int] = None) -> (Page):
+        params = {'state': state.value, 'batch': self.batch}
+        if next_id is not None:
+            params['next_id'] = next_id
+        data = await self.req.simple_get(f'{user_host}/v1/users/{user_id}/reservations', params=params)
+        data = data or {}
+        return data.get('reservations', None) or [], data.get('next_id', None)
+
+    async def open(self, user_id: int, state: ReservationListState, fmt: ExportFormat) -> (AsyncIterator[bytes]):
+        '''
+        the first page is fetched here, so that its failure is still an http error;
+        the rows follow from the returned iterator
+        '''
+        user_host = self.user_host() if callable(self.user_host) else self.user_host
+        first = await self.__page(user_host, user_id, state)
+        rows = self.__ndjson if fmt == ExportFormat.NDJSON else self.__csv
+        return rows(self.__reservations(user_host, user_id, state, first))
+
+    async def __reservations(self, user_host: str, user_id: int, state: ReservationListState,
+                             page: Page) -> (AsyncIterator[Dict]):
+        upcoming: Optional[asyncio.Task] = None
+        try:
+            while True:
+                reservations, next_id = page
+                if next_id is not None:
+                    upcoming = asyncio.ensure_future(self.__page(user_host, user_id, state, next_id))
+
+                for reservation in reservations:
+                    yield reservation
+
+                if upcoming is None:
+                    return
+                page, upcoming = await upcoming, None
+
+        except Exception as e:
+            # the response has started: re-raised, the connection is aborted without
+            # the terminating chunk so that the client cannot take a truncated export as complete
+            log.error(f'{self.__cls_name}.__reservations:[export interrupted], user_id:%s, state:%s, err:%s',
+                      user_id, state, e.__str__())
+            raise
+
+        finally:
+            # the client went away or the export failed
+            if upcoming is not None:
+                upcoming.cancel()
+
+    async def __ndjson(self, reservations: AsyncIterator[Dict]) -> (AsyncIterator[bytes]):
+        async for reservation in reservations:
+            yield dumps(reservation) + b'\n'
+
+    async def __csv(self, reservations: AsyncIterator[Dict]) -> (AsyncIterator[bytes]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def line(row: List[Any]) -> (bytes):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            return buffer.getvalue().encode()
+
+        yield line(CSV_COLUMNS)
+        async for reservation in reservations:
+            yield line(csv_row(reservation))
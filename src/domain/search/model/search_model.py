@@ -10,15 +10,15 @@ log.basicConfig(filemode='w', level=log.INFO)
 
 
 class SearchMentorProfileDTO(BaseModel):
-    search_patterns: List[str]
-    filter_positions: List[str]
-    filter_skills: List[str]
-    filter_topics: List[str]
-    filter_expertises: List[str]
-    filter_industries: List[str]
-    sorting_by: SortingBy
-    sorting: Sorting
-    next_id: int
+    search_patterns: Optional[List[str]]
+    filter_positions: Optional[List[str]]
+    filter_skills: Optional[List[str]]
+    filter_topics: Optional[List[str]]
+    filter_expertises: Optional[List[str]]
+    filter_industries: Optional[List[str]]
+    sorting_by: SortingBy = SortingBy.UPDATED_TIME
+    sorting: Sorting = Sorting.DESC
+    next_id: Optional[int]
 
 
 class SearchMentorProfileVO(MentorProfileVO):
@@ -0,0 +1,143 @@
+import time
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from .model.search_model import SearchMentorProfileDTO
+from ...app.template.service_api import IServiceApi
+from ...infra.cache.memory_cache_adapter import MemoryCacheAdapter
+from ...infra.util.json_util import dumps
+from ...infra.util.prefetcher import Prefetcher
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+FILTERS = [
+    'search_patterns',
+    'filter_positions',
+    'filter_skills',
+    'filter_topics',
+    'filter_expertises',
+    'filter_industries',
+]
+
+
+def canonical_query(query: SearchMentorProfileDTO) -> (List[Tuple[str, str]]):
+    '''
+    the query params with every filter list stripped, deduplicated and sorted,
+    equivalent queries give the same params
+    '''
+    params = []
+    for name in FILTERS:
+        values = sorted(set(v.strip() for v in getattr(query, name) or [] if v and v.strip()))
+        params.extend((name, v) for v in values)
+    params.append(('sorting_by', query.sorting_by.value))
+    params.append(('sorting', str(query.sorting.value)))
+    if query.next_id is not None:
+        params.append(('next_id', str(query.next_id)))
+    return params
+
+
+# (serialized response, next_id, user_ids of the mentors)
+Page = Tuple[bytes, Optional[int], List[int]]
+
+
+class SearchService:
+    '''
+    mentor search result pages, kept in memory per container for `ttl` secs
+    under their canonical query so that popular filter combinations are served
+    without a call to the search service; `ttl` 0 disables the page cache.
+
+    with a `prefetcher`, serving a page warms the next `prefetch` pages
+    and the profiles of its first `prefetch` mentors in the background
+    '''
+
+    def __init__(self,
+                 req: IServiceApi,
+                 search_host: Union[str, Callable[[], str]],
+                 ttl: float = 30,
+                 max_size: int = 1024,
+                 prefetcher: Prefetcher = None,
+                 prefetch: int = 0,
+                 warm_profile: Callable[[int], Awaitable[Any]] = None,
+                 ):
+        self.__cls_name = self.__class__.__name__
+        self.req = req
+        # a fixed host or a resolver picking one per call
+        self.search_host = search_host
+        self.ttl = ttl
+        self.pages = MemoryCacheAdapter(max_size=max_size)
+        self.hits = 0
+        self.misses = 0
+        self.prefetcher = prefetcher if ttl > 0 else None
+        self.prefetch = prefetch
+        self.warm_profile = warm_profile
+
+    @staticmethod
+    def page_key(params: List[Tuple[str, str]]) -> (str):
+        digest = hashlib.sha256(repr(params).encode()).hexdigest()[:32]
+        return f'search:mentors:{digest}'
+
+    async def __fetch(self, params: List[Tuple[str, str]]) -> (Page):
+        search_host = self.search_host() if callable(self.search_host) else self.search_host
+        data = await self.req.simple_get(f'{search_host}/v1/mentors', params=params)
+        body = dumps({'code': '0', 'msg': 'ok', 'data': data})
+        data = data if isinstance(data, dict) else {}
+        user_ids = [m.get('user_id') for m in data.get('mentors', None) or [] if isinstance(m, dict)]
+        return body, data.get('next_id', None), [i for i in user_ids if i is not None]
+
+    async def __page(self, query: SearchMentorProfileDTO, foreground: bool = True) -> (Page):
+        params = canonical_query(query)
+        key = self.page_key(params)
+        found, page, _ = self.pages.lookup(key)
+        if found:
+            if foreground:
+                self.hits += 1
+            return page
+
+        if foreground:
+            self.misses += 1
+        page = await self.__fetch(params)
+        self.pages.put(key, page, expire_at=time.time() + self.ttl)
+        return page
+
+    async def get_page_body(self, query: SearchMentorProfileDTO) -> (bytes):
+        '''
+        the serialized {code, msg, data} response of the query's result page
+        '''
+        if self.ttl <= 0:
+            body, _, _ = await self.__fetch(canonical_query(query))
+            return body
+
+        page = await self.__page(query)
+        if self.prefetcher is not None and self.prefetch > 0:
+            self.__schedule_prefetch(query, page)
+        return page[0]
+
+    def __schedule_prefetch(self, query: SearchMentorProfileDTO, page: Page):
+        _, next_id, user_ids = page
+        if next_id is not None:
+            next_query = query.copy(update={'next_id': next_id})
+            self.prefetcher.schedule(self.page_key(canonical_query(next_query)),
+                                     lambda: self.__prefetch_pages(next_query))
+        if self.warm_profile is not None:
+            for user_id in user_ids[:self.prefetch]:
+                self.prefetcher.schedule(('mentor_profile', user_id),
+                                         lambda user_id=user_id: self.warm_profile(user_id))
+
+    async def __prefetch_pages(self, query: SearchMentorProfileDTO):
+        # cached pages of the chain cost a lookup, only the missing ones are fetched
+        for _ in range(self.prefetch):
+            _, next_id, _ = await self.__page(query, foreground=False)
+            if next_id is None:
+                return
+            query = query.copy(update={'next_id': next_id})
+
+    def stats(self) -> (Dict):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'pages': len(self.pages),
+            'evictions': self.pages.evictions,
+        }
@@ -0,0 +1,101 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Union
+from fastapi import HTTPException
+from ...app.template.service_api import IServiceApi
+from ...config.constant import ReservationListState
+from ...config.exception import *
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+Host = Union[str, Callable[[], str]]
+
+SECTIONS = ['profile', 'mentor_profile', 'reservations', 'schedule']
+
+# per section status
+OK = 'ok'
+TIMEOUT = 'timeout'
+ERROR = 'error'
+
+
+class HomeService:
+    '''
+    everything the app shows at launch in one call: the sections are fetched
+    concurrently, each one within its own deadline (secs). a slow or failing
+    section comes back without data and with its status, the others are kept.
+    '''
+
+    def __init__(self,
+                 req: IServiceApi,
+                 user_host: Host,
+                 search_host: Host,
+                 deadline: float = 1.5,
+                 deadlines: Dict[str, float] = None,
+                 batch: int = 10,
+                 ):
+        self.__cls_name = self.__class__.__name__
+        self.req = req
+        # fixed hosts or resolvers picking one per call
+        self.user_host = user_host
+        self.search_host = search_host
+        self.deadlines = {section: deadline for section in SECTIONS}
+        self.deadlines.update(deadlines or {})
+        self.batch = batch
+
+    @staticmethod
+    def __host(host: Host) -> (str):
+        return host() if callable(host) else host
+
+    def __requests(self, user_id: int, schedule_year: int) -> (Dict[str, Callable[[], Awaitable[Any]]]):
+        user_host = self.__host(self.user_host)
+        search_host = self.__host(self.search_host)
+        return {
+            'profile': lambda: self.req.simple_get(f'{user_host}/v1/users/{user_id}/profile'),
+            'mentor_profile': lambda: self.req.simple_get(f'{user_host}/v1/mentors/{user_id}/profile'),
+            'reservations': lambda: self.req.simple_get(
+                f'{user_host}/v1/users/{user_id}/reservations',
+                params={'state': ReservationListState.UPCOMING.value, 'batch': self.batch}),
+            'schedule': lambda: self.req.simple_get(
+                f'{search_host}/v1/mentors/{user_id}/schedule',
+                params={'year': schedule_year, 'batch': self.batch, 'next_id': 0}),
+        }
+
+    async def __section(self, user_id: int, section: str, request: Callable[[], Awaitable[Any]]) -> (Dict):
+        before = time.perf_counter()
+        result = {'status': OK, 'data': None}
+        try:
+            result['data'] = await asyncio.wait_for(request(), timeout=self.deadlines[section])
+
+        except asyncio.TimeoutError:
+            log.warning(f'{self.__cls_name}.__section:[deadline exceeded], user_id:%s, section:%s, deadline:%s',
+                        user_id, section, self.deadlines[section])
+            result['status'] = TIMEOUT
+
+        except HTTPException as e:
+            log.error(f'{self.__cls_name}.__section:[request exception], user_id:%s, section:%s, error:%s',
+                      user_id, section, e)
+            result.update({'status': ERROR, 'code': getattr(e, 'code', None)})
+
+        except Exception as e:
+            log.error(f'{self.__cls_name}.__section:[unexpected exception], user_id:%s, section:%s, error:%s',
+                      user_id, section, e.__str__())
+            result['status'] = ERROR
+
+        result['ms'] = round((time.perf_counter() - before) * 1000, 1)
+        return result
+
+    async def get_home(self, user_id: int, schedule_year: int = -1) -> (Dict[str, Dict]):
+        '''
+        section -> {status, data, ms[, code]}
+        '''
+        requests = self.__requests(user_id, schedule_year)
+        results = await asyncio.gather(*[
+            self.__section(user_id, section, requests[section]) for section in SECTIONS
+        ])
+        return dict(zip(SECTIONS, results))
+
+    @staticmethod
+    def complete(sections: Dict[str, Dict]) -> (bool):
+        return all(section['status'] == OK for section in sections.values())
@@ -0,0 +1,100 @@
+import time
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from ...app.template.service_api import IServiceApi
+from ...config.constant import InterestCategory, ProfessionCategory
+from ...config.exception import *
+from ...infra.util.json_util import dumps
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+TaxonomyCategory = Union[InterestCategory, ProfessionCategory]
+
+
+class TaxonomyService:
+    '''
+    near-static reference data (interests, industries, expertises) kept in memory per container:
+    - loaded once, on startup or by the first request of a category
+    - served with the response body serialized up front
+    - refreshed in the background once older than `ttl` secs, the old entry
+      is served meanwhile and kept when a refresh fails
+    '''
+
+    def __init__(self, req: IServiceApi, user_host: Union[str, Callable[[], str]], ttl: int = 3600):
+        self.__cls_name = self.__class__.__name__
+        self.req = req
+        # a fixed host or a resolver picking one per load
+        self.user_host = user_host
+        self.ttl = ttl
+        # category -> (data, body, loaded_at)
+        self.__entries: Dict[TaxonomyCategory, Tuple[Any, bytes, float]] = {}
+        self.__loading: Dict[TaxonomyCategory, asyncio.Task] = {}
+
+    def categories(self):
+        return list(InterestCategory) + list(ProfessionCategory)
+
+    def __url_params(self, category: TaxonomyCategory) -> (Tuple[str, Optional[Dict]]):
+        user_host = self.user_host() if callable(self.user_host) else self.user_host
+        if isinstance(category, InterestCategory):
+            return f'{user_host}/v1/users/interests', {'interest': category.value}
+        if category == ProfessionCategory.INDUSTRY:
+            return f'{user_host}/v1/users/industries', None
+        return f'{user_host}/v1/mentors/expertises', None
+
+    async def __fetch(self, category: TaxonomyCategory):
+        url, params = self.__url_params(category)
+        data = await self.req.simple_get(url, params)
+        body = dumps({'code': '0', 'msg': 'ok', 'data': data})
+        self.__entries[category] = (data, body, time.monotonic())
+
+    def __load(self, category: TaxonomyCategory) -> (asyncio.Task):
+        # one load per category at a time, tasks of a closed loop are dropped
+        task = self.__loading.get(category, None)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self.__fetch(category))
+            task.add_done_callback(lambda t: self.__loaded(category, t))
+            self.__loading[category] = task
+        return task
+
+    def __loaded(self, category: TaxonomyCategory, task: asyncio.Task):
+        if self.__loading.get(category, None) is task:
+            del self.__loading[category]
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f'{self.__cls_name}.__load fail, category:%s, err:%s',
+                      category, task.exception().__str__())
+
+    async def __entry(self, category: TaxonomyCategory) -> (Tuple[Any, bytes, float]):
+        entry = self.__entries.get(category, None)
+        if entry is None:
+            await asyncio.shield(self.__load(category))
+            return self.__entries[category]
+
+        if time.monotonic() - entry[2] >= self.ttl:
+            self.__load(category)
+        return entry
+
+    async def load(self):
+        '''
+        warm every category, a failed category is loaded again on its first request
+        '''
+        await asyncio.gather(*[self.__load(category) for category in self.categories()],
+                             return_exceptions=True)
+
+    async def get(self, category: TaxonomyCategory) -> (Any):
+        data, _, _ = await self.__entry(category)
+        return data
+
+    async def get_body(self, category: TaxonomyCategory) -> (bytes):
+        '''
+        the serialized {code, msg, data} response
+        '''
+        _, body, _ = await self.__entry(category)
+        return body
+
+    def invalidate(self, category: TaxonomyCategory = None):
+        if category is None:
+            self.__entries.clear()
+        else:
+            self.__entries.pop(category, None)
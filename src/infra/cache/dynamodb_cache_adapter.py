@@ -1,41 +1,127 @@
 import os
 import time
 import json
+import random
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, List, Set, Optional
+from typing import Any, Dict, List, Set, Optional
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+from botocore.exceptions import ClientError
 from ...domain.cache import ICache
-from ...config.dynamodb import dynamodb
-from ...config.conf import TABLE_CACHE
+from ...config.conf import TABLE_CACHE, DYNAMODB_MAX_POOL_CONNECTIONS, DYNAMODB_MAX_ATTEMPTS
 from ...config.exception import ServerException
 from ...infra.util.time_util import gen_ttl_secs
 import logging as log
 
 log.basicConfig(filemode='w', level=log.INFO)
 
+# DynamoDB limits per request
+BATCH_GET_SIZE = 100
+BATCH_WRITE_SIZE = 25
+# base delay in secs of the unprocessed-items retry
+BATCH_RETRY_DELAY = 0.05
+
+
+__executor: Optional[Executor] = None
+
+
+def cache_executor() -> (Executor):
+    '''
+    boto3 calls are blocking, they run on this bounded pool
+    instead of the event loop; shared by every adapter of the process
+    '''
+    global __executor
+    if __executor is None:
+        __executor = ThreadPoolExecutor(
+            max_workers=DYNAMODB_MAX_POOL_CONNECTIONS,
+            thread_name_prefix='dynamodb-cache',
+        )
+    return __executor
+
 
 class DynamoDbCacheAdapter(ICache):
-    def __init__(self, dynamodb: Any):
+    def __init__(self, dynamodb: Any, table: str = TABLE_CACHE, executor: Executor = None):
+        # a resource, or a function returning it on first use
         self.db = dynamodb
+        self.__client = None
+        self.table = table
+        self.executor = executor
+        self.serializer = TypeSerializer()
+        self.deserializer = TypeDeserializer()
         self.__cls_name = self.__class__.__name__
 
+    @property
+    def client(self) -> (Any):
+        # the low-level client is thread-safe (resources are not),
+        # it reuses the connection pool of the botocore config
+        if self.__client is None:
+            db = self.db() if callable(self.db) else self.db
+            self.__client = db.meta.client
+        return self.__client
+
     def is_json_obj(self, val: Any) -> (bool):
         return (val[0] == '{' and val[-1] == '}') or \
             (val[0] == '[' and val[-1] == ']')
 
+    def __call(self, op: str, **kwargs):
+        return getattr(self.client, op)(**kwargs)
+
+    async def run(self, op: str, **kwargs):
+        '''
+        the client operation `op` on the executor, the first one also
+        creates the boto3 session/client there, not on the event loop
+        '''
+        loop = asyncio.get_running_loop()
+        executor = self.executor or cache_executor()
+        return await loop.run_in_executor(executor, functools.partial(self.__call, op, **kwargs))
+
+    def serialize(self, item: Dict) -> (Dict):
+        return {k: self.serializer.serialize(v) for k, v in item.items()}
+
+    def deserialize(self, item: Dict) -> (Dict):
+        return {k: self.deserializer.deserialize(v) for k, v in item.items()}
+
+    def key(self, key: str) -> (Dict):
+        return {'cache_key': {'S': key}}
+
+    def item(self, key: str, val: Any, ex: int = None) -> (Dict):
+        val_type = type(val)
+        if val_type == dict or val_type == list:
+            val = json.dumps(val)
+
+        item = {
+            'cache_key': key,
+            'value': val,
+        }
+        if ex:
+            ttl = gen_ttl_secs(seconds=ex)
+            item.update({'ttl': ttl})
+        return self.serialize(item)
+
+    def parse(self, raw_item: Dict, with_ttl: bool = False):
+        result = None
+        if 'value' in raw_item:
+            item = self.deserialize(raw_item)
+            val = item['value']
+            if isinstance(val, str) and self.is_json_obj(val):
+                result = json.loads(val)
+                if with_ttl and 'ttl' in item:
+                    result.update({'ttl': int(item['ttl'])})
+            else:
+                result = val
+
+        return result
+
     async def get(self, key: str, with_ttl: bool = False):
         res = None
         result = None
         try:
-            table = self.db.Table(TABLE_CACHE)
-            res = table.get_item(Key={'cache_key': key})
-            if 'Item' in res and 'value' in res['Item']:
-                val = res['Item']['value']
-                if self.is_json_obj(val):
-                    result = json.loads(val)
-                    if with_ttl and 'ttl' in res['Item']:
-                        result.update({'ttl': res['Item']['ttl']})
-                else:
-                    result = val
+            res = await self.run('get_item',
+                                 TableName=self.table, Key=self.key(key))
+            if 'Item' in res:
+                result = self.parse(res['Item'], with_ttl)
 
             return result
 
@@ -49,20 +135,8 @@ class DynamoDbCacheAdapter(ICache):
         res = None
         result = False
         try:
-            val_type = type(val)
-            if val_type == dict or val_type == list:
-                val = json.dumps(val)
-
-            table = self.db.Table(TABLE_CACHE)
-            item = {
-                'cache_key': key,
-                'value': val,
-            }
-            if ex:
-                ttl = gen_ttl_secs(seconds=ex)
-                item.update({'ttl': ttl})
-
-            res = table.put_item(Item=item)
+            res = await self.run('put_item',
+                                 TableName=self.table, Item=self.item(key, val, ex))
             result = True
             return result
 
@@ -74,69 +148,199 @@ class DynamoDbCacheAdapter(ICache):
 
     async def delete(self, key: str):
         try:
-            table = self.db.Table(TABLE_CACHE)
-            table.delete_item(Key={'cache_key': key})
+            await self.run('delete_item',
+                           TableName=self.table, Key=self.key(key))
         except Exception as e:
-            log.error(f'cache {self.__cls_name}.set fail \
+            log.error(f'cache {self.__cls_name}.delete fail \
                     key:%s, err:%s',
                       key, e.__str__())
             raise ServerException(msg='d2_server_error')
 
-    async def smembers(self, key: str) -> (Optional[Set[Any]]):
-        values = await self.get(key)
+    async def __backoff(self, attempt: int):
+        # full jitter, none after the last attempt
+        if attempt >= DYNAMODB_MAX_ATTEMPTS:
+            return
+        await asyncio.sleep(random.uniform(0, BATCH_RETRY_DELAY * (2 ** attempt)))
+
+    async def __batch_get(self, keys: List[str]) -> (List[Dict]):
+        items = []
+        request = {self.table: {'Keys': [self.key(key) for key in keys]}}
+        for attempt in range(DYNAMODB_MAX_ATTEMPTS + 1):
+            res = await self.run('batch_get_item', RequestItems=request)
+            items.extend(res.get('Responses', {}).get(self.table, []))
+            request = res.get('UnprocessedKeys', None)
+            if not request:
+                return items
+            await self.__backoff(attempt)
+
+        raise ServerException(msg='unprocessed keys remain')
+
+    async def __batch_write(self, requests: List[Dict]):
+        request = {self.table: requests}
+        for attempt in range(DYNAMODB_MAX_ATTEMPTS + 1):
+            res = await self.run('batch_write_item', RequestItems=request)
+            request = res.get('UnprocessedItems', None)
+            if not request:
+                return
+            await self.__backoff(attempt)
+
+        raise ServerException(msg='unprocessed items remain')
+
+    def __chunks(self, items: List[Any], size: int) -> (List[List[Any]]):
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    async def mget(self, keys: List[str], with_ttl: bool = False) -> (Dict[str, Any]):
+        result = {}
+        try:
+            # a batch rejects duplicated keys
+            keys = list(dict.fromkeys(keys))
+            chunks = self.__chunks(keys, BATCH_GET_SIZE)
+            for items in await asyncio.gather(*[self.__batch_get(chunk) for chunk in chunks]):
+                for item in items:
+                    val = self.parse(item, with_ttl)
+                    if val is not None:
+                        result[item['cache_key']['S']] = val
+
+            return result
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.mget fail \
+                keys:%s, result:%s, err:%s',
+                      keys, result, e.__str__())
+            raise ServerException(msg='d2_server_error')
+
+    async def mset(self, mapping: Dict[str, Any], ex: int = None) -> (bool):
+        try:
+            requests = [{'PutRequest': {'Item': self.item(key, val, ex)}}
+                        for key, val in mapping.items()]
+            chunks = self.__chunks(requests, BATCH_WRITE_SIZE)
+            await asyncio.gather(*[self.__batch_write(chunk) for chunk in chunks])
+            return True
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.mset fail \
+                    mapping:%s, ex:%s, err:%s',
+                      mapping, ex, e.__str__())
+            raise ServerException(msg='d2_server_error')
+
+    async def mdelete(self, keys: List[str]):
+        try:
+            keys = list(dict.fromkeys(keys))
+            requests = [{'DeleteRequest': {'Key': self.key(key)}} for key in keys]
+            chunks = self.__chunks(requests, BATCH_WRITE_SIZE)
+            await asyncio.gather(*[self.__batch_write(chunk) for chunk in chunks])
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.mdelete fail \
+                    keys:%s, err:%s',
+                      keys, e.__str__())
+            raise ServerException(msg='d2_server_error')
+
+    def members(self, values: Any) -> (Optional[Set[str]]):
         if values is None:
             return None
 
-        if not isinstance(values, list):
-            raise ServerException(msg='invalid set-members type')
+        # string set (SS); json list written before the native set
+        if isinstance(values, set) or isinstance(values, list):
+            return set(str(v) for v in values)
 
-        return set(values)
+        raise ServerException(msg='invalid set-members type')
+
+    async def smembers(self, key: str) -> (Optional[Set[Any]]):
+        return self.members(await self.get(key))
 
     async def sismember(self, key: str, value: Any) -> (bool):
-        set_members = await self.smembers(key)
-        if set_members is None:
-            return False
+        res = None
+        try:
+            # DynamoDB cannot test membership on read, fetch the set attribute only
+            res = await self.run('get_item',
+                                 TableName=self.table, Key=self.key(key),
+                                 ProjectionExpression='#v',
+                                 ExpressionAttributeNames={'#v': 'value'})
+            if not 'Item' in res:
+                return False
 
-        return value in set_members
+            set_members = self.members(self.parse(res['Item']))
+            return set_members is not None and str(value) in set_members
+
+        except ServerException:
+            raise
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.sismember fail \
+                key:%s, value:%s, res:%s, err:%s',
+                      key, value, res, e.__str__())
+            raise ServerException(msg='d2_server_error')
 
     async def sadd(self, key: str, values: List[Any], ex: int = None) -> (int):
         if not isinstance(values, list):
             raise ServerException(
                 msg='invalid input type, values should be list')
 
-        set_values = set(values)
+        if not values:
+            return 0
 
-        update_count = 0
-        set_members = self.smembers(key)
-        if set_members is None:
-            await self.set(key, list(set_values), ex)
+        set_values = set(str(v) for v in values)
+        res = None
+        try:
+            update_expression = 'ADD #v :values'
+            names = {'#v': 'value'}
+            attr_values = {':values': {'SS': list(set_values)}}
+            if ex:
+                update_expression += ' SET #ttl = :ttl'
+                names.update({'#ttl': 'ttl'})
+                attr_values.update({':ttl': {'N': str(gen_ttl_secs(seconds=ex))}})
 
-        else:
-            new_set_members = set_members | set_values
-            await self.set(key, list(new_set_members), ex)
+            # a single atomic write, the old members tell how many are new
+            res = await self.run('update_item',
+                                 TableName=self.table, Key=self.key(key),
+                                 UpdateExpression=update_expression,
+                                 ExpressionAttributeNames=names,
+                                 ExpressionAttributeValues=attr_values,
+                                 ReturnValues='UPDATED_OLD')
+            old_members = self.members(self.parse(res.get('Attributes', {}))) or set()
+            return len(set_values - old_members)
 
-        update_count = len(values)
-        return update_count
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.sadd fail \
+                key:%s, values:%s, ex:%s, res:%s, err:%s',
+                      key, values, ex, res, e.__str__())
+            raise ServerException(msg='d2_server_error')
 
     async def srem(self, key: str, value: Any) -> (int):
-        update_count = 0
-        set_members = await self.smembers(key)
-        if set_members is None:
-            return update_count
+        res = None
+        try:
+            res = await self.run('update_item',
+                                 TableName=self.table, Key=self.key(key),
+                                 UpdateExpression='DELETE #v :values',
+                                 # never create an item without members
+                                 ConditionExpression='attribute_exists(cache_key)',
+                                 ExpressionAttributeNames={'#v': 'value'},
+                                 ExpressionAttributeValues={':values': {'SS': [str(value)]}},
+                                 ReturnValues='UPDATED_OLD')
+            old_members = self.members(self.parse(res.get('Attributes', {}))) or set()
+            return 1 if str(value) in old_members else 0
 
-        if value in set_members:
-            set_members.remove(value)
-            await self.set(key, list(set_members))
-            update_count = 1
-        else:
-            update_count = 0
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code', None) == 'ConditionalCheckFailedException':
+                return 0
 
-        return update_count
+            log.error(f'cache {self.__cls_name}.srem fail \
+                key:%s, value:%s, res:%s, err:%s',
+                      key, value, res, e.__str__())
+            raise ServerException(msg='d2_server_error')
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.srem fail \
+                key:%s, value:%s, res:%s, err:%s',
+                      key, value, res, e.__str__())
+            raise ServerException(msg='d2_server_error')
 
 
 def get_cache():
+    from ...config.dynamodb import get_dynamodb
     try:
-        cache = DynamoDbCacheAdapter(dynamodb)
+        cache = DynamoDbCacheAdapter(get_dynamodb)
         yield cache
     except Exception as e:
         log.error(e.__str__())
@@ -0,0 +1,159 @@
+import time
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Optional, Tuple
+from ...domain.cache import ICache
+from ...config.exception import ServerException
+from ...infra.util.time_util import gen_ttl_secs
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class MemoryCacheAdapter(ICache):
+    '''
+    bounded in-process LRU cache, entries expire at their `ttl` (epoch secs)
+    or an earlier local `expire_at`.
+    dict/list values are kept json-encoded, so every `get` returns a fresh copy
+    the same way a remote cache does.
+    '''
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        # key -> (value, ttl, expire_at)
+        self.__entries: OrderedDict[str, Tuple[Any, Optional[int], Optional[float]]] = OrderedDict()
+        self.evictions = 0
+        self.__cls_name = self.__class__.__name__
+
+    def __len__(self) -> (int):
+        return len(self.__entries)
+
+    def __expired(self, expire_at: Optional[float]) -> (bool):
+        return expire_at is not None and time.time() >= expire_at
+
+    def __encode(self, val: Any) -> (Any):
+        if isinstance(val, (dict, list)):
+            return json.dumps(val)
+        return val
+
+    def __decode(self, val: Any) -> (Any):
+        if isinstance(val, str) and val and \
+            ((val[0] == '{' and val[-1] == '}') or (val[0] == '[' and val[-1] == ']')):
+            return json.loads(val)
+        if isinstance(val, set):
+            return set(val)
+        return val
+
+    def __lookup(self, key: str) -> (Optional[Tuple[Any, Optional[int], Optional[float]]]):
+        entry = self.__entries.get(key, None)
+        if entry is None:
+            return None
+
+        if self.__expired(entry[2]):
+            del self.__entries[key]
+            return None
+
+        self.__entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, val: Any, ttl: Optional[int] = None, expire_at: Optional[float] = None):
+        '''
+        store with an absolute `ttl` (epoch secs) instead of `ex`,
+        `expire_at` drops the entry earlier than its ttl
+        '''
+        if expire_at is None or (ttl is not None and ttl < expire_at):
+            expire_at = ttl
+        self.__entries[key] = (self.__encode(val), ttl, expire_at)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key: str) -> (Tuple[bool, Any, Optional[int]]):
+        '''
+        return (found, value, ttl)
+        '''
+        entry = self.__lookup(key)
+        if entry is None:
+            return False, None, None
+        return True, self.__decode(entry[0]), entry[1]
+
+    def invalidate(self, key: str):
+        self.__entries.pop(key, None)
+
+    def clear(self):
+        self.__entries.clear()
+
+    async def get(self, key: str, with_ttl: bool = False):
+        found, result, ttl = self.lookup(key)
+        if found and with_ttl and ttl is not None and isinstance(result, dict):
+            result.update({'ttl': ttl})
+        return result
+
+    async def set(self, key: str, val: Any, ex: int = None):
+        self.put(key, val, gen_ttl_secs(seconds=ex) if ex else None)
+        return True
+
+    async def delete(self, key: str):
+        self.invalidate(key)
+
+    async def mget(self, keys: List[str], with_ttl: bool = False) -> (Dict[str, Any]):
+        result = {}
+        for key in keys:
+            val = await self.get(key, with_ttl)
+            if val is not None:
+                result[key] = val
+        return result
+
+    async def mset(self, mapping: Dict[str, Any], ex: int = None) -> (bool):
+        ttl = gen_ttl_secs(seconds=ex) if ex else None
+        for key, val in mapping.items():
+            self.put(key, val, ttl)
+        return True
+
+    async def mdelete(self, keys: List[str]):
+        for key in keys:
+            self.invalidate(key)
+
+    async def smembers(self, key: str) -> (Optional[Set[Any]]):
+        found, values, _ = self.lookup(key)
+        if not found or values is None:
+            return None
+
+        if not isinstance(values, set):
+            raise ServerException(msg='invalid set-members type')
+
+        return values
+
+    async def sismember(self, key: str, value: Any) -> (bool):
+        entry = self.__lookup(key)
+        if entry is None or not isinstance(entry[0], set):
+            return False
+
+        return str(value) in entry[0]
+
+    async def sadd(self, key: str, values: List[Any], ex: int = None) -> (int):
+        if not isinstance(values, list):
+            raise ServerException(
+                msg='invalid input type, values should be list')
+
+        entry = self.__lookup(key)
+        members = set(entry[0]) if entry and isinstance(entry[0], set) else set()
+        ttl = entry[1] if entry else None
+        expire_at = entry[2] if entry else None
+        if ex:
+            ttl = expire_at = gen_ttl_secs(seconds=ex)
+        # members are strings, as in the remote backends
+        new_values = set(str(v) for v in values) - members
+        self.put(key, members | new_values, ttl, expire_at)
+        return len(new_values)
+
+    async def srem(self, key: str, value: Any) -> (int):
+        entry = self.__lookup(key)
+        if entry is None or not isinstance(entry[0], set) or not str(value) in entry[0]:
+            return 0
+
+        members = set(entry[0])
+        members.remove(str(value))
+        self.put(key, members, entry[1], entry[2])
+        return 1
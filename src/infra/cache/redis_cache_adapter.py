@@ -0,0 +1,185 @@
+import json
+from typing import Any, Dict, List, Set, Optional
+from ...domain.cache import ICache
+from ...config.exception import ServerException
+from ...infra.util.time_util import current_seconds
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class RedisCacheAdapter(ICache):
+    '''
+    redis.asyncio client (decode_responses=True) backed cache,
+    keys expire natively and multi-key operations share one pipeline round trip
+    '''
+
+    def __init__(self, redis: Any):
+        self.redis = redis
+        self.__cls_name = self.__class__.__name__
+
+    def is_json_obj(self, val: Any) -> (bool):
+        return (val[0] == '{' and val[-1] == '}') or \
+            (val[0] == '[' and val[-1] == ']')
+
+    def encode(self, val: Any) -> (Any):
+        val_type = type(val)
+        if val_type == dict or val_type == list:
+            return json.dumps(val)
+        return val
+
+    def parse(self, val: Any, ttl_secs: int = None, with_ttl: bool = False):
+        if val is None or not isinstance(val, str) or not val or not self.is_json_obj(val):
+            return val
+
+        result = json.loads(val)
+        # TTL returns -1 without expiry, -2 for a missing key
+        if with_ttl and isinstance(result, dict) and ttl_secs is not None and ttl_secs >= 0:
+            result.update({'ttl': current_seconds() + ttl_secs})
+        return result
+
+    async def get(self, key: str, with_ttl: bool = False):
+        res = None
+        try:
+            if not with_ttl:
+                res = await self.redis.get(key)
+                return self.parse(res)
+
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            res = await pipe.execute()
+            return self.parse(res[0], res[1], with_ttl)
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.get fail \
+                key:%s, res:%s, err:%s',
+                      key, res, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def set(self, key: str, val: Any, ex: int = None):
+        try:
+            return bool(await self.redis.set(key, self.encode(val), ex=ex))
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.set fail \
+                    key:%s, val:%s, ex:%s, err:%s',
+                      key, val, ex, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def delete(self, key: str):
+        try:
+            await self.redis.delete(key)
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.delete fail \
+                    key:%s, err:%s',
+                      key, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def mget(self, keys: List[str], with_ttl: bool = False) -> (Dict[str, Any]):
+        result = {}
+        res = None
+        if not keys:
+            return result
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.mget(keys)
+            if with_ttl:
+                for key in keys:
+                    pipe.ttl(key)
+            res = await pipe.execute()
+            ttls = res[1:] if with_ttl else [None] * len(keys)
+            for key, val, ttl_secs in zip(keys, res[0], ttls):
+                if val is not None:
+                    result[key] = self.parse(val, ttl_secs, with_ttl)
+            return result
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.mget fail \
+                keys:%s, res:%s, err:%s',
+                      keys, res, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def mset(self, mapping: Dict[str, Any], ex: int = None) -> (bool):
+        if not mapping:
+            return True
+
+        try:
+            # MSET has no expiry, SET ... EX per key in one pipeline
+            pipe = self.redis.pipeline(transaction=False)
+            for key, val in mapping.items():
+                pipe.set(key, self.encode(val), ex=ex)
+            return all(await pipe.execute())
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.mset fail \
+                    mapping:%s, ex:%s, err:%s',
+                      mapping, ex, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def mdelete(self, keys: List[str]):
+        if not keys:
+            return
+
+        try:
+            await self.redis.delete(*keys)
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.mdelete fail \
+                    keys:%s, err:%s',
+                      keys, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def smembers(self, key: str) -> (Optional[Set[Any]]):
+        try:
+            members = await self.redis.smembers(key)
+            # a missing key reads as an empty set
+            return members if members else None
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.smembers fail \
+                key:%s, err:%s',
+                      key, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def sismember(self, key: str, value: Any) -> (bool):
+        try:
+            return bool(await self.redis.sismember(key, str(value)))
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.sismember fail \
+                key:%s, value:%s, err:%s',
+                      key, value, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def sadd(self, key: str, values: List[Any], ex: int = None) -> (int):
+        if not isinstance(values, list):
+            raise ServerException(
+                msg='invalid input type, values should be list')
+
+        if not values:
+            return 0
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.sadd(key, *[str(v) for v in values])
+            if ex:
+                pipe.expire(key, ex)
+            res = await pipe.execute()
+            return res[0]
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.sadd fail \
+                key:%s, values:%s, ex:%s, err:%s',
+                      key, values, ex, e.__str__())
+            raise ServerException(msg='redis_server_error')
+
+    async def srem(self, key: str, value: Any) -> (int):
+        try:
+            return await self.redis.srem(key, str(value))
+
+        except Exception as e:
+            log.error(f'cache {self.__cls_name}.srem fail \
+                key:%s, value:%s, err:%s',
+                      key, value, e.__str__())
+            raise ServerException(msg='redis_server_error')
@@ -0,0 +1,171 @@
+import time
+from typing import Any, Dict, List, Set, Optional
+from ...domain.cache import ICache
+from ...infra.util.time_util import gen_ttl_secs
+from .memory_cache_adapter import MemoryCacheAdapter
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class TieredCacheAdapter(ICache):
+    '''
+    L1: in-process MemoryCacheAdapter, L2: any ICache (DynamoDbCacheAdapter today)
+
+    - get: served by L1 until min(stored ttl, now + max_age), else read-through L2
+    - set: write-through, L2 first then L1
+    - delete / sadd / srem: L1 entry is invalidated, then L2 is updated
+
+    max_age bounds how long an entry written by another container can be stale.
+    a read-through racing a local write of the same key does not fill L1:
+    the key's version is bumped by writes, reads fill only an unchanged version.
+    '''
+
+    def __init__(self, l2: ICache, l1: MemoryCacheAdapter = None, max_age: int = 10):
+        self.l2 = l2
+        self.l1 = l1 if l1 is not None else MemoryCacheAdapter()
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        # key -> [reads in flight, version], only kept while a read-through is in flight
+        self.__reads: Dict[str, List[int]] = {}
+
+    def __read_start(self, key: str) -> (int):
+        state = self.__reads.setdefault(key, [0, 0])
+        state[0] += 1
+        return state[1]
+
+    def __read_end(self, key: str, version: int) -> (bool):
+        '''
+        return True when the key was not written during the read
+        '''
+        state = self.__reads[key]
+        state[0] -= 1
+        if state[0] == 0:
+            del self.__reads[key]
+        return state[1] == version
+
+    def __invalidate(self, key: str):
+        self.l1.invalidate(key)
+        state = self.__reads.get(key, None)
+        if state is not None:
+            state[1] += 1
+
+    def __expire_at(self) -> (float):
+        return time.time() + self.max_age
+
+    def stats(self) -> (Dict[str, int]):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.l1.evictions,
+            'size': len(self.l1),
+        }
+
+    async def get(self, key: str, with_ttl: bool = False):
+        found, result, ttl = self.l1.lookup(key)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+            # the ttl is always read, a later `with_ttl` hit needs it
+            version = self.__read_start(key)
+            try:
+                result = await self.l2.get(key, True)
+            finally:
+                unchanged = self.__read_end(key, version)
+            if result is None:
+                return None
+
+            if isinstance(result, dict):
+                ttl = result.pop('ttl', None)
+            if unchanged:
+                self.l1.put(key, result, ttl, self.__expire_at())
+
+        if with_ttl and ttl is not None and isinstance(result, dict):
+            result.update({'ttl': ttl})
+        return result
+
+    async def set(self, key: str, val: Any, ex: int = None):
+        self.__invalidate(key)
+        result = await self.l2.set(key, val, ex)
+        # a read started before the write may still be in flight
+        self.__invalidate(key)
+        if result:
+            ttl = gen_ttl_secs(seconds=ex) if ex else None
+            self.l1.put(key, val, ttl, self.__expire_at())
+        return result
+
+    async def delete(self, key: str):
+        self.__invalidate(key)
+        try:
+            return await self.l2.delete(key)
+        finally:
+            self.__invalidate(key)
+
+    async def mget(self, keys: List[str], with_ttl: bool = False) -> (Dict[str, Any]):
+        result = {}
+        missed = []
+        for key in keys:
+            found, val, ttl = self.l1.lookup(key)
+            if not found:
+                missed.append(key)
+                continue
+
+            self.hits += 1
+            if with_ttl and ttl is not None and isinstance(val, dict):
+                val.update({'ttl': ttl})
+            result[key] = val
+
+        if not missed:
+            return result
+
+        self.misses += len(missed)
+        versions = {key: self.__read_start(key) for key in missed}
+        try:
+            found = await self.l2.mget(missed, True)
+        finally:
+            unchanged = {key for key, version in versions.items() if self.__read_end(key, version)}
+        for key, val in found.items():
+            ttl = val.pop('ttl', None) if isinstance(val, dict) else None
+            if key in unchanged:
+                self.l1.put(key, val, ttl, self.__expire_at())
+            if with_ttl and ttl is not None and isinstance(val, dict):
+                val.update({'ttl': ttl})
+            result[key] = val
+        return result
+
+    async def mset(self, mapping: Dict[str, Any], ex: int = None) -> (bool):
+        for key in mapping:
+            self.__invalidate(key)
+        result = await self.l2.mset(mapping, ex)
+        for key in mapping:
+            self.__invalidate(key)
+        if result:
+            ttl = gen_ttl_secs(seconds=ex) if ex else None
+            for key, val in mapping.items():
+                self.l1.put(key, val, ttl, self.__expire_at())
+        return result
+
+    async def mdelete(self, keys: List[str]):
+        for key in keys:
+            self.__invalidate(key)
+        try:
+            return await self.l2.mdelete(keys)
+        finally:
+            for key in keys:
+                self.__invalidate(key)
+
+    async def smembers(self, key: str) -> (Optional[Set[Any]]):
+        return await self.l2.smembers(key)
+
+    async def sismember(self, key: str, value: Any) -> (bool):
+        return await self.l2.sismember(key, value)
+
+    async def sadd(self, key: str, values: List[Any], ex: int = None) -> (int):
+        self.__invalidate(key)
+        return await self.l2.sadd(key, values, ex)
+
+    async def srem(self, key: str, value: Any) -> (int):
+        self.__invalidate(key)
+        return await self.l2.srem(key, value)
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Set, Optional
+from ...domain.cache import ICache
+from ..util.timing import timed
+
+
+class TimedCacheAdapter(ICache):
+    '''
+    times every call of the wrapped ICache as dependency `name`,
+    in the request's Server-Timing and the dependency histograms
+    '''
+
+    def __init__(self, cache: ICache, name: str):
+        self.cache = cache
+        self.name = name
+
+    async def get(self, key: str, with_ttl: bool = False):
+        with timed(self.name):
+            return await self.cache.get(key, with_ttl)
+
+    async def set(self, key: str, val: Any, ex: int = None):
+        with timed(self.name):
+            return await self.cache.set(key, val, ex)
+
+    async def delete(self, key: str):
+        with timed(self.name):
+            return await self.cache.delete(key)
+
+    async def mget(self, keys: List[str], with_ttl: bool = False) -> (Dict[str, Any]):
+        with timed(self.name):
+            return await self.cache.mget(keys, with_ttl)
+
+    async def mset(self, mapping: Dict[str, Any], ex: int = None) -> (bool):
+        with timed(self.name):
+            return await self.cache.mset(mapping, ex)
+
+    async def mdelete(self, keys: List[str]):
+        with timed(self.name):
+            return await self.cache.mdelete(keys)
+
+    async def smembers(self, key: str) -> (Optional[Set[Any]]):
+        with timed(self.name):
+            return await self.cache.smembers(key)
+
+    async def sismember(self, key: str, value: Any) -> (bool):
+        with timed(self.name):
+            return await self.cache.sismember(key, value)
+
+    async def sadd(self, key: str, values: List[Any], ex: int = None) -> (int):
+        with timed(self.name):
+            return await self.cache.sadd(key, values, ex)
+
+    async def srem(self, key: str, value: Any) -> (int):
+        with timed(self.name):
+            return await self.cache.srem(key, value)
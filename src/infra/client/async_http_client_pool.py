@@ -0,0 +1,123 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Tuple
+import httpx
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+def _h2_installed() -> (bool):
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AsyncHttpClientPool:
+    '''
+    long-lived httpx.AsyncClient per upstream origin (scheme://host:port),
+    each client owns its own keep-alive connection pool.
+
+    the pool lives as long as the process (a warm Lambda container reuses it),
+    clients are re-created if the event loop they were bound to has changed.
+    '''
+
+    def __init__(self,
+                 max_connections: int = 50,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 60,
+                 connect_timeout: float = 3,
+                 read_timeout: float = 10,
+                 write_timeout: float = 10,
+                 pool_timeout: float = 3,
+                 http2: bool = False,
+                 host_timeouts: Dict[str, Tuple[float, float]] = None,
+                 ):
+        self.__cls_name = self.__class__.__name__
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        # 'host' or 'host:port' -> (connect, read) secs, overrides the defaults above
+        self.host_timeouts = {
+            host: httpx.Timeout(connect=connect, read=read, write=write_timeout, pool=pool_timeout)
+            for host, (connect, read) in (host_timeouts or {}).items()
+        }
+        if http2 and not _h2_installed():
+            log.warning(f'{self.__cls_name}: http2 is enabled but package `h2` is not installed, fallback to http/1.1')
+            http2 = False
+        self.http2 = http2
+        self.__clients: Dict[Tuple[str, str, int], httpx.AsyncClient] = {}
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def origin(url: str) -> (Tuple[str, str, int]):
+        u = httpx.URL(url)
+        port = u.port or (443 if u.scheme == 'https' else 80)
+        return (u.scheme, u.host, port)
+
+    def __current_loop(self) -> (Optional[asyncio.AbstractEventLoop]):
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    def __bind_loop(self):
+        loop = self.__current_loop()
+        if loop is None or loop is self.__loop:
+            return
+
+        if self.__clients and self.__loop is not None:
+            # connections belong to the previous loop which can no longer drive them
+            log.info(f'{self.__cls_name}: event loop changed, drop %d stale client(s)', len(self.__clients))
+            self.__clients = {}
+        self.__loop = loop
+
+    def timeout_of(self, key: Tuple[str, str, int]) -> (httpx.Timeout):
+        _, host, port = key
+        timeout = self.host_timeouts.get(f'{host}:{port}', None)
+        return timeout if timeout is not None else self.host_timeouts.get(host, self.timeout)
+
+    def __new_client(self, key: Tuple[str, str, int]) -> (httpx.AsyncClient):
+        return httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout_of(key),
+            http2=self.http2,
+        )
+
+    def get_client(self, url: str) -> (httpx.AsyncClient):
+        self.__bind_loop()
+        key = self.origin(url)
+        client = self.__clients.get(key, None)
+        if client is None or client.is_closed:
+            client = self.__new_client(key)
+            self.__clients[key] = client
+        return client
+
+    def open(self, urls: Iterable[str]):
+        '''
+        pre-create the clients of known upstream hosts (e.g. region hosts)
+        '''
+        for url in urls:
+            self.get_client(url)
+
+    async def aclose(self):
+        clients = list(self.__clients.values())
+        self.__clients = {}
+        self.__loop = None
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                log.error(f'{self.__cls_name}.aclose fail, err:%s', e.__str__())
+
+    def __len__(self) -> (int):
+        return len(self.__clients)
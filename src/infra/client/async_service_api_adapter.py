@@ -1,9 +1,17 @@
+import asyncio
 import functools
+import random
+import time
 from fastapi import status
-from typing import Dict, Optional
+from typing import Callable, Dict, Hashable, List, Optional
 import httpx
 from ...app.template.service_response import ServiceApiResponse
 from ...app.template.service_api import IServiceApi
+from .async_http_client_pool import AsyncHttpClientPool
+from .single_flight import SingleFlight
+from .circuit_breaker import CircuitBreaker
+from .retry_budget import RetryBudget
+from .hedging import Hedger
 from ...config.exception import *
 import logging
 
@@ -13,6 +21,8 @@ log = logging.getLogger(__name__)
 
 
 SUCCESS_CODE = "0"
+# the upstream (or its gateway) is unavailable: retried for GET, counted by the breaker
+UNAVAILABLE_STATUS_CODES = (502, 503, 504)
 
 
 def check_response_code(method: str, expected_code: int = 200):
@@ -54,6 +64,174 @@ def check_response_code(method: str, expected_code: int = 200):
 
 
 class AsyncServiceApiAdapter(IServiceApi):
+    def __init__(self,
+                 client_pool: AsyncHttpClientPool = None,
+                 single_flight: bool = False,
+                 get_retries: int = 0,
+                 retry_base_delay: float = 0.05,
+                 retry_budget_ratio: float = 0.1,
+                 retry_budget_reserve: int = 10,
+                 breaker_failures: int = 0,
+                 breaker_reset_timeout: float = 10,
+                 hedge: bool = False,
+                 hedge_percentile: float = 95,
+                 hedge_min_delay: float = 0.02,
+                 hedge_budget_ratio: float = 0.05,
+                 call_deadline: float = 0,
+                 ):
+        # requests share the keep-alive connections of the pool
+        self.client_pool = client_pool if client_pool is not None else AsyncHttpClientPool()
+        # opt-in: identical concurrent GETs share one upstream call
+        self.single_flight = SingleFlight() if single_flight else None
+        # GET only (idempotent), bounded per host by a retry budget
+        self.get_retries = get_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_reserve = retry_budget_reserve
+        # per host, 0 disables the breakers
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.__breakers: Dict[str, CircuitBreaker] = {}
+        self.__retry_budgets: Dict[str, RetryBudget] = {}
+        # opt-in, GET only: a slow first attempt is raced by a second one
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget_ratio = hedge_budget_ratio
+        self.__hedgers: Dict[str, Hedger] = {}
+        # secs, bounds a call with all its retries (0 = unbounded); no retry starts past it
+        self.call_deadline = call_deadline
+        # (url, secs, ok) of every upstream call, e.g. the region host registries
+        self.__listeners: List[Callable[[str, float, bool], None]] = []
+
+    def add_listener(self, listener: Callable[[str, float, bool], None]):
+        self.__listeners.append(listener)
+
+    def notify(self, url: str, secs: float, ok: bool):
+        for listener in self.__listeners:
+            try:
+                listener(url, secs, ok)
+            except Exception as e:
+                log.error(f"service request listener fail, url:%s, err:%s", url, e.__str__())
+
+    def host(self, url: str) -> (str):
+        scheme, host, port = AsyncHttpClientPool.origin(url)
+        return f'{host}:{port}'
+
+    def breaker(self, url: str) -> (Optional[CircuitBreaker]):
+        if self.breaker_failures <= 0:
+            return None
+
+        host = self.host(url)
+        if not host in self.__breakers:
+            self.__breakers[host] = CircuitBreaker(host, self.breaker_failures, self.breaker_reset_timeout)
+        return self.__breakers[host]
+
+    def retry_budget(self, url: str) -> (RetryBudget):
+        host = self.host(url)
+        if not host in self.__retry_budgets:
+            self.__retry_budgets[host] = RetryBudget(self.retry_budget_ratio, self.retry_budget_reserve)
+        return self.__retry_budgets[host]
+
+    def hedger(self, url: str) -> (Optional[Hedger]):
+        if not self.hedge:
+            return None
+
+        host = self.host(url)
+        if not host in self.__hedgers:
+            self.__hedgers[host] = Hedger(self.hedge_percentile, self.hedge_min_delay,
+                                          budget_ratio=self.hedge_budget_ratio,
+                                          unavailable_status_codes=UNAVAILABLE_STATUS_CODES)
+        return self.__hedgers[host]
+
+    def stats(self) -> (Dict[str, Dict]):
+        '''
+        breaker state, retry budget and hedging per upstream host
+        '''
+        hosts = set(self.__breakers) | set(self.__retry_budgets) | set(self.__hedgers)
+        return {host: {
+            'breaker': self.__breakers[host].stats() if host in self.__breakers else None,
+            'retry_budget': self.__retry_budgets[host].stats() if host in self.__retry_budgets else None,
+            'hedge': self.__hedgers[host].stats() if host in self.__hedgers else None,
+        } for host in sorted(hosts)}
+
+    def __backoff(self, attempt: int) -> (float):
+        # full jitter
+        return random.uniform(0, self.retry_base_delay * (2 ** attempt))
+
+    async def __send(self, method: str, url: str, retries: int = 0, hedge: bool = False, **kwargs) -> (httpx.Response):
+        '''
+        one upstream call through the host's breaker,
+        transport errors and 502/503/504 are retried `retries` times while the budget allows,
+        a `hedge`d call may race a second identical request (the breaker sees one call),
+        the attempts and backoffs together end within `call_deadline`
+        '''
+        breaker = self.breaker(url)
+        hedger = self.hedger(url) if hedge else None
+        budget = self.retry_budget(url) if retries > 0 else None
+        if budget:
+            budget.deposit()
+
+        deadline = time.monotonic() + self.call_deadline if self.call_deadline > 0 else None
+        attempt = 0
+        while True:
+            if breaker and not breaker.allow():
+                log.error(f"service request rejected, circuit open, [%s]: %s", method, url)
+                raise ServerException(msg='circuit_open')
+
+            error = None
+            response = None
+            before = time.perf_counter()
+            try:
+                client = self.client_pool.get_client(url)
+                if hedger:
+                    call = hedger.run(lambda: client.request(method, url, **kwargs))
+                else:
+                    call = client.request(method, url, **kwargs)
+                if deadline is not None:
+                    call = asyncio.wait_for(call, timeout=max(deadline - time.monotonic(), 0))
+                response = await call
+            except httpx.TransportError as e:
+                error = e
+            except asyncio.TimeoutError:
+                error = httpx.TimeoutException(f'call deadline exceeded, {self.call_deadline} secs')
+            except Exception:
+                # unexpected: counted as a failure of the host
+                if self.__listeners:
+                    self.notify(url, time.perf_counter() - before, False)
+                if breaker:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                # cancelled (deadline, prefetch, client gone): no outcome, a held probe is released
+                if breaker:
+                    breaker.release_probe()
+                raise
+
+            unavailable = error is not None or response.status_code in UNAVAILABLE_STATUS_CODES
+            if self.__listeners:
+                self.notify(url, time.perf_counter() - before, not unavailable)
+            if breaker and unavailable:
+                breaker.record_failure()
+            elif breaker:
+                breaker.record_success()
+
+            backoff = self.__backoff(attempt) if unavailable and attempt < retries else 0
+            past_deadline = deadline is not None and time.monotonic() + backoff >= deadline
+            if not unavailable or attempt >= retries or past_deadline or not budget.withdraw():
+                if error is not None:
+                    raise error
+                return response
+
+            log.warning(f"service request retry, [%s]: %s, attempt:%s, err:%s",
+                        method, url, attempt + 1, error or response.status_code)
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+    def flight_key(self, url: str, params: Dict = None, headers: Dict = None) -> (Hashable):
+        params = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        headers = tuple(sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items()))
+        return ('GET', url, params, headers)
 
     """
     return response body only
@@ -66,12 +244,26 @@ class AsyncServiceApiAdapter(IServiceApi):
 
     @check_response_code('get', 200)
     async def get(self, url: str, params: Dict = None, headers: Dict = None) -> Optional[ServiceApiResponse]:
+        if self.single_flight is None:
+            return await self.__get(url, params, headers)
+
+        result, _ = await self.single_flight.do(
+            self.flight_key(url, params, headers),
+            lambda: self.__get(url, params, headers))
+        # every waiter owns its copy, callers update `data` in place
+        return result.copy(deep=True) if result else result
+
+    async def __get(self, url: str, params: Dict = None, headers: Dict = None) -> Optional[ServiceApiResponse]:
         result = None
         response = None
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, headers=headers)
-                result = ServiceApiResponse.parse(response)
+            response = await self.__send('GET', url, self.get_retries, hedge=True, params=params, headers=headers)
+            result = ServiceApiResponse.parse(response)
+            # a malformed body fails here, the one json decode of the response
+            result.decode()
+
+        except ServerException:
+            raise
 
         except Exception as e:
             log.error(f"simple_get request error, url:%s, params:%s, headers:%s, resp:%s, err:%s",
@@ -94,9 +286,13 @@ class AsyncServiceApiAdapter(IServiceApi):
         result = None
         response = None
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=json, headers=headers)
-                result = ServiceApiResponse.parse(response)
+            response = await self.__send('POST', url, json=json, headers=headers)
+            result = ServiceApiResponse.parse(response)
+            # a malformed body fails here, the one json decode of the response
+            result.decode()
+
+        except ServerException:
+            raise
 
         except Exception as e:
             log.error(f"simple_post request error, url:%s, json:%s, headers:%s, resp:%s, err:%s",
@@ -119,9 +315,13 @@ class AsyncServiceApiAdapter(IServiceApi):
         result = None
         response = None
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.put(url, json=json, headers=headers)
-                result = ServiceApiResponse.parse(response)
+            response = await self.__send('PUT', url, json=json, headers=headers)
+            result = ServiceApiResponse.parse(response)
+            # a malformed body fails here, the one json decode of the response
+            result.decode()
+
+        except ServerException:
+            raise
 
         except Exception as e:
             log.error(f"simple_put request error, url:%s, json:%s, headers:%s, resp:%s, err:%s",
@@ -144,9 +344,13 @@ class AsyncServiceApiAdapter(IServiceApi):
         result = None
         response = None
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(url, params=params, headers=headers)
-                result = ServiceApiResponse.parse(response)
+            response = await self.__send('DELETE', url, params=params, headers=headers)
+            result = ServiceApiResponse.parse(response)
+            # a malformed body fails here, the one json decode of the response
+            result.decode()
+
+        except ServerException:
+            raise
 
         except Exception as e:
             log.error(f"simple_delete request error, url:%s, params:%s, headers:%s, resp:%s, err:%s",
@@ -0,0 +1,79 @@
+import time
+from typing import Dict
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    '''
+    per upstream host:
+    - closed: calls pass, `failure_threshold` consecutive failures open it
+    - open: calls fail fast for `reset_timeout` secs
+    - half_open: a single probe call passes, its success closes the breaker, a failure opens it again;
+      a probe ending without an outcome (cancelled) is released for the next call
+    '''
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self.__opened_at = 0.0
+        self.__probing = False
+
+    def __transit(self, state: str):
+        if state == self.state:
+            return
+
+        log.warning('circuit breaker state change, host:%s, %s -> %s, failures:%s',
+                    self.name, self.state, state, self.failures)
+        self.state = state
+        if state == OPEN:
+            self.opened += 1
+            self.__opened_at = time.monotonic()
+
+    def allow(self) -> (bool):
+        if self.state == OPEN and time.monotonic() - self.__opened_at >= self.reset_timeout:
+            self.__transit(HALF_OPEN)
+
+        if self.state == CLOSED:
+            return True
+
+        if self.state == HALF_OPEN and not self.__probing:
+            self.__probing = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.__probing = False
+        self.__transit(CLOSED)
+
+    def release_probe(self):
+        self.__probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        probe_failed = self.state == HALF_OPEN
+        self.__probing = False
+        if probe_failed or self.failures >= self.failure_threshold:
+            self.__transit(OPEN)
+
+    def stats(self) -> (Dict):
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+import httpx
+from .retry_budget import RetryBudget
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class LatencyTracker:
+    '''
+    the recent latencies of a host, `percentile` is recomputed every `refresh` samples
+    '''
+
+    def __init__(self, percentile: float = 95, size: int = 256, refresh: int = 16):
+        self.percentile = percentile
+        self.refresh = refresh
+        self.__samples = deque(maxlen=size)
+        self.__value: Optional[float] = None
+        self.__pending = 0
+
+    def __len__(self) -> (int):
+        return len(self.__samples)
+
+    def record(self, secs: float):
+        self.__samples.append(secs)
+        self.__pending += 1
+
+    def value(self) -> (Optional[float]):
+        if self.__value is None or self.__pending >= self.refresh:
+            ordered = sorted(self.__samples)
+            if ordered:
+                idx = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self.__value = ordered[idx]
+            self.__pending = 0
+        return self.__value
+
+
+class Hedger:
+    '''
+    per upstream host: when the first attempt has not answered after the p`percentile` latency
+    (at least `min_delay`), an identical second attempt is sent, the first answer wins
+    and the other attempt is cancelled; an `unavailable_status_codes` answer (or an error)
+    only wins when no other attempt is in flight. hedges are bounded by a budget of
+    `budget_ratio` of the requests; no hedging until `min_samples` latencies are known.
+
+    every attempt's latency is recorded, a cancelled one with its time until the cancel
+    (a lower bound), so that slow attempts losing the race still count
+    '''
+
+    def __init__(self,
+                 percentile: float = 95,
+                 min_delay: float = 0.02,
+                 min_samples: int = 20,
+                 budget_ratio: float = 0.05,
+                 budget_reserve: int = 5,
+                 unavailable_status_codes: Iterable[int] = (502, 503, 504),
+                 ):
+        self.min_delay = min_delay
+        self.unavailable_status_codes = tuple(unavailable_status_codes)
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(percentile)
+        self.budget = RetryBudget(budget_ratio, budget_reserve)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> (Optional[float]):
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.value())
+
+    async def __attempt(self, request: Callable[[], Awaitable[httpx.Response]]) -> (httpx.Response):
+        before = time.perf_counter()
+        try:
+            return await request()
+        finally:
+            self.latency.record(time.perf_counter() - before)
+
+    def __unavailable(self, task: asyncio.Future) -> (bool):
+        return task.exception() is not None or task.result().status_code in self.unavailable_status_codes
+
+    async def run(self, request: Callable[[], Awaitable[httpx.Response]]) -> (httpx.Response):
+        self.requests += 1
+        self.budget.deposit()
+        delay = self.delay()
+        first = asyncio.ensure_future(self.__attempt(request))
+        if delay is None:
+            return await first
+
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self.budget.withdraw():
+                return await first
+
+            self.hedged += 1
+            second = asyncio.ensure_future(self.__attempt(request))
+            pending.add(second)
+            lost = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not self.__unavailable(task):
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    # failed or unavailable: the other attempt may still answer,
+                    # an unavailable response is kept over an error
+                    if lost is None or lost.exception() is not None:
+                        lost = task
+            return lost.result()
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> (Dict):
+        delay = self.delay()
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'delay_ms': round(delay * 1000, 1) if delay is not None else None,
+            'budget': self.budget.stats(),
+        }
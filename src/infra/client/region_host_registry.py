@@ -0,0 +1,124 @@
+import time
+from typing import Dict, Optional
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class HostHealth:
+    '''
+    EWMA latency and error rate of one upstream endpoint, observed from real traffic
+    '''
+    __slots__ = ('latency', 'error_rate', 'failures', 'samples', 'last_seen', 'ejected_until')
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.samples = 0
+        self.last_seen = 0.0
+        self.ejected_until = 0.0
+
+    def record(self, secs: float, ok: bool, alpha: float, now: float):
+        self.samples += 1
+        self.last_seen = now
+        self.error_rate += alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.failures = 0
+            self.latency = secs if self.latency is None else self.latency + alpha * (secs - self.latency)
+        else:
+            self.failures += 1
+
+    def stats(self, now: float) -> (Dict):
+        return {
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'failures': self.failures,
+            'samples': self.samples,
+            'ejected': now < self.ejected_until,
+        }
+
+
+class RegionHostRegistry:
+    '''
+    the region hosts of one service, `pick()` returns the fastest healthy one:
+    - a host failing `eject_failures` times in a row, or whose error rate reaches
+      `max_error_rate`, is left out for `eject_secs` and then tried again
+    - live traffic is kept off unmeasured hosts: a host other than `default`
+      is a candidate only once calls addressed to it (explicit region) measured
+      its latency within `refresh_secs`
+    - `default` is preferred on ties and is the fallback when no host is healthy
+    '''
+
+    def __init__(self,
+                 service: str,
+                 hosts: Dict[str, str],
+                 alpha: float = 0.2,
+                 max_error_rate: float = 0.5,
+                 eject_failures: int = 5,
+                 eject_secs: float = 30,
+                 refresh_secs: float = 60,
+                 ):
+        self.service = service
+        self.hosts = hosts
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.eject_failures = eject_failures
+        self.eject_secs = eject_secs
+        self.refresh_secs = refresh_secs
+        # regions may share an endpoint, the health is kept per endpoint
+        self.__health: Dict[str, HostHealth] = {url: HostHealth() for url in set(hosts.values())}
+
+    @property
+    def default(self) -> (str):
+        return self.hosts['default']
+
+    def get(self, region: str) -> (str):
+        return self.hosts.get(region, self.default)
+
+    def owns(self, url: str) -> (Optional[str]):
+        # the longest matching host, when one host is a prefix of another
+        owner = None
+        for host in self.__health:
+            if url.startswith(host) and (owner is None or len(host) > len(owner)):
+                owner = host
+        return owner
+
+    def record(self, url: str, secs: float, ok: bool) -> (bool):
+        '''
+        the outcome of an upstream call, ignored unless the url belongs to one of the hosts
+        '''
+        host = self.owns(url)
+        if host is None:
+            return False
+
+        now = time.monotonic()
+        health = self.__health[host]
+        health.record(secs, ok, self.alpha, now)
+        if not ok and now >= health.ejected_until and \
+                (health.failures >= self.eject_failures or health.error_rate >= self.max_error_rate):
+            health.ejected_until = now + self.eject_secs
+            log.warning(f'{self.service} region host ejected, host:%s, failures:%s, error_rate:%.2f',
+                        host, health.failures, health.error_rate)
+        return True
+
+    def pick(self) -> (str):
+        now = time.monotonic()
+        best, best_key = None, None
+        for host, health in self.__health.items():
+            if now < health.ejected_until:
+                continue
+
+            stale = health.latency is None or now - health.last_seen >= self.refresh_secs
+            if stale and host != self.default:
+                continue
+
+            latency = health.latency if health.latency is not None else float('inf')
+            key = (latency, host != self.default)
+            if best_key is None or key < best_key:
+                best, best_key = host, key
+        return best if best is not None else self.default
+
+    def stats(self) -> (Dict[str, Dict]):
+        now = time.monotonic()
+        return {host: health.stats(now) for host, health in sorted(self.__health.items())}
@@ -0,0 +1,35 @@
+from typing import Dict
+
+
+class RetryBudget:
+    '''
+    retries may add at most `ratio` of the requests on top of them:
+    every request deposits `ratio` token, every retry withdraws one;
+    `reserve` tokens (also the cap) let a quiet host retry a few times
+    '''
+
+    def __init__(self, ratio: float = 0.1, reserve: int = 10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.tokens = float(reserve)
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self):
+        self.tokens = min(self.reserve, self.tokens + self.ratio)
+
+    def withdraw(self) -> (bool):
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+    def stats(self) -> (Dict):
+        return {
+            'tokens': round(self.tokens, 2),
+            'retries': self.retries,
+            'exhausted': self.exhausted,
+        }
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class SingleFlight:
+    '''
+    concurrent calls with the same key share one in-flight call:
+    the first caller starts it, the others wait for the same result or exception.
+    the call runs as its own task, cancelling one waiter never cancels the others
+    '''
+
+    def __init__(self):
+        self.__calls: Dict[Hashable, asyncio.Task] = {}
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.shared = 0
+
+    def __len__(self) -> (int):
+        return len(self.__calls)
+
+    def __bind(self):
+        # tasks of a closed loop never complete, forget them
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:
+            self.__calls = {}
+            self.__loop = loop
+
+    def __done(self, key: Hashable, task: asyncio.Task):
+        if self.__calls.get(key, None) is task:
+            del self.__calls[key]
+        # mark the exception retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> (Tuple[Any, bool]):
+        '''
+        return (result, shared), `shared` is True for the callers
+        that joined a call started by another one
+        '''
+        self.__bind()
+        task = self.__calls.get(key, None)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self.__calls[key] = task
+            task.add_done_callback(lambda t: self.__done(key, t))
+
+        return await asyncio.shield(task), shared
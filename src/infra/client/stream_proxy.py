@@ -0,0 +1,160 @@
+import time
+import inspect
+import functools
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+import httpx
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from .async_http_client_pool import AsyncHttpClientPool
+from .async_service_api_adapter import AsyncServiceApiAdapter, UNAVAILABLE_STATUS_CODES
+from ...config.exception import ServerException
+from ..util.json_util import dumps
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+REQUEST_HEADERS = (
+    'accept',
+    'accept-encoding',
+    'accept-language',
+    'content-type',
+    'content-length',
+    'if-match',
+    'if-none-match',
+)
+
+RESPONSE_HEADERS = (
+    'cache-control',
+    'content-encoding',
+    'content-length',
+    'content-type',
+    'etag',
+    'last-modified',
+)
+
+
+class StreamProxy:
+    '''
+    passes a request through to an upstream url and its response back, for routes
+    that need no BFF transformation: the bodies are streamed as raw bytes
+    (never json decoded, still compressed if they were), only the selected
+    headers are forwarded, the connection comes from the shared pool.
+
+    with a `service_api`, the calls go through its per-host circuit breaker
+    and its listeners (region host health, upstream timing) see them;
+    never retried, the request body is streamed once
+    '''
+
+    def __init__(self,
+                 client_pool: AsyncHttpClientPool,
+                 service_api: AsyncServiceApiAdapter = None,
+                 request_headers: Iterable[str] = REQUEST_HEADERS,
+                 response_headers: Iterable[str] = RESPONSE_HEADERS,
+                 ):
+        self.__cls_name = self.__class__.__name__
+        self.client_pool = client_pool
+        self.service_api = service_api
+        self.request_headers = tuple(h.lower() for h in request_headers)
+        self.response_headers = tuple(h.lower() for h in response_headers)
+
+    def __has_body(self, request: Request) -> (bool):
+        return 'content-length' in request.headers or 'transfer-encoding' in request.headers
+
+    def __observe(self, url: str, before: float, ok: bool):
+        if self.service_api is None:
+            return
+
+        self.service_api.notify(url, time.perf_counter() - before, ok)
+        breaker = self.service_api.breaker(url)
+        if breaker and ok:
+            breaker.record_success()
+        elif breaker:
+            breaker.record_failure()
+
+    async def forward(self, request: Request, url: str,
+                      on_complete: Optional[Callable[[], Any]] = None,
+                      body: Optional[BaseModel] = None) -> (StreamingResponse):
+        '''
+        `on_complete` runs once the upstream answered 2xx, before the body is streamed back;
+        a validated `body` is sent serialized in place of the request body
+        '''
+        breaker = self.service_api.breaker(url) if self.service_api else None
+        if breaker and not breaker.allow():
+            log.error(f'{self.__cls_name}.forward rejected, circuit open, [%s]: %s', request.method, url)
+            raise ServerException(msg='circuit_open')
+
+        headers = {k: v for k, v in request.headers.items() if k in self.request_headers}
+        if body is not None:
+            # the length is the serialized one's
+            headers.pop('content-length', None)
+            headers['content-type'] = 'application/json'
+            content = dumps(body)
+        else:
+            content = request.stream() if self.__has_body(request) else None
+        before = time.perf_counter()
+        try:
+            client = self.client_pool.get_client(url)
+            upstream_req = client.build_request(
+                request.method,
+                url,
+                params=request.query_params.multi_items(),
+                headers=headers,
+                content=content,
+            )
+            upstream_res = await client.send(upstream_req, stream=True)
+        except httpx.TransportError as e:
+            self.__observe(url, before, False)
+            log.error(f'{self.__cls_name}.forward fail, [%s]: %s, err:%s', request.method, url, e.__str__())
+            raise ServerException(msg='proxy_connection_error')
+        except Exception:
+            self.__observe(url, before, False)
+            raise
+        except BaseException:
+            # cancelled (client gone): no outcome, a held probe is released
+            if breaker:
+                breaker.release_probe()
+            raise
+
+        self.__observe(url, before, upstream_res.status_code not in UNAVAILABLE_STATUS_CODES)
+        if on_complete is not None and 200 <= upstream_res.status_code < 300:
+            on_complete()
+
+        return StreamingResponse(
+            self.__body(upstream_res),
+            status_code=upstream_res.status_code,
+            headers={k: v for k, v in upstream_res.headers.items() if k in self.response_headers},
+        )
+
+    async def __body(self, upstream_res: httpx.Response) -> (AsyncIterator[bytes]):
+        # the connection goes back to the pool once the body is sent or the client is gone
+        try:
+            async for chunk in upstream_res.aiter_raw():
+                yield chunk
+        finally:
+            await upstream_res.aclose()
+
+    def pass_through(self, upstream: Callable[..., Awaitable[str]] = None, *,
+                     on_complete: Callable[..., Any] = None):
+        '''
+        route decorator: the route declares its params as usual (plus `request: Request`)
+        and returns the upstream url, the request is then passed through to it;
+        `on_complete` is called with the route params once the upstream answered 2xx,
+        e.g. `@stream_proxy.pass_through(on_complete=lambda user_id, **_: ...)`;
+        a route declaring `body: SomeDTO = Body(...)` keeps its validation (422 before
+        the upstream) and its request schema, the validated body is forwarded
+        '''
+        if upstream is None:
+            return functools.partial(self.pass_through, on_complete=on_complete)
+
+        if not 'request' in inspect.signature(upstream).parameters:
+            raise TypeError(f'pass-through route {upstream.__name__} must declare `request: Request`')
+
+        @functools.wraps(upstream)
+        async def route(*args, **kwargs):
+            url = await upstream(*args, **kwargs)
+            done = (lambda: on_complete(**kwargs)) if on_complete is not None else None
+            return await self.forward(kwargs['request'], url, done, kwargs.get('body'))
+
+        return route
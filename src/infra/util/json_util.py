@@ -0,0 +1,35 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+from pydantic import BaseModel
+
+# orjson is optional (pip install orjson), the stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_default(obj: Any) -> (Any):
+    '''
+    the types neither serializer writes natively
+    '''
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {obj.__class__.__name__} is not JSON serializable')
+
+
+def dumps(content: Any) -> (bytes):
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+    # same output as starlette's JSONResponse
+    return json.dumps(content, default=json_default, ensure_ascii=False,
+                      allow_nan=False, indent=None, separators=(',', ':')).encode('utf-8')
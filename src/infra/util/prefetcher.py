@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+class Prefetcher:
+    '''
+    runs best-effort warm-up calls in the background:
+    - one task per key, a key already scheduled is skipped
+    - at most `concurrency` calls run at a time, so prefetch never takes
+      more than that share of the upstream connections from foreground requests
+    - beyond `max_pending` scheduled tasks new ones are dropped
+    - `cancel()` drops everything, e.g. before the container is frozen
+    '''
+
+    def __init__(self, concurrency: int = 2, max_pending: int = 32):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.__tasks: Dict[Hashable, asyncio.Task] = {}
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+        self.scheduled = 0
+        self.done = 0
+        self.failed = 0
+        self.dropped = 0
+        self.cancelled = 0
+
+    def __len__(self) -> (int):
+        return len(self.__tasks)
+
+    def __bind(self):
+        # tasks of a closed loop never complete, forget them
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:
+            self.__tasks = {}
+            self.__semaphore = asyncio.Semaphore(self.concurrency)
+            self.__loop = loop
+
+    async def __run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]):
+        async with self.__semaphore:
+            await fn()
+
+    def __finished(self, key: Hashable, task: asyncio.Task):
+        if self.__tasks.get(key, None) is task:
+            del self.__tasks[key]
+        if task.cancelled():
+            return
+
+        if task.exception() is not None:
+            self.failed += 1
+            log.warning('prefetch fail, key:%s, err:%s', key, task.exception().__str__())
+        else:
+            self.done += 1
+
+    def schedule(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> (bool):
+        '''
+        return False when the key is already scheduled or too many tasks are pending
+        '''
+        self.__bind()
+        if key in self.__tasks:
+            return False
+
+        if len(self.__tasks) >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        task = asyncio.ensure_future(self.__run(key, fn))
+        task.add_done_callback(lambda t: self.__finished(key, t))
+        self.__tasks[key] = task
+        self.scheduled += 1
+        return True
+
+    def cancel(self) -> (int):
+        '''
+        cancel the pending tasks, return how many
+        '''
+        tasks = [task for task in self.__tasks.values() if not task.done()]
+        if self.__loop is None or self.__loop.is_closed():
+            tasks = []
+        for task in tasks:
+            task.cancel()
+        self.__tasks = {}
+        self.cancelled += len(tasks)
+        return len(tasks)
+
+    async def drain(self):
+        '''
+        wait for the scheduled tasks, including the ones they schedule
+        '''
+        while self.__tasks:
+            await asyncio.gather(*list(self.__tasks.values()), return_exceptions=True)
+
+    def stats(self) -> (Dict):
+        return {
+            'pending': len(self.__tasks),
+            'scheduled': self.scheduled,
+            'done': self.done,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'cancelled': self.cancelled,
+        }
@@ -0,0 +1,207 @@
+import re
+import time
+import bisect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+import logging as log
+
+log.basicConfig(filemode='w', level=log.INFO)
+
+
+# upper bounds (ms) of the histogram buckets, the last bucket is unbounded
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    '''
+    latency counts in fixed buckets, percentiles are read as the upper bound of their bucket
+    '''
+    __slots__ = ('counts', 'count', 'sum_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, secs: float):
+        ms = secs * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> (Optional[float]):
+        if self.count == 0:
+            return None
+
+        rank = pct / 100 * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKETS_MS[idx] if idx < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> (Dict):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.sum_ms / self.count, 2) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 2),
+            'buckets': {
+                (f'le_{bound}' if idx < len(BUCKETS_MS) else 'inf'): count
+                for idx, (bound, count) in enumerate(zip(BUCKETS_MS + (None,), self.counts)) if count
+            },
+        }
+
+
+class LatencyRegistry:
+    '''
+    in-process histograms per route and per dependency (upstream services, cache, jwt)
+    '''
+
+    def __init__(self):
+        self.routes: Dict[str, LatencyHistogram] = {}
+        self.dependencies: Dict[str, LatencyHistogram] = {}
+
+    @staticmethod
+    def __observe(histograms: Dict[str, LatencyHistogram], name: str, secs: float):
+        histogram = histograms.get(name, None)
+        if histogram is None:
+            histogram = histograms[name] = LatencyHistogram()
+        histogram.observe(secs)
+
+    def observe_route(self, route: str, secs: float):
+        self.__observe(self.routes, route, secs)
+
+    def observe_dependency(self, name: str, secs: float):
+        self.__observe(self.dependencies, name, secs)
+
+    def snapshot(self) -> (Dict[str, Dict]):
+        return {
+            'routes': {name: h.snapshot() for name, h in sorted(self.routes.items())},
+            'dependencies': {name: h.snapshot() for name, h in sorted(self.dependencies.items())},
+        }
+
+    def clear(self):
+        self.routes.clear()
+        self.dependencies.clear()
+
+
+latencies = LatencyRegistry()
+
+
+class RequestTiming:
+    '''
+    the dependency calls of one request: name -> (total secs, calls);
+    tasks spawned by the request share it, concurrent calls add up
+    '''
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: Dict[str, List[float]] = {}
+
+    def add(self, name: str, secs: float):
+        entry = self.entries.get(name, None)
+        if entry is None:
+            self.entries[name] = [secs, 1]
+        else:
+            entry[0] += secs
+            entry[1] += 1
+
+    def elapsed(self) -> (float):
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> (str):
+        '''
+        e.g. `upstream_auth;dur=41.2;desc="1 call", dynamodb;dur=12.8;desc="2 calls", total;dur=60.3`
+        '''
+        metrics = []
+        for name, (secs, calls) in self.entries.items():
+            desc = f'{int(calls)} call' + ('' if calls == 1 else 's')
+            metrics.append(f'{name};dur={secs * 1000:.1f};desc="{desc}"')
+        metrics.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+request_timing: ContextVar[Optional[RequestTiming]] = ContextVar('request_timing', default=None)
+
+_INVALID_TOKEN_CHARS = re.compile(r'[^A-Za-z0-9_.\-]')
+
+
+def metric_name(name: str) -> (str):
+    # a Server-Timing metric name is an http token
+    return _INVALID_TOKEN_CHARS.sub('_', name)
+
+
+def record(name: str, secs: float):
+    '''
+    one dependency call: into the current request's timing (if any) and the histograms
+    '''
+    name = metric_name(name)
+    timing = request_timing.get()
+    if timing is not None:
+        timing.add(name, secs)
+    latencies.observe_dependency(name, secs)
+
+
+@contextmanager
+def timed(name: str):
+    before = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - before)
+
+
+class TimingMiddleware:
+    '''
+    ASGI middleware: a request-scoped timing collects the dependency calls,
+    the response carries them in `Server-Timing` and the route histogram
+    gets the total time (until the response is sent)
+    '''
+
+    def __init__(self, app: Any, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+        self.__route_paths: Dict[Any, str] = {}
+
+    def route_name(self, scope: Dict) -> (str):
+        # the path template of the matched route, e.g. `POST /api/v1/auth/login`
+        endpoint = scope.get('endpoint', None)
+        if endpoint is None:
+            return 'unmatched'
+
+        path = self.__route_paths.get(endpoint, None)
+        if path is None:
+            app = scope.get('app', None)
+            for route in getattr(app, 'routes', []):
+                if getattr(route, 'endpoint', None) is endpoint:
+                    path = self.__route_paths[endpoint] = route.path
+                    break
+        return f'{scope.get("method", "")} {path or endpoint.__name__}'
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = request_timing.set(timing)
+
+        async def send_with_timing(message: Dict):
+            if message['type'] == 'http.response.start' and self.server_timing:
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', timing.server_timing().encode('latin-1')))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            latencies.observe_route(self.route_name(scope), timing.elapsed())
+            request_timing.reset(token)
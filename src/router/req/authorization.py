@@ -1,15 +1,19 @@
 import os
 import time
 import uuid
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Callable, List, Union
+from typing import Callable, Dict, List, Optional, Union
 import jwt as jwt_util
 from fastapi import APIRouter, FastAPI, Header, Path, Query, Body, Request, Response, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.routing import APIRoute
-from ...config.conf import JWT_SECRET, JWT_ALGORITHM, TOKEN_EXPIRE_TIME, SHORT_TERM_TTL
+from ...config.conf import JWT_SECRET, JWT_ALGORITHM, TOKEN_EXPIRE_TIME, TOKEN_VERIFY_CACHE_SIZE, SHORT_TERM_TTL
 from ...config.exception import *
 from ...infra.util.time_util import *
+from ...infra.util.timing import timed
 import logging as log
 
 log.basicConfig(level=log.INFO)
@@ -91,6 +95,78 @@ def __jwt_decode(jwt, key, msg):
         raise UnauthorizedException(msg=msg)
 
 
+class VerifiedTokenCache:
+    '''
+    bounded LRU of verified claims keyed by the token digest, an entry lives
+    until the token's 'exp' so a hit skips the HMAC check and the JSON decoding.
+    the caller still checks user_id (and expiry) on the returned claims.
+    sync dependencies run in the threadpool, hence the lock
+    '''
+
+    def __init__(self, max_size: int = TOKEN_VERIFY_CACHE_SIZE):
+        self.max_size = max_size
+        self.__entries: OrderedDict[bytes, Dict] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> (int):
+        return len(self.__entries)
+
+    def digest(self, token: str) -> (bytes):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> (Optional[Dict]):
+        if self.max_size <= 0:
+            return None
+
+        key = self.digest(token)
+        with self.__lock:
+            data = self.__entries.get(key, None)
+            if data is None:
+                return None
+
+            # PyJWT rejects the token once exp <= now
+            if current_seconds() >= int(data['exp']):
+                del self.__entries[key]
+                return None
+
+            self.__entries.move_to_end(key)
+            return data
+
+    def put(self, token: str, data: Dict):
+        if self.max_size <= 0 or not 'exp' in data:
+            return
+
+        key = self.digest(token)
+        with self.__lock:
+            self.__entries[key] = data
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def __decode_verified(jwt, user_id, msg):
+    '''
+    decode with the user's secret unless the same token was verified before;
+    only tokens of the user are remembered, the claims are read-only
+    '''
+    data = verified_tokens.get(jwt)
+    if data is not None:
+        return data
+
+    with timed('jwt'):
+        data = __jwt_decode(jwt=jwt, key=__get_secret(user_id), msg=msg)
+    if __valid_user_id(data, user_id):
+        verified_tokens.put(jwt, data)
+    return data
+
+
 def __valid_user_id(data: dict, user_id):
     if not 'user_id' in data:
         return False
@@ -104,14 +180,13 @@ def __outdated_token(data: dict) -> (bool):
     
     future_time_in_secs = int(data['exp'])
     current_time_in_secs = current_seconds()
-    log.info('\n\n\noutdated?? future_time_in_secs: %d, current_time_in_secs: %d', future_time_in_secs, current_time_in_secs)
-    return not 'exp' in data or current_seconds() > future_time_in_secs
+    log.debug('outdated?? future_time_in_secs: %d, current_time_in_secs: %d', future_time_in_secs, current_time_in_secs)
+    return current_time_in_secs > future_time_in_secs
 
 
 def __verify_token_in_auth(user_id: int, credentials: HTTPAuthorizationCredentials, err_msg: str):
-    secret = __get_secret(user_id)
     token = parse_token(credentials)
-    data = __jwt_decode(jwt=token, key=secret, msg=err_msg)
+    data = __decode_verified(jwt=token, user_id=user_id, msg=err_msg)
 
     if not __valid_user_id(data, user_id) or __outdated_token(data):
         raise UnauthorizedException(msg=err_msg)
@@ -122,8 +197,7 @@ async def verify_token(request: Request):
     user_id = get_user_id(url_path)
     
     token = await parse_token_from_request(request)
-    secret = __get_secret(user_id)
-    data = __jwt_decode(jwt=token, key=secret, msg=f'invalid user')
+    data = __decode_verified(jwt=token, user_id=user_id, msg=f'invalid user')
     if not __valid_user_id(data, user_id):
         raise UnauthorizedException(msg=f'invalid user')
 
@@ -1,7 +1,9 @@
+import hashlib
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from typing import Optional, Any, Dict
 from pydantic import create_model, BaseModel
+from ...infra.util.json_util import dumps
 
 # ref: https://github.com/tiangolo/fastapi/issues/3737
 def idempotent_response(route: str, model: Any) -> (Dict):
@@ -22,8 +24,17 @@ def post_response(route: str, model: Any) -> (Dict):
     return responses
 
 
+class FastJSONResponse(JSONResponse):
+    '''
+    orjson when installed; pydantic models and enums are written as-is
+    '''
+
+    def render(self, content: Any) -> (bytes):
+        return dumps(content)
+
+
 def post_success(data=None, msg='ok', code='0'):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={
             'code': code,
@@ -33,7 +44,7 @@ def post_success(data=None, msg='ok', code='0'):
 
 
 def res_success(data=None, msg='ok', code='0'):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             'code': code,
@@ -42,6 +53,70 @@ def res_success(data=None, msg='ok', code='0'):
         })
 
 
+def res_serialized(body: bytes, status_code=status.HTTP_200_OK):
+    # body: a {code, msg, data} json serialized beforehand
+    return Response(
+        status_code=status_code,
+        content=body,
+        media_type='application/json',
+    )
+
+
+def etag_of(body: bytes) -> (str):
+    # strong ETag: any change of the body bytes changes it
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matched(if_none_match: Optional[str], etag: str) -> (bool):
+    if not if_none_match or not etag:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    # If-None-Match uses the weak comparison (RFC 7232)
+    etag = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def single_etag(if_none_match: Optional[str]) -> (Optional[str]):
+    '''
+    the entity tag of an If-None-Match naming exactly one, else None (a list or `*`)
+    '''
+    if not if_none_match:
+        return None
+
+    tags = [tag.strip() for tag in if_none_match.split(',') if tag.strip()]
+    if len(tags) != 1 or tags[0] == '*':
+        return None
+    return tags[0]
+
+
+def res_not_modified(etag: Optional[str]):
+    # the ETag header is left out unless the version is known
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={'ETag': etag} if etag else None,
+    )
+
+
+def res_conditional(if_none_match: Optional[str], data=None, msg='ok', code='0', etag: str = None):
+    '''
+    200 with an ETag, or 304 without body when the client's If-None-Match matches;
+    `etag`: the version supplied upstream, else the hash of the response body
+    '''
+    if etag_matched(if_none_match, etag):
+        return res_not_modified(etag)
+
+    response = res_success(data=data, msg=msg, code=code)
+    etag = etag or etag_of(response.body)
+    if etag_matched(if_none_match, etag):
+        return res_not_modified(etag)
+
+    response.headers['ETag'] = etag
+    return response
+
+
 def res_err_format(data=None, msg='error', code='1'):
     return {
         'code': code,
@@ -18,8 +18,6 @@ import logging as log
 
 log.basicConfig(filemode='w', level=log.INFO)
 
-auth_host = get_auth_region_host()
-user_host = get_user_region_host()
 _auth_service = AuthService(
     service_client, 
     gw_cache,
@@ -36,7 +34,7 @@ router = APIRouter(
 async def signup(
     body: SignupDTO = Body(...),
 ):
-    data = await _auth_service.signup(auth_host, body)
+    data = await _auth_service.signup(get_auth_region_host(), body)
     return post_success(data=data, msg='email_sent')
 
 
@@ -44,7 +42,7 @@ async def signup(
 async def signup_email_resend(
     email: EmailStr = Body(..., embed=True),
 ):
-    data = await _auth_service.signup_email_resend(auth_host, email)
+    data = await _auth_service.signup_email_resend(get_auth_region_host(), email)
     return post_success(data=data, msg='Verification email has been resent successfully.')
 
 
@@ -54,7 +52,7 @@ async def signup_email_resend(
 async def confirm_signup(
     token: str = Body(..., embed=True),
 ):
-    data = await _auth_service.confirm_signup(auth_host, token)
+    data = await _auth_service.confirm_signup(get_auth_region_host(), token)
     return post_success(data=data, msg='Confirming successful signup.')
 
 
@@ -64,7 +62,7 @@ async def confirm_signup(
 async def login(
     body: LoginDTO = Depends(login_check_body),
 ):
-    data = await _auth_service.login(auth_host, user_host, body)
+    data = await _auth_service.login(get_auth_region_host(), get_user_region_host(), body)
     return post_success(data=data)
 
 
@@ -91,7 +89,7 @@ async def update_password(
     update_password_dto: UpdatePasswordDTO = Body(...),
     verify=Depends(verify_token_by_update_password),
 ):
-    await _auth_service.update_password(auth_host, user_id, update_password_dto)
+    await _auth_service.update_password(get_auth_region_host(), user_id, update_password_dto)
     return res_success(msg='update success')
 
 
@@ -99,7 +97,7 @@ async def update_password(
 async def send_reset_password_comfirm_email(
     email: EmailStr,
 ):
-    data = await _auth_service.send_reset_password_comfirm_email(auth_host, email)
+    data = await _auth_service.send_reset_password_comfirm_email(get_auth_region_host(), email)
     return res_success(data=data, msg='send_email_success')
 
 
@@ -108,5 +106,5 @@ async def reset_password(
     reset_passwrod_dto: ResetPasswordDTO = Body(...),
     verify_token: str = Query(...),
 ):
-    await _auth_service.reset_passwrod(auth_host, verify_token, reset_passwrod_dto)
+    await _auth_service.reset_passwrod(get_auth_region_host(), verify_token, reset_passwrod_dto)
     return res_success(msg='reset success')
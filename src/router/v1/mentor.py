@@ -1,12 +1,13 @@
 from typing import List
 from fastapi import (
     APIRouter,
-    Path, Body
+    Request, Header, Path, Body
 )
-from httpx import Response
 
-from ...domain.mentor.mentor_service import MentorService
-from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from ...config.mentor import mentor_service as _mentor_service
+from ...config.service_client import stream_proxy
+from ...domain.mentor.mentor_service import user_service_url
+from ...config.taxonomy import taxonomy_service
 from ...domain.mentor.model import (
     mentor_model as mentor,
     experience_model as experience,
@@ -18,7 +19,6 @@ from ..res.response import *
 from ...config.constant import *
 from ...config.exception import *
 import logging as log
-import httpx
 
 log.basicConfig(filemode='w', level=log.INFO)
 
@@ -27,24 +27,17 @@ router = APIRouter(
     tags=['Mentor'],
     responses={404: {'description': 'Not found'}},
 )
-_mentor_service = MentorService(
-    AsyncServiceApiAdapter(),
-    None
-)
-# Resquest obj is used to access router path
+
+# pass-through route: the validated body is forwarded to the user service, its response streamed back
 @router.put('/{user_id}/profile',
             responses=idempotent_response('upsert_mentor_profile', mentor.MentorProfileVO))
+@stream_proxy.pass_through(on_complete=lambda user_id, **_: _mentor_service.invalidate_profile(user_id))
 async def upsert_mentor_profile(
         request: Request,
         user_id: int = Path(...),
         body: mentor.MentorProfileDTO = Body(...),
 ):
-    router_path = request.url.path
-    res: mentor.MentorProfileVO = None
-    req_url = MENTOR_ROUTER_URL + router_path
-    async with httpx.AsyncClient() as client:
-        res = await client.get(req_url)
-    return res_success(data=res)
+    return user_service_url(f'{MENTORS}/{user_id}/profile')
 
 
 @router.get('/{user_id}/profile',
@@ -52,8 +45,13 @@ async def upsert_mentor_profile(
 async def get_mentor_profile(
         request: Request,
         user_id: int = Path(...),
+        if_none_match: str = Header(None),
 ):
-    return await _mentor_service.get_mentor_profile(user_id)
+    res = await _mentor_service.get_mentor_profile(user_id, if_none_match)
+    if res.status_code == status.HTTP_304_NOT_MODIFIED:
+        # without the upstream's ETag only a single matched tag is known
+        return res_not_modified(res.etag or single_etag(if_none_match))
+    return res_conditional(if_none_match, data=res.data, etag=res.etag)
 
 
 @router.put('/{user_id}/experiences/{experience_type}',
@@ -83,8 +81,8 @@ async def delete_experience(
 async def get_expertises(
         # category = ProfessionCategory.EXPERTISE = Query(...),
 ):
-    # TODO: implement
-    return res_success(data=None)
+    body = await taxonomy_service.get_body(ProfessionCategory.EXPERTISE)
+    return res_serialized(body)
 
 
 @router.put('/{user_id}/schedule',
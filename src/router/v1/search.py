@@ -10,15 +10,30 @@ from ...domain.mentor.model import (
 from ...domain.search.model import (
     search_model as search,
 )
+from ...domain.search.search_service import SearchService
 from ..res.response import *
 from ...config.conf import *
 from ...config.constant import *
 from ...config.exception import *
+from ...config.region_host import get_search_region_host
+from ...config.service_client import service_client
+from ...config.mentor import mentor_service
+from ...config.prefetch import prefetcher
 import logging as log
 
 log.basicConfig(filemode='w', level=log.INFO)
 
 
+_search_service = SearchService(
+    service_client,
+    get_search_region_host,
+    ttl=SEARCH_PAGE_TTL,
+    max_size=SEARCH_PAGE_CACHE_SIZE,
+    prefetcher=prefetcher,
+    prefetch=PREFETCH,
+    warm_profile=mentor_service.warm_profile,
+)
+
 router = APIRouter(
     prefix='/mentors',
     tags=['Search Mentors'],
@@ -26,7 +41,6 @@ router = APIRouter(
 )
 
 
-# TODO: read from SEARCH service
 @router.get('',
             responses=idempotent_response('mentor_list', search.SearchMentorProfileListVO))
 async def mentor_list(
@@ -40,7 +54,6 @@ async def mentor_list(
     sorting: Sorting = Query(Sorting.DESC),
     next_id: int = Query(None),
 ):
-    # TODO: implement
     query = search.SearchMentorProfileDTO(
         search_patterns=search_patterns,
         filter_positions=filter_positions,
@@ -52,7 +65,8 @@ async def mentor_list(
         sorting=sorting,
         next_id=next_id,
     )
-    return res_success(data=None)
+    body = await _search_service.get_page_body(query)
+    return res_serialized(body)
 
 
 # TODO: read from professional service
@@ -60,9 +74,10 @@ async def mentor_list(
             responses=idempotent_response('get_mentor', mentor.MentorProfileVO))
 async def get_mentor(
     user_id: int = Path(...),
+    if_none_match: str = Header(None),
 ):
     # TODO: implement
-    return res_success(data=None)
+    return res_conditional(if_none_match, data=None)
 
 
 # TODO: read from professional service
@@ -7,19 +7,39 @@ from fastapi import (
     Request, Depends,
     Header, Path, Query, Body, Form
 )
+from fastapi.responses import StreamingResponse
 from ...domain.user.model import (
     common_model as common,
     user_model as user,
     reservation_model as reservation,
 )
+from ...domain.user.home_service import HomeService
+from ...domain.reservation.reservation_export import ReservationExportService, MEDIA_TYPES
 from ..res.response import *
+from ...config.conf import HOME_SECTION_DEADLINE, BATCH, SCHEDULE_YEAR, EXPORT_BATCH
 from ...config.constant import *
+from ...config.region_host import get_user_region_host, get_search_region_host
+from ...config.service_client import service_client
+from ...config.taxonomy import taxonomy_service
 from ...config.exception import *
 import logging as log
 
 log.basicConfig(filemode='w', level=log.INFO)
 
 
+_home_service = HomeService(
+    service_client,
+    get_user_region_host,
+    get_search_region_host,
+    deadline=HOME_SECTION_DEADLINE,
+    batch=BATCH,
+)
+_reservation_export = ReservationExportService(
+    service_client,
+    get_user_region_host,
+    batch=EXPORT_BATCH,
+)
+
 router = APIRouter(
     prefix='/users',
     tags=['User'],
@@ -41,9 +61,24 @@ async def upsert_profile(
             responses=idempotent_response('get_profile', user.ProfileVO))
 async def get_profile(
     user_id: int = Path(...),
+    if_none_match: str = Header(None),
 ):
     # TODO: implement
-    return res_success(data=None)
+    return res_conditional(if_none_match, data=None)
+
+
+@router.get('/{user_id}/home')
+async def get_home(
+    user_id: int = Path(...),
+    year: int = Query(SCHEDULE_YEAR),
+):
+    '''
+    profile, mentor profile, upcoming reservations and schedule in one response,
+    a section which is slow or fails has no data and tells its status
+    '''
+    sections = await _home_service.get_home(user_id, year)
+    msg = 'ok' if HomeService.complete(sections) else 'partial'
+    return res_success(data={'sections': sections}, msg=msg)
 
 
 @router.get('/interests',
@@ -51,8 +86,8 @@ async def get_profile(
 async def get_interests(
     interest: InterestCategory = Query(...),
 ):
-    # TODO: implement
-    return res_success(data=None)
+    body = await taxonomy_service.get_body(interest)
+    return res_serialized(body)
 
 
 @router.get('/industries',
@@ -60,8 +95,8 @@ async def get_interests(
 async def get_industries(
     # category = ProfessionCategory.INDUSTRY = Query(...),
 ):
-    # TODO: implement
-    return res_success(data=None)
+    body = await taxonomy_service.get_body(ProfessionCategory.INDUSTRY)
+    return res_serialized(body)
 
 
 @router.get('/{user_id}/reservations',
@@ -76,6 +111,24 @@ async def reservation_list(
     return res_success(data=None)
 
 
+@router.get('/{user_id}/reservations/export')
+async def export_reservations(
+    user_id: int = Path(...),
+    state: ReservationListState = Query(ReservationListState.HISTORY),
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+):
+    '''
+    every reservation of `state` in one streamed response, one row per reservation
+    '''
+    rows = await _reservation_export.open(user_id, state, format)
+    filename = f'reservations-{user_id}-{state.value}.{format.value}'
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
 @router.post('/{user_id}/reservations',
              responses=post_response('new_booking', reservation.ReservationVO))
 async def new_booking(
@@ -0,0 +1,304 @@
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from botocore.exceptions import ClientError
+from starlette.requests import Request
+
+'''
+local stand-ins of the upstream services, shared by tests and benchmarks
+'''
+
+
+def ok_body(data: Any = None) -> (Dict):
+    return {'code': '0', 'msg': 'ok', 'data': data}
+
+
+# (method, path, query) -> (status_code, body, delay_secs)
+UpstreamHandler = Callable[[str, str, Dict], Tuple[int, Any, float]]
+
+
+def echo_handler(method: str, path: str, query: Dict) -> (Tuple[int, Any, float]):
+    return 200, ok_body({'method': method, 'path': path, 'query': query}), 0
+
+
+class UpstreamStandIn:
+    '''
+    an upstream service (auth/user/search) speaking HTTP/1.1 with keep-alive,
+    served by its own event loop in a background thread.
+    every response follows the service envelope {code, msg, data}
+    '''
+
+    def __init__(self, handler: UpstreamHandler = echo_handler):
+        self.handler = handler
+        self.port = 0
+        self.calls = 0
+        self.connections = 0
+        # (method, target, headers, body) of every request
+        self.received: list = []
+        self.__lock = threading.Lock()
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__started = threading.Event()
+
+    @property
+    def url(self) -> (str):
+        return f'http://127.0.0.1:{self.port}'
+
+    async def __read_request(self, reader: asyncio.StreamReader):
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, _ = lines[0].split(' ', 2)
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                k, v = line.split(':', 1)
+                headers[k.strip().lower()] = v.strip()
+        length = int(headers.get('content-length', '0'))
+        body = await reader.readexactly(length) if length else b''
+        return method, target, headers, body
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        with self.__lock:
+            self.connections += 1
+        try:
+            while True:
+                try:
+                    method, target, headers, body = await self.__read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+
+                with self.__lock:
+                    self.calls += 1
+                    self.received.append((method, target, headers, body))
+                split = urlsplit(target)
+                query = {k: v if len(v) > 1 else v[0]
+                         for k, v in parse_qs(split.query).items()}
+                status_code, res_body, delay = self.handler(method, split.path, query)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                payload = res_body if isinstance(res_body, bytes) else json.dumps(res_body).encode()
+                writer.write(
+                    f'HTTP/1.1 {status_code} X\r\n'
+                    'content-type: application/json\r\n'
+                    f'content-length: {len(payload)}\r\n'
+                    '\r\n'.encode() + payload)
+                await writer.drain()
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def __run(self):
+        self.__loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.__loop)
+        self.__server = self.__loop.run_until_complete(
+            asyncio.start_server(self.__serve, '127.0.0.1', 0))
+        self.port = self.__server.sockets[0].getsockname()[1]
+        self.__started.set()
+        self.__loop.run_forever()
+        self.__server.close()
+        tasks = asyncio.all_tasks(self.__loop)
+        for task in tasks:
+            task.cancel()
+        self.__loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.__loop.close()
+
+    def start(self) -> ('UpstreamStandIn'):
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+        if not self.__started.wait(timeout=10):
+            raise RuntimeError('upstream stand-in did not start')
+        return self
+
+    def stop(self):
+        if self.__loop:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+        if self.__thread:
+            self.__thread.join(timeout=10)
+
+    def __enter__(self) -> ('UpstreamStandIn'):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ServiceApiStandIn:
+    '''
+    in-process IServiceApi, `handler(method, url, body)` returns the `data` of the response
+    '''
+
+    def __init__(self, handler: Callable[[str, str, Any], Any], latency: float = 0):
+        self.handler = handler
+        self.latency = latency
+        self.requests: list = []
+
+    async def __call(self, method: str, url: str, body: Any):
+        self.requests.append((method, url))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.handler(method, url, body)
+
+    async def simple_get(self, url: str, params: Dict = None, headers: Dict = None):
+        return await self.__call('GET', url, params)
+
+    async def simple_post(self, url: str, json: Dict, headers: Dict = None):
+        return await self.__call('POST', url, json)
+
+    async def simple_put(self, url: str, json: Dict = None, headers: Dict = None):
+        return await self.__call('PUT', url, json)
+
+    async def simple_delete(self, url: str, params: Dict = None, headers: Dict = None):
+        return await self.__call('DELETE', url, params)
+
+
+class DynamoDbStandIn:
+    '''
+    blocking in-memory stand-in of the low-level DynamoDB client,
+    `latency` emulates the network round trip of every call,
+    the first `throttled_batches` batch calls leave half of their items unprocessed
+    '''
+
+    def __init__(self, latency: float = 0, throttled_batches: int = 0):
+        self.latency = latency
+        self.throttled_batches = throttled_batches
+        self.tables: Dict[str, Dict[str, Dict]] = {}
+        self.calls: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def __call(self, op: str):
+        with self.__lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def round_trips(self) -> (int):
+        return sum(self.calls.values())
+
+    def table(self, name: str) -> (Dict[str, Dict]):
+        with self.__lock:
+            return self.tables.setdefault(name, {})
+
+    def get_item(self, TableName: str, Key: Dict, ProjectionExpression: str = None,
+                 ExpressionAttributeNames: Dict = None, **kwargs):
+        self.__call('get_item')
+        item = self.table(TableName).get(Key['cache_key']['S'], None)
+        if not item:
+            return {}
+        if ProjectionExpression:
+            names = ExpressionAttributeNames or {}
+            attrs = [names.get(a.strip(), a.strip()) for a in ProjectionExpression.split(',')]
+            item = {k: v for k, v in item.items() if k in attrs}
+        return {'Item': copy.deepcopy(item)}
+
+    def update_item(self, TableName: str, Key: Dict, UpdateExpression: str,
+                    ExpressionAttributeNames: Dict = None, ExpressionAttributeValues: Dict = None,
+                    ConditionExpression: str = None, ReturnValues: str = 'NONE', **kwargs):
+        # ADD/DELETE on string sets and SET, applied atomically
+        self.__call('update_item')
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        key = Key['cache_key']['S']
+        with self.__lock:
+            table = self.tables.setdefault(TableName, {})
+            if ConditionExpression == 'attribute_exists(cache_key)' and not key in table:
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException',
+                                            'Message': 'The conditional request failed'}}, 'UpdateItem')
+
+            item = table.setdefault(key, copy.deepcopy(Key))
+            old = {}
+            for action, name, value in re.findall(r'(ADD|DELETE|SET) (\S+) (?:= )?(\S+)', UpdateExpression):
+                attr = names.get(name, name)
+                if attr in item:
+                    old[attr] = copy.deepcopy(item[attr])
+                if action == 'SET':
+                    item[attr] = values[value]
+                    continue
+
+                members = set(item.get(attr, {}).get('SS', []))
+                if action == 'ADD':
+                    members |= set(values[value]['SS'])
+                else:
+                    members -= set(values[value]['SS'])
+                if members:
+                    item[attr] = {'SS': sorted(members)}
+                else:
+                    item.pop(attr, None)
+
+        return {'Attributes': old} if ReturnValues == 'UPDATED_OLD' else {}
+
+    def put_item(self, TableName: str, Item: Dict, **kwargs):
+        self.__call('put_item')
+        self.table(TableName)[Item['cache_key']['S']] = copy.deepcopy(Item)
+        return {}
+
+    def delete_item(self, TableName: str, Key: Dict, **kwargs):
+        self.__call('delete_item')
+        self.table(TableName).pop(Key['cache_key']['S'], None)
+        return {}
+
+    def __throttle(self, requests: list) -> (Tuple[list, list]):
+        with self.__lock:
+            throttled = self.throttled_batches > 0 and len(requests) > 1
+            if throttled:
+                self.throttled_batches -= 1
+        if not throttled:
+            return requests, []
+        half = len(requests) // 2
+        return requests[:half], requests[half:]
+
+    def batch_get_item(self, RequestItems: Dict, **kwargs):
+        self.__call('batch_get_item')
+        responses, unprocessed = {}, {}
+        for name, request in RequestItems.items():
+            keys = [key['cache_key']['S'] for key in request['Keys']]
+            if len(keys) != len(set(keys)):
+                raise ValueError('Provided list of item keys contains duplicates')
+            processed, rest = self.__throttle(request['Keys'])
+            table = self.table(name)
+            responses[name] = [copy.deepcopy(table[key['cache_key']['S']])
+                               for key in processed if key['cache_key']['S'] in table]
+            if rest:
+                unprocessed[name] = {'Keys': rest}
+        return {'Responses': responses, 'UnprocessedKeys': unprocessed}
+
+    def batch_write_item(self, RequestItems: Dict, **kwargs):
+        self.__call('batch_write_item')
+        unprocessed = {}
+        for name, requests in RequestItems.items():
+            processed, rest = self.__throttle(requests)
+            table = self.table(name)
+            for request in processed:
+                if 'PutRequest' in request:
+                    item = request['PutRequest']['Item']
+                    table[item['cache_key']['S']] = copy.deepcopy(item)
+                else:
+                    table.pop(request['DeleteRequest']['Key']['cache_key']['S'], None)
+            if rest:
+                unprocessed[name] = rest
+        return {'UnprocessedItems': unprocessed}
+
+
+def dynamodb_resource(client: DynamoDbStandIn):
+    # the adapters only use `resource.meta.client`
+    return SimpleNamespace(meta=SimpleNamespace(client=client))
+
+
+def new_request(user_id: int, token: str) -> (Request):
+    # a protected route of the user, with the session token
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': f'/v1/mentors/{user_id}/a/b/{user_id}',
+        'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+    })
@@ -0,0 +1,52 @@
+import asyncio
+from src.infra.client.async_http_client_pool import AsyncHttpClientPool
+from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from testing.stand_in import UpstreamStandIn
+
+
+def test_client_is_shared_per_origin():
+    pool = AsyncHttpClientPool()
+
+    async def run():
+        a = pool.get_client('http://localhost:8008/auth-service/api/v1/login')
+        b = pool.get_client('http://localhost:8008/auth-service/api/v1/signup')
+        c = pool.get_client('http://localhost:8009/user-service/api')
+        await pool.aclose()
+        return a, b, c
+
+    a, b, c = asyncio.run(run())
+    assert a is b
+    assert a is not c
+    assert len(pool) == 0
+
+
+def test_clients_are_recreated_on_a_new_event_loop():
+    pool = AsyncHttpClientPool()
+    pool.open(['http://localhost:8008/auth-service/api'])
+    first = asyncio.run(_get_client(pool))
+    # pre-opened clients are adopted by the first loop
+    assert len(pool) == 1
+    second = asyncio.run(_get_client(pool))
+    assert first is not second
+
+
+async def _get_client(pool: AsyncHttpClientPool):
+    return pool.get_client('http://localhost:8008/auth-service/api')
+
+
+def test_adapter_reuses_keepalive_connection():
+    with UpstreamStandIn() as upstream:
+        pool = AsyncHttpClientPool()
+        adapter = AsyncServiceApiAdapter(pool)
+
+        async def run():
+            results = []
+            for i in range(3):
+                results.append(await adapter.simple_get(f'{upstream.url}/v1/users/{i}'))
+            await pool.aclose()
+            return results
+
+        results = asyncio.run(run())
+        assert [r['path'] for r in results] == ['/v1/users/0', '/v1/users/1', '/v1/users/2']
+        assert upstream.calls == 3
+        assert upstream.connections == 1
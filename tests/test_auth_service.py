@@ -0,0 +1,117 @@
+import asyncio
+import time
+from typing import Any, Dict
+from src.config.exception import ServerException, NotFoundException
+from src.domain.auth.model.auth_model import SignupDTO, LoginDTO
+from src.domain.auth.service.auth_service import AuthService
+from src.infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
+from testing.stand_in import DynamoDbStandIn, ServiceApiStandIn, dynamodb_resource
+
+
+def new_service(responses: Dict[str, Any], latency: float = 0, login_user_profile: bool = False):
+    client = DynamoDbStandIn(latency=latency)
+    cache = DynamoDbCacheAdapter(dynamodb_resource(client), table='cache')
+
+    def handler(method: str, url: str, body: Any):
+        res = responses[url]
+        if isinstance(res, Exception):
+            raise res
+        return dict(res)
+
+    req = ServiceApiStandIn(handler, latency=latency)
+    return AuthService(req, cache, login_user_profile=login_user_profile), client
+
+
+LOGIN_RESPONSES = {
+    'auth/v1/login': {'user_id': 1, 'region': 'jp', 'email': 'user@example.com'},
+    'user/v1/users/1/profile': {'user_id': 1, 'name': 'user'},
+}
+LOGIN_BODY = LoginDTO(email='user@example.com', password='secret')
+
+
+def run_safe(coro):
+    # http exceptions are returned, they do not survive asyncio.run
+    async def run():
+        try:
+            return await coro
+        except Exception as e:
+            return e
+    return asyncio.run(run())
+
+
+def test_signup_round_trips():
+    service, client = new_service({
+        'auth/v1/signup/email': {'token': 'signup-token'},
+        'auth/v1/signup': {'user_id': 1, 'region': 'jp', 'email': 'user@example.com'},
+    })
+    body = SignupDTO(email='user@example.com', password='secret', confirm_password='secret')
+
+    async def run():
+        await service.signup('auth', body)
+        signup_calls = dict(client.calls)
+        res = await service.confirm_signup('auth', 'signup-token')
+        return signup_calls, res
+
+    signup_calls, res = asyncio.run(run())
+    # check + one batched write of token and email
+    assert signup_calls == {'get_item': 1, 'batch_write_item': 1}
+    # confirm: read token, one batched delete, cache auth
+    assert client.calls == {'get_item': 2, 'batch_write_item': 2, 'put_item': 1}
+    assert res['auth']['user_id'] == 1 and 'token' in res['auth']
+    assert not 'signup-token' in client.table('cache')
+
+
+def test_login_writes_the_session_and_fetches_the_profile_concurrently():
+    latency = 0.05
+    service, client = new_service(LOGIN_RESPONSES, latency=latency, login_user_profile=True)
+
+    async def run():
+        before = time.perf_counter()
+        res = await service.login('auth', 'user', LOGIN_BODY)
+        return res, time.perf_counter() - before
+
+    res, elapsed = asyncio.run(run())
+    assert res['user'] == {'user_id': 1, 'name': 'user'}
+    assert 'token' in res['auth']
+    assert '1' in client.table('cache')
+    # login, then cache write and profile side by side: 2 round trips rather than 3
+    assert elapsed < 3 * latency
+
+
+def test_login_without_profile_when_its_fetch_fails():
+    service, _ = new_service(dict(LOGIN_RESPONSES, **{
+        'user/v1/users/1/profile': ServerException(msg='get_connection_error'),
+    }), login_user_profile=True)
+    res = run_safe(service.login('auth', 'user', LOGIN_BODY))
+    assert res['user'] is None and 'token' in res['auth']
+
+
+def test_login_fails_when_the_session_is_not_cached():
+    service, _ = new_service(LOGIN_RESPONSES, login_user_profile=True)
+
+    async def not_updated(*args, **kwargs):
+        return False
+    service.cache.set = not_updated
+
+    res = run_safe(service.login('auth', 'user', LOGIN_BODY))
+    assert isinstance(res, ServerException)
+
+
+def test_confirm_signup_cleans_up_when_the_signup_fails():
+    service, client = new_service({
+        'auth/v1/signup/email': {'token': 'signup-token'},
+        'auth/v1/signup': NotFoundException(msg='not_found'),
+    })
+    body = SignupDTO(email='user@example.com', password='secret', confirm_password='secret')
+
+    async def run():
+        await service.signup('auth', body)
+        try:
+            return await service.confirm_signup('auth', 'signup-token')
+        except Exception as e:
+            return e
+
+    res = asyncio.run(run())
+    assert isinstance(res, NotFoundException)
+    assert not 'signup-token' in client.table('cache')
+    assert not 'user@example.com' in client.table('cache')
@@ -0,0 +1,61 @@
+import asyncio
+from testing.stand_in import new_request
+from src.config.exception import UnauthorizedException
+from src.router.req import authorization
+from src.router.req.authorization import VerifiedTokenCache, gen_token, verify_token, verified_tokens
+
+
+def counting_decode(monkeypatch):
+    calls = []
+    decode = authorization.jwt_util.decode
+
+    def count(*args, **kwargs):
+        calls.append(args)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(authorization.jwt_util, 'decode', count)
+    return calls
+
+
+def test_verify_token_decodes_once_per_session(monkeypatch):
+    verified_tokens.clear()
+    calls = counting_decode(monkeypatch)
+    token = gen_token({'user_id': 7, 'region': 'jp'}, ['region', 'user_id'])
+
+    async def run():
+        for _ in range(3):
+            await verify_token(new_request(7, token))
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_verify_token_rejects_other_user_on_hit(monkeypatch):
+    verified_tokens.clear()
+    token = gen_token({'user_id': 7, 'region': 'jp'}, ['region', 'user_id'])
+
+    async def run():
+        await verify_token(new_request(7, token))
+        try:
+            await verify_token(new_request(8, token))
+            return False
+        except UnauthorizedException:
+            return True
+
+    assert asyncio.run(run())
+
+
+def test_verified_token_cache_drops_expired_and_lru(monkeypatch):
+    cache = VerifiedTokenCache(max_size=2)
+    monkeypatch.setattr(authorization, 'current_seconds', lambda: 100)
+    cache.put('a', {'user_id': '1', 'exp': 100})
+    cache.put('b', {'user_id': '1', 'exp': 101})
+    cache.put('no-exp', {'user_id': '1'})
+    # expired at exp, as PyJWT does
+    assert cache.get('a') is None
+    assert cache.get('b') == {'user_id': '1', 'exp': 101}
+    assert cache.get('no-exp') is None
+
+    cache.put('c', {'user_id': '1', 'exp': 200})
+    cache.put('d', {'user_id': '1', 'exp': 200})
+    assert len(cache) == 2 and cache.get('b') is None
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+
+def test_import_creates_no_aws_resource():
+    probe = '\n'.join([
+        'import sys, main',
+        'from src.config import dynamodb, s3',
+        "assert getattr(dynamodb, '__dynamodb') is None",
+        "assert getattr(s3, '__s3_resource') is None",
+        "assert not 'requests' in sys.modules",
+    ])
+    env = dict(os.environ, TESTING='ci', AWS_DEFAULT_REGION='ap-northeast-1')
+    subprocess.run([sys.executable, '-c', probe], env=env, check=True)
@@ -0,0 +1,99 @@
+import httpx
+from fastapi.testclient import TestClient
+from src.app.template.service_response import ServiceApiResponse
+from src.router.res.response import etag_matched, res_conditional
+from src.router.v1 import mentor
+import main
+
+
+class VersionedUpstream:
+    '''
+    the user service: answers 304 to a matching If-None-Match when `version` is set
+    '''
+
+    def __init__(self, version: str = None):
+        self.version = version
+        self.requests = []
+
+    async def get(self, url: str, params=None, headers=None):
+        headers = headers or {}
+        self.requests.append(headers)
+        etag = {'ETag': self.version} if self.version else {}
+        if self.version and headers.get('If-None-Match', None) == self.version:
+            return ServiceApiResponse.parse(httpx.Response(304, headers=etag))
+        return ServiceApiResponse.parse(httpx.Response(200, json={'data': {'user_id': 1}}, headers=etag))
+
+
+def test_res_conditional():
+    res = res_conditional(None, data={'a': 1})
+    etag = res.headers['etag']
+    assert res.status_code == 200 and etag.startswith('"')
+    assert res_conditional(etag, data={'a': 1}).status_code == 304
+    assert res_conditional(etag, data={'a': 2}).status_code == 200
+    assert etag_matched(f'"x", W/{etag}', etag)
+    assert etag_matched('*', etag)
+
+
+def test_versioned_upstream_skips_the_body(monkeypatch):
+    upstream = VersionedUpstream('"v7"')
+    monkeypatch.setattr(mentor._mentor_service, 'service_api', upstream)
+    # uncached profiles: the If-None-Match goes upstream
+    monkeypatch.setattr(mentor._mentor_service, 'profile_ttl', 0)
+    client = TestClient(main.app)
+
+    first = client.get('/api/v1/mentors/1/profile')
+    assert first.status_code == 200 and first.headers['etag'] == '"v7"'
+    assert first.json()['data'] == {'user_id': 1}
+
+    second = client.get('/api/v1/mentors/1/profile', headers={'If-None-Match': '"v7"'})
+    assert second.status_code == 304 and second.content == b''
+    assert second.headers['etag'] == '"v7"'
+    assert upstream.requests[-1] == {'If-None-Match': '"v7"'}
+
+
+def test_unversioned_upstream_uses_body_hash(monkeypatch):
+    monkeypatch.setattr(mentor._mentor_service, 'service_api', VersionedUpstream())
+    monkeypatch.setattr(mentor._mentor_service, 'profile_ttl', 0)
+    client = TestClient(main.app)
+
+    etag = client.get('/api/v1/mentors/1/profile').headers['etag']
+    assert client.get('/api/v1/mentors/1/profile', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/v1/mentors/1/profile', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_cached_profile_is_matched_locally(monkeypatch):
+    upstream = VersionedUpstream('"v7"')
+    monkeypatch.setattr(mentor._mentor_service, 'service_api', upstream)
+    monkeypatch.setattr(mentor._mentor_service, 'profile_ttl', 30)
+    mentor._mentor_service.profiles.clear()
+    client = TestClient(main.app)
+
+    assert client.get('/api/v1/mentors/1/profile').status_code == 200
+    second = client.get('/api/v1/mentors/1/profile', headers={'If-None-Match': '"v7"'})
+    assert second.status_code == 304 and second.headers['etag'] == '"v7"'
+    assert client.get('/api/v1/mentors/1/profile').json()['data'] == {'user_id': 1}
+    assert len(upstream.requests) == 1
+    mentor._mentor_service.profiles.clear()
+
+
+class UntaggedNotModifiedUpstream:
+    '''
+    answers 304 to any If-None-Match, without an ETag
+    '''
+
+    async def get(self, url: str, params=None, headers=None):
+        if (headers or {}).get('If-None-Match', None):
+            return ServiceApiResponse.parse(httpx.Response(304))
+        return ServiceApiResponse.parse(httpx.Response(200, json={'data': {'user_id': 1}}))
+
+
+def test_not_modified_sends_only_a_known_etag(monkeypatch):
+    monkeypatch.setattr(mentor._mentor_service, 'service_api', UntaggedNotModifiedUpstream())
+    monkeypatch.setattr(mentor._mentor_service, 'profile_ttl', 0)
+    client = TestClient(main.app)
+
+    single = client.get('/api/v1/mentors/1/profile', headers={'If-None-Match': '"v7"'})
+    assert single.status_code == 304 and single.headers['etag'] == '"v7"'
+    for if_none_match in ['"a", "b"', '*']:
+        res = client.get('/api/v1/mentors/1/profile', headers={'If-None-Match': if_none_match})
+        assert res.status_code == 304 and not 'etag' in res.headers
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from src.config.conf import DYNAMODB_MAX_ATTEMPTS
+from src.config.exception import ServerException
+from src.infra.cache import dynamodb_cache_adapter
+from src.infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
+from src.infra.util.time_util import current_seconds
+from testing.stand_in import DynamoDbStandIn, dynamodb_resource
+
+
+def new_cache(latency: float = 0):
+    client = DynamoDbStandIn(latency=latency)
+    return DynamoDbCacheAdapter(dynamodb_resource(client), table='cache'), client
+
+
+def test_set_get_delete():
+    cache, client = new_cache()
+
+    async def run():
+        assert await cache.set('user@example.com', {'token': 'abc'}, ex=8)
+        assert await cache.set('abc', 'user@example.com')
+        data = await cache.get('user@example.com', True)
+        email = await cache.get('abc')
+        await cache.delete('abc')
+        return data, email, await cache.get('abc')
+
+    data, email, deleted = asyncio.run(run())
+    assert data['token'] == 'abc'
+    assert current_seconds() < data['ttl'] <= current_seconds() + 8
+    assert email == 'user@example.com'
+    assert deleted is None
+
+
+def test_calls_do_not_block_the_event_loop():
+    cache, client = new_cache(latency=0.05)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        before = time.perf_counter()
+        await asyncio.gather(*[cache.get(f'key-{i}') for i in range(10)])
+        elapsed = time.perf_counter() - before
+        task.cancel()
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(run())
+    # 10 round trips of 50ms overlap instead of running back to back
+    assert elapsed < 0.3
+    assert ticks > 5
+
+
+def test_client_is_created_off_the_event_loop():
+    client = DynamoDbStandIn()
+    threads = []
+
+    def get_dynamodb():
+        threads.append(threading.current_thread())
+        return dynamodb_resource(client)
+
+    cache = DynamoDbCacheAdapter(get_dynamodb, table='cache')
+    asyncio.run(cache.set('abc', 'user@example.com'))
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    assert client.calls == {'put_item': 1}
+
+
+def test_batch_operations_retry_unprocessed_items():
+    client = DynamoDbStandIn(throttled_batches=2)
+    cache = DynamoDbCacheAdapter(dynamodb_resource(client), table='cache')
+    mapping = {f'key-{i}': {'i': i} for i in range(30)}
+
+    async def run():
+        assert await cache.mset(mapping, ex=8)
+        found = await cache.mget(list(mapping) + ['key-0', 'missing'], True)
+        await cache.mdelete(list(mapping))
+        return found, await cache.mget(list(mapping))
+
+    found, deleted = asyncio.run(run())
+    assert set(found) == set(mapping)
+    assert found['key-3']['i'] == 3 and 'ttl' in found['key-3']
+    assert deleted == {}
+    # 30 writes = 2 chunks, +2 retries of the throttled halves
+    assert client.calls['batch_write_item'] == 2 + 2 + 2
+    assert client.calls['batch_get_item'] == 2
+
+
+def test_no_backoff_after_the_last_attempt(monkeypatch):
+    client = DynamoDbStandIn(throttled_batches=100)
+    cache = DynamoDbCacheAdapter(dynamodb_resource(client), table='cache')
+    backoffs = []
+    monkeypatch.setattr(dynamodb_cache_adapter.random, 'uniform', lambda a, b: backoffs.append(b) or 0)
+
+    async def run():
+        try:
+            # half of the items are left each time, more than the attempts can write
+            await cache.mset({f'key-{i}': {'i': i} for i in range(2 ** (DYNAMODB_MAX_ATTEMPTS + 1))})
+        except ServerException as e:
+            return e
+
+    assert isinstance(asyncio.run(run()), ServerException)
+    assert client.calls['batch_write_item'] == DYNAMODB_MAX_ATTEMPTS + 1
+    assert len(backoffs) == DYNAMODB_MAX_ATTEMPTS
+
+
+def test_set_operations_are_atomic():
+    cache, client = new_cache(latency=0.01)
+
+    async def run():
+        added = await asyncio.gather(*[cache.sadd('followers', [i, 'same'], ex=60) for i in range(50)])
+        members = await cache.smembers('followers')
+        removed = [await cache.srem('followers', 3), await cache.srem('followers', 3),
+                   await cache.srem('missing', 3)]
+        return added, members, removed, await cache.sismember('followers', 4), \
+            await cache.sismember('followers', 3)
+
+    added, members, removed, is_member, was_removed = asyncio.run(run())
+    # no lost update under concurrent writers
+    assert members == set(str(i) for i in range(50)) | {'same'}
+    assert sum(added) == 51
+    assert removed == [1, 0, 0]
+    assert is_member and not was_removed
+    assert not 'missing' in client.table('cache')
+    assert client.calls['update_item'] == 53
@@ -0,0 +1,156 @@
+import asyncio
+import time
+import httpx
+from src.config.exception import ServerException
+from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from src.infra.client.hedging import Hedger, LatencyTracker
+from testing.stand_in import UpstreamStandIn, ok_body
+
+
+def slow_path_handler(slow: str, delay: float):
+    # only the first request of `slow` stalls, a hedge of it answers at once
+    seen = set()
+
+    def handler(method: str, path: str, query):
+        if path == slow and path not in seen:
+            seen.add(path)
+            return 200, ok_body({'path': path}), delay
+        return 200, ok_body({'path': path}), 0
+    return handler
+
+
+def run(adapter: AsyncServiceApiAdapter, fn):
+    async def main():
+        try:
+            return await fn()
+        except ServerException as e:
+            return e
+        finally:
+            await adapter.client_pool.aclose()
+    return asyncio.run(main())
+
+
+async def warm_up(adapter: AsyncServiceApiAdapter, url: str, n: int = 20):
+    for i in range(n):
+        await adapter.simple_get(f'{url}/v1/users/{i}')
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(percentile=90, refresh=1)
+    for i in range(1, 101):
+        tracker.record(i / 1000)
+    assert len(tracker) == 100
+    assert tracker.value() == 0.091
+
+
+def test_no_hedge_before_enough_samples():
+    hedger = Hedger(min_samples=20)
+    assert hedger.delay() is None
+    for _ in range(20):
+        hedger.latency.record(0.001)
+    assert hedger.delay() == hedger.min_delay
+
+
+def warmed_hedger() -> (Hedger):
+    hedger = Hedger(min_delay=0.02, min_samples=20)
+    for _ in range(20):
+        hedger.latency.record(0.001)
+    return hedger
+
+
+def test_unavailable_answer_loses_to_an_attempt_in_flight():
+    hedger = warmed_hedger()
+    attempts = []
+
+    async def request():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            # the primary is slow, then fails fast after the hedge started
+            await asyncio.sleep(0.05)
+            return httpx.Response(503)
+        await asyncio.sleep(0.06)
+        return httpx.Response(200)
+
+    res = asyncio.run(hedger.run(request))
+    assert res.status_code == 200
+    assert hedger.hedge_wins == 1
+
+
+def test_unavailable_answer_is_returned_when_nothing_else_answers():
+    hedger = warmed_hedger()
+
+    async def request():
+        await asyncio.sleep(0.03)
+        return httpx.Response(503)
+
+    assert asyncio.run(hedger.run(request)).status_code == 503
+    assert hedger.hedged == 1 and hedger.hedge_wins == 0
+
+
+def test_latency_of_every_attempt_is_recorded():
+    hedger = warmed_hedger()
+    attempts = []
+
+    async def request():
+        attempts.append(len(attempts))
+        await asyncio.sleep(1 if len(attempts) == 1 else 0)
+        return httpx.Response(200)
+
+    async def main():
+        res = await hedger.run(request)
+        # the cancelled primary records its time until the cancel
+        await asyncio.sleep(0)
+        return res
+
+    assert asyncio.run(main()).status_code == 200
+    assert len(hedger.latency) == 20 + 2
+
+
+def test_slow_get_is_hedged_and_first_answer_wins():
+    with UpstreamStandIn(slow_path_handler('/v1/users/slow', 2)) as upstream:
+        adapter = AsyncServiceApiAdapter(hedge=True, hedge_min_delay=0.02)
+
+        async def fn():
+            await warm_up(adapter, upstream.url)
+            before = time.perf_counter()
+            res = await adapter.simple_get(f'{upstream.url}/v1/users/slow')
+            return res, time.perf_counter() - before
+
+        res, elapsed = run(adapter, fn)
+        assert res == {'path': '/v1/users/slow'}
+        assert elapsed < 1
+        assert upstream.calls == 22
+        hedge = adapter.stats()[adapter.host(upstream.url)]['hedge']
+        assert hedge['hedged'] == 1
+        assert hedge['hedge_wins'] == 1
+
+
+def test_hedges_are_bounded_by_the_budget():
+    with UpstreamStandIn(lambda method, path, query: (200, ok_body(None), 0.1)) as upstream:
+        adapter = AsyncServiceApiAdapter(hedge=True, hedge_min_delay=0.001, hedge_budget_ratio=0)
+        hedger = adapter.hedger(upstream.url)
+        # every attempt looks slow next to the recorded latencies
+        for _ in range(20):
+            hedger.latency.record(0.001)
+
+        async def burst():
+            return await asyncio.gather(*[adapter.simple_get(f'{upstream.url}/v1/users/{i}')
+                                          for i in range(10)])
+
+        run(adapter, burst)
+        stats = hedger.stats()
+        assert stats['hedged'] == hedger.budget.reserve
+        assert stats['budget']['exhausted'] == 10 - hedger.budget.reserve
+        assert upstream.calls == 10 + hedger.budget.reserve
+
+
+def test_writes_are_never_hedged():
+    with UpstreamStandIn(lambda method, path, query: (201, ok_body(None), 0.05)) as upstream:
+        adapter = AsyncServiceApiAdapter(hedge=True, hedge_min_delay=0.001)
+        hedger = adapter.hedger(upstream.url)
+        for _ in range(20):
+            hedger.latency.record(0.001)
+
+        run(adapter, lambda: adapter.simple_post(f'{upstream.url}/v1/users', json={}))
+        assert upstream.calls == 1
+        assert hedger.hedged == 0
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Any, Dict
+from src.config.exception import NotFoundException
+from src.domain.user.home_service import HomeService, SECTIONS, OK, TIMEOUT, ERROR
+
+
+class SectionUpstream:
+    '''
+    simple_get answers `data` of the first matching path suffix after its delay
+    '''
+
+    def __init__(self, paths: Dict[str, Any]):
+        self.paths = paths
+        self.requests = []
+
+    async def simple_get(self, url: str, params: Dict = None, headers: Dict = None):
+        self.requests.append((url, params))
+        for suffix, (delay, data) in self.paths.items():
+            if url.endswith(suffix):
+                await asyncio.sleep(delay)
+                if isinstance(data, Exception):
+                    raise data
+                return data
+        raise NotFoundException(msg='not_found')
+
+
+def upstream(**overrides) -> (SectionUpstream):
+    paths = {
+        '/users/1/profile': (0.05, {'name': 'user'}),
+        '/mentors/1/profile': (0.05, {'position': 'engineer'}),
+        '/users/1/reservations': (0.05, {'reservations': [], 'next_id': None}),
+        '/mentors/1/schedule': (0.05, {'timeslots': []}),
+    }
+    paths.update(overrides)
+    return SectionUpstream(paths)
+
+
+def get_home(service: HomeService):
+    async def run():
+        before = time.perf_counter()
+        sections = await service.get_home(1)
+        return sections, time.perf_counter() - before
+    return asyncio.run(run())
+
+
+def test_sections_are_fetched_concurrently():
+    req = upstream()
+    service = HomeService(req, 'http://user/api', lambda: 'http://search/api', deadline=1)
+    sections, elapsed = get_home(service)
+
+    assert list(sections) == SECTIONS
+    assert HomeService.complete(sections)
+    assert sections['profile']['data'] == {'name': 'user'}
+    assert sections['schedule']['data'] == {'timeslots': []}
+    assert ('http://search/api/v1/mentors/1/schedule', {'year': -1, 'batch': 10, 'next_id': 0}) in req.requests
+    # bounded by the slowest section, not the sum
+    assert elapsed < 0.15
+
+
+def test_slow_section_is_cut_at_its_deadline():
+    req = upstream(**{'/mentors/1/schedule': (2, {'timeslots': []})})
+    service = HomeService(req, 'http://user/api', 'http://search/api', deadline=1,
+                          deadlines={'schedule': 0.1})
+    sections, elapsed = get_home(service)
+
+    assert sections['schedule']['status'] == TIMEOUT
+    assert sections['schedule']['data'] is None
+    assert sections['profile']['status'] == OK
+    assert not HomeService.complete(sections)
+    assert elapsed < 0.5
+
+
+def test_failed_section_keeps_the_others():
+    req = upstream(**{'/mentors/1/profile': (0, NotFoundException(msg='not a mentor'))})
+    service = HomeService(req, 'http://user/api', 'http://search/api')
+    sections, _ = get_home(service)
+
+    assert sections['mentor_profile'] == {'status': ERROR, 'data': None, 'code': '40400',
+                                          'ms': sections['mentor_profile']['ms']}
+    assert sections['reservations']['status'] == OK
@@ -0,0 +1,26 @@
+import json
+from src.config.constant import ProfessionCategory
+from src.domain.user.model.common_model import ProfessionListVO
+from src.infra.util import json_util
+from src.router.res.response import res_success
+
+
+def professions() -> (ProfessionListVO):
+    return ProfessionListVO(professions=[
+        {'id': 1, 'category': ProfessionCategory.INDUSTRY, 'subject': '金融', 'metadata': {}},
+    ])
+
+
+def test_envelope_with_models_and_enums():
+    res = res_success(data=professions())
+    assert res.headers['content-type'] == 'application/json'
+    assert json.loads(res.body) == {'code': '0', 'msg': 'ok', 'data': {'professions': [
+        {'id': 1, 'category': 'industry', 'subject': '金融', 'metadata': {}},
+    ]}}
+
+
+def test_stdlib_fallback_renders_the_same(monkeypatch):
+    content = {'code': '0', 'msg': 'ok', 'data': professions()}
+    fast = json_util.dumps(content)
+    monkeypatch.setattr(json_util, 'orjson', None)
+    assert json_util.dumps(content) == fast
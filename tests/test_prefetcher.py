@@ -0,0 +1,83 @@
+import asyncio
+from src.domain.search.model.search_model import SearchMentorProfileDTO
+from src.domain.search.search_service import SearchService
+from src.infra.util.prefetcher import Prefetcher
+from testing.stand_in import ServiceApiStandIn
+
+
+def test_concurrency_is_bounded_and_keys_are_deduplicated():
+    prefetcher = Prefetcher(concurrency=2, max_pending=4)
+    running = {'now': 0, 'max': 0}
+
+    async def warm():
+        running['now'] += 1
+        running['max'] = max(running['max'], running['now'])
+        await asyncio.sleep(0.01)
+        running['now'] -= 1
+
+    async def run():
+        scheduled = [prefetcher.schedule(i % 5, warm) for i in range(10)]
+        await prefetcher.drain()
+        return scheduled
+
+    scheduled = asyncio.run(run())
+    # keys 0-3 scheduled, key 4 dropped past max_pending (twice), repeats skipped
+    assert scheduled[:5] == [True, True, True, True, False]
+    assert not any(scheduled[5:])
+    assert running['max'] == 2
+    assert prefetcher.stats() == {'pending': 0, 'scheduled': 4, 'done': 4, 'failed': 0,
+                                  'dropped': 2, 'cancelled': 0}
+
+
+def test_cancel_drops_pending_tasks():
+    prefetcher = Prefetcher(concurrency=1)
+    finished = []
+
+    async def warm(i):
+        await asyncio.sleep(0.05)
+        finished.append(i)
+
+    async def run():
+        for i in range(3):
+            prefetcher.schedule(i, lambda i=i: warm(i))
+        await asyncio.sleep(0)
+        cancelled = prefetcher.cancel()
+        await asyncio.sleep(0.1)
+        return cancelled
+
+    assert asyncio.run(run()) == 3
+    assert finished == []
+    assert len(prefetcher) == 0
+
+
+def paged_upstream(method: str, url: str, params):
+    # 5 pages of 2 mentors each
+    next_id = int(dict(params).get('next_id', 0))
+    mentors = [{'user_id': next_id + 1}, {'user_id': next_id + 2}]
+    return {'mentors': mentors, 'next_id': next_id + 2 if next_id < 8 else None}
+
+
+def test_search_page_prefetches_next_pages_and_top_profiles():
+    req = ServiceApiStandIn(paged_upstream)
+    warmed = []
+
+    async def warm_profile(user_id):
+        warmed.append(user_id)
+
+    prefetcher = Prefetcher()
+    service = SearchService(req, 'search', ttl=30, prefetcher=prefetcher, prefetch=3,
+                            warm_profile=warm_profile)
+
+    async def run():
+        await service.get_page_body(SearchMentorProfileDTO(filter_skills=['go']))
+        await prefetcher.drain()
+        # the user scrolls through the prefetched pages
+        for next_id in (2, 4, 6):
+            await service.get_page_body(SearchMentorProfileDTO(filter_skills=['go'], next_id=next_id))
+            await prefetcher.drain()
+
+    asyncio.run(run())
+    assert service.stats()['hits'] == 3 and service.stats()['misses'] == 1
+    assert sorted(set(warmed)) == [1, 2, 3, 4, 5, 6, 7, 8]
+    # the first page, then one upstream call per page, never twice
+    assert len(req.requests) == 5
@@ -0,0 +1,61 @@
+import asyncio
+from fakeredis import aioredis
+from src.infra.cache.redis_cache_adapter import RedisCacheAdapter
+from src.infra.util.time_util import current_seconds
+
+
+def new_cache():
+    return RedisCacheAdapter(aioredis.FakeRedis(decode_responses=True))
+
+
+def test_get_set_with_native_ttl():
+    cache = new_cache()
+
+    async def run():
+        assert await cache.set('user@example.com', {'token': 'abc'}, ex=8)
+        assert await cache.set('abc', 'user@example.com')
+        data = await cache.get('user@example.com', True)
+        email = await cache.get('abc', True)
+        await cache.delete('abc')
+        return data, email, await cache.get('abc'), await cache.redis.ttl('user@example.com')
+
+    data, email, deleted, ttl_secs = asyncio.run(run())
+    assert data['token'] == 'abc'
+    assert current_seconds() < data['ttl'] <= current_seconds() + 8
+    assert email == 'user@example.com'
+    assert deleted is None
+    assert 0 < ttl_secs <= 8
+
+
+def test_multi_key_operations():
+    cache = new_cache()
+    mapping = {f'key-{i}': {'i': i} for i in range(5)}
+
+    async def run():
+        assert await cache.mset(mapping, ex=60)
+        found = await cache.mget(list(mapping) + ['missing'], True)
+        await cache.mdelete(list(mapping))
+        return found, await cache.mget(list(mapping))
+
+    found, deleted = asyncio.run(run())
+    assert set(found) == set(mapping)
+    assert found['key-1']['i'] == 1 and 'ttl' in found['key-1']
+    assert deleted == {}
+
+
+def test_native_set_operations():
+    cache = new_cache()
+
+    async def run():
+        added = await asyncio.gather(*[cache.sadd('followers', [i, 'same'], ex=60) for i in range(20)])
+        members = await cache.smembers('followers')
+        removed = [await cache.srem('followers', 3), await cache.srem('followers', 3)]
+        return added, members, removed, await cache.sismember('followers', 4), \
+            await cache.smembers('missing')
+
+    added, members, removed, is_member, missing = asyncio.run(run())
+    assert sum(added) == 21
+    assert members == set(str(i) for i in range(20)) | {'same'}
+    assert removed == [1, 0]
+    assert is_member
+    assert missing is None
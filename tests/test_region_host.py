@@ -0,0 +1,99 @@
+import asyncio
+import time
+from src.config.region_host import get_auth_region_host, auth_region_hosts, auth_registry
+from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from src.infra.client.region_host_registry import RegionHostRegistry
+from testing.stand_in import UpstreamStandIn, ok_body
+
+
+HOSTS = {
+    'default': 'http://default:80/api',
+    'jp': 'http://jp:80/api',
+    'us': 'http://us:80/api',
+}
+
+
+def warmed_registry(**kwargs) -> (RegionHostRegistry):
+    registry = RegionHostRegistry('test', HOSTS, alpha=0.5, **kwargs)
+    for host, secs in (('default', 0.05), ('jp', 0.01), ('us', 0.03)):
+        registry.record(f'{HOSTS[host]}/v1/users', secs, True)
+    return registry
+
+
+def test_unmeasured_hosts_get_no_live_traffic():
+    registry = RegionHostRegistry('test', HOSTS, refresh_secs=0.05)
+    assert registry.pick() == HOSTS['default']
+    registry.record(f'{HOSTS["default"]}/v1/x', 0.05, True)
+    assert registry.pick() == HOSTS['default']
+    # measured by a call addressed to jp
+    registry.record(f'{HOSTS["jp"]}/v1/x', 0.01, True)
+    assert registry.pick() == HOSTS['jp']
+    # a stale measurement is not trusted
+    time.sleep(0.06)
+    assert registry.pick() == HOSTS['default']
+
+
+def test_fastest_healthy_host_is_picked():
+    registry = warmed_registry()
+    assert registry.pick() == HOSTS['jp']
+    # jp slows down, traffic shifts to us
+    for _ in range(5):
+        registry.record(f'{HOSTS["jp"]}/v1/users', 0.2, True)
+    assert registry.pick() == HOSTS['us']
+
+
+def test_failing_host_is_ejected_then_tried_again():
+    registry = warmed_registry(eject_failures=2, eject_secs=0.05)
+    for _ in range(2):
+        registry.record(f'{HOSTS["jp"]}/v1/users', 0.001, False)
+    assert registry.pick() == HOSTS['us']
+    assert registry.stats()[HOSTS['jp']]['ejected']
+
+    time.sleep(0.06)
+    assert registry.pick() == HOSTS['jp']
+
+
+def test_fallback_to_default_when_no_host_is_healthy():
+    registry = warmed_registry(eject_failures=1)
+    for host in ('default', 'jp', 'us'):
+        registry.record(f'{HOSTS[host]}/v1/users', 0.001, False)
+    assert registry.pick() == HOSTS['default']
+
+
+def test_foreign_urls_are_ignored():
+    registry = warmed_registry()
+    assert not registry.record('http://elsewhere/v1/users', 1, False)
+
+
+def test_explicit_region():
+    assert get_auth_region_host('jp') == auth_region_hosts['jp']
+    assert get_auth_region_host('unknown') == auth_region_hosts['default']
+
+
+def test_auth_flows_stay_on_the_default_host(monkeypatch):
+    monkeypatch.setattr(auth_registry, 'pick', lambda: 'http://picked')
+    assert get_auth_region_host() == auth_region_hosts['default']
+
+
+def test_traffic_feeds_the_registry():
+    ok = lambda delay: (lambda method, path, query: (200, ok_body(None), delay))
+    with UpstreamStandIn(ok(0.05)) as slow, UpstreamStandIn(ok(0)) as fast:
+        registry = RegionHostRegistry('test', {'default': slow.url, 'jp': fast.url})
+        adapter = AsyncServiceApiAdapter()
+        adapter.add_listener(lambda url, secs, ok: registry.record(url, secs, ok))
+
+        async def run():
+            try:
+                for _ in range(2):
+                    await adapter.simple_get(f'{registry.pick()}/v1/users/1')
+                # a call addressed to the jp region measures it
+                await adapter.simple_get(f'{registry.get("jp")}/v1/users/1')
+                for _ in range(2):
+                    await adapter.simple_get(f'{registry.pick()}/v1/users/1')
+            finally:
+                await adapter.client_pool.aclose()
+
+        asyncio.run(run())
+        assert registry.pick() == fast.url
+        assert slow.calls == 2
+        assert fast.calls == 3
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from src.config.constant import ExportFormat, ReservationListState
+from src.config.exception import ServerException
+from src.domain.reservation.reservation_export import ReservationExportService, CSV_COLUMNS
+from src.router.v1 import user
+from testing.stand_in import ServiceApiStandIn
+import main
+
+
+def history_upstream(pages: int, batch: int = 2):
+    def handler(method: str, url: str, params):
+        next_id = params.get('next_id', 0)
+        reservations = [{
+            'id': next_id + i,
+            'schedule_id': 7,
+            'participant': {'user_id': 2, 'role': 'mentor', 'name': 'mentor, 2'},
+            'my_status': 'accept',
+            'start_datetime': 100,
+            'end_datetime': 200,
+            'message': None,
+        } for i in range(batch)]
+        last = next_id + batch >= pages * batch
+        return {'reservations': reservations, 'next_id': None if last else next_id + batch}
+    return handler
+
+
+def test_cursor_is_walked_and_the_next_page_fetched_ahead():
+    req = ServiceApiStandIn(history_upstream(pages=3), latency=0.01)
+    service = ReservationExportService(req, 'user', batch=2)
+
+    async def run():
+        rows = await service.open(1, ReservationListState.HISTORY, ExportFormat.NDJSON)
+        lines = []
+        async for line in rows:
+            # writing the line yields to the loop, the next page is already requested
+            await asyncio.sleep(0)
+            lines.append((line, len(req.requests)))
+        return lines
+
+    lines = asyncio.run(run())
+    ids = [json.loads(line)['id'] for line, _ in lines]
+    assert ids == [0, 1, 2, 3, 4, 5]
+    assert [requests for _, requests in lines] == [2, 2, 3, 3, 3, 3]
+    assert len(req.requests) == 3
+
+
+def test_export_route_streams_csv(monkeypatch):
+    req = ServiceApiStandIn(history_upstream(pages=2))
+    monkeypatch.setattr(user._reservation_export, 'req', req)
+    client = TestClient(main.app)
+
+    res = client.get('/api/v1/users/1/reservations/export', params={'format': 'csv'})
+    assert res.status_code == 200
+    assert res.headers['content-type'].startswith('text/csv')
+    assert 'reservations-1-history.csv' in res.headers['content-disposition']
+    lines = res.text.splitlines()
+    assert lines[0] == ','.join(CSV_COLUMNS)
+    assert lines[1] == '0,7,2,mentor,"mentor, 2",accept,100,200,'
+    assert len(lines) == 5
+
+
+def failing_upstream(pages: int, fail_at: int, batch: int = 2):
+    handler = history_upstream(pages, batch)
+
+    def fail(method: str, url: str, params):
+        if params.get('next_id', 0) == fail_at:
+            raise ServerException(msg='get_connection_error')
+        return handler(method, url, params)
+    return fail
+
+
+def test_later_page_failure_aborts_the_stream():
+    req = ServiceApiStandIn(failing_upstream(pages=3, fail_at=2))
+    service = ReservationExportService(req, 'user', batch=2)
+
+    async def run():
+        lines = []
+        rows = await service.open(1, ReservationListState.HISTORY, ExportFormat.NDJSON)
+        try:
+            async for line in rows:
+                lines.append(line)
+        except ServerException:
+            return lines, True
+        return lines, False
+
+    lines, aborted = asyncio.run(run())
+    assert aborted
+    assert [json.loads(line)['id'] for line in lines] == [0, 1]
+
+
+def test_export_route_does_not_end_a_truncated_export_cleanly(monkeypatch):
+    req = ServiceApiStandIn(failing_upstream(pages=3, fail_at=2))
+    monkeypatch.setattr(user._reservation_export, 'req', req)
+    path = '/api/v1/users/1/reservations/export'
+    event = {
+        'resource': path, 'path': path, 'httpMethod': 'GET',
+        'headers': {'host': 'localhost'}, 'multiValueHeaders': {'host': ['localhost']},
+        'queryStringParameters': {'format': 'csv'}, 'multiValueQueryStringParameters': {'format': ['csv']},
+        'pathParameters': None, 'requestContext': {'resourcePath': path, 'httpMethod': 'GET', 'path': path,
+                                                   'stage': 'test', 'identity': {'sourceIp': '127.0.0.1'}},
+        'body': None, 'isBase64Encoded': False,
+    }
+
+    # the Lambda response is buffered: the aborted export becomes an error, not a short 200
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        res = main.handler(event, None)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+    assert res['statusCode'] == 500
+    assert not ','.join(CSV_COLUMNS) in res['body']
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from src.config.exception import ServerException
+from src.config.service_client import host_timeouts
+from src.infra.client.async_http_client_pool import AsyncHttpClientPool
+from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from src.infra.client.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from testing.stand_in import UpstreamStandIn, ok_body
+
+
+def flaky_handler(failures: int, status_code: int = 503, delay: float = 0):
+    calls = {'n': 0}
+
+    def handler(method: str, path: str, query):
+        calls['n'] += 1
+        if calls['n'] <= failures:
+            return status_code, {'code': str(status_code), 'msg': 'unavailable', 'data': None}, delay
+        return 200 if method == 'GET' else 201, ok_body({'path': path}), 0
+    return handler
+
+
+def call(adapter: AsyncServiceApiAdapter, fn):
+    async def run():
+        try:
+            return await fn()
+        except ServerException as e:
+            return e
+        finally:
+            await adapter.client_pool.aclose()
+    return asyncio.run(run())
+
+
+def test_get_is_retried_with_backoff():
+    with UpstreamStandIn(flaky_handler(2)) as upstream:
+        adapter = AsyncServiceApiAdapter(get_retries=2, retry_base_delay=0.001)
+        res = call(adapter, lambda: adapter.simple_get(f'{upstream.url}/v1/users/1'))
+        assert res == {'path': '/v1/users/1'}
+        assert upstream.calls == 3
+
+
+def test_post_is_not_retried():
+    with UpstreamStandIn(flaky_handler(1)) as upstream:
+        adapter = AsyncServiceApiAdapter(get_retries=2, retry_base_delay=0.001)
+        res = call(adapter, lambda: adapter.simple_post(f'{upstream.url}/v1/users', json={}))
+        assert isinstance(res, ServerException)
+        assert upstream.calls == 1
+
+
+def test_retry_budget_bounds_the_retries():
+    with UpstreamStandIn(flaky_handler(100)) as upstream:
+        adapter = AsyncServiceApiAdapter(get_retries=2, retry_base_delay=0.001,
+                                         retry_budget_ratio=0, retry_budget_reserve=1)
+
+        async def burst():
+            return await asyncio.gather(*[adapter.simple_get(f'{upstream.url}/v1/users/{i}')
+                                          for i in range(10)], return_exceptions=True)
+
+        results = call(adapter, burst)
+        assert all(isinstance(r, ServerException) for r in results)
+        # 10 requests + the single retry of the budget
+        assert upstream.calls == 11
+        assert adapter.stats()[adapter.host(upstream.url)]['retry_budget']['exhausted'] >= 9
+
+
+def test_breaker_fails_fast_then_probes():
+    with UpstreamStandIn(flaky_handler(3)) as upstream:
+        adapter = AsyncServiceApiAdapter(breaker_failures=3, breaker_reset_timeout=0.05)
+        url = f'{upstream.url}/v1/users/1'
+
+        async def run():
+            results = []
+            for _ in range(4):
+                try:
+                    results.append(await adapter.simple_get(url))
+                except ServerException as e:
+                    results.append(e.msg)
+            await asyncio.sleep(0.06)
+            # half open: the probe succeeds and closes the breaker
+            results.append(await adapter.simple_get(url))
+            await adapter.client_pool.aclose()
+            return results
+
+        results = asyncio.run(run())
+        assert results[3] == 'circuit_open'
+        assert results[4] == {'path': '/v1/users/1'}
+        assert upstream.calls == 4
+        stats = adapter.stats()[adapter.host(url)]['breaker']
+        assert stats['state'] == CLOSED and stats['opened'] == 1 and stats['rejected'] == 1
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = CircuitBreaker('host', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_per_host_read_timeout():
+    with UpstreamStandIn(flaky_handler(1, 200, delay=1)) as upstream:
+        port = upstream.url.rsplit(':', 1)[1]
+        pool = AsyncHttpClientPool(host_timeouts=host_timeouts(f'127.0.0.1:{port}=1:0.1'))
+        adapter = AsyncServiceApiAdapter(pool, get_retries=1, retry_base_delay=0.001)
+        before = time.monotonic()
+        res = call(adapter, lambda: adapter.simple_get(f'{upstream.url}/v1/users/1'))
+        # the slow call times out, the retry succeeds
+        assert res == {'path': '/v1/users/1'}
+        assert time.monotonic() - before < 0.8
+
+
+def test_cancelled_probe_does_not_keep_the_breaker_open():
+    delays = {'n': 0.2}
+    handler = lambda method, path, query: (200, ok_body({'path': path}), delays['n'])
+    with UpstreamStandIn(handler) as upstream:
+        adapter = AsyncServiceApiAdapter(breaker_failures=1, breaker_reset_timeout=0)
+        url = f'{upstream.url}/v1/users/1'
+        breaker = adapter.breaker(url)
+
+        async def run():
+            breaker.record_failure()
+            assert breaker.state == OPEN
+            # the probe hits the caller's deadline
+            try:
+                await asyncio.wait_for(adapter.simple_get(url), timeout=0.05)
+            except asyncio.TimeoutError:
+                pass
+            delays['n'] = 0
+            result = await adapter.simple_get(url)
+            await adapter.client_pool.aclose()
+            return result
+
+        assert asyncio.run(run()) == {'path': '/v1/users/1'}
+        assert breaker.state == CLOSED
+
+
+def test_unexpected_error_of_the_probe_reopens_the_breaker(monkeypatch):
+    adapter = AsyncServiceApiAdapter(breaker_failures=1, breaker_reset_timeout=0)
+    url = 'http://127.0.0.1:1/v1/users/1'
+    breaker = adapter.breaker(url)
+    breaker.record_failure()
+
+    def fail(url):
+        raise RuntimeError('unexpected')
+
+    monkeypatch.setattr(adapter.client_pool, 'get_client', fail)
+    res = call(adapter, lambda: adapter.simple_get(url))
+    assert isinstance(res, ServerException)
+    assert breaker.state == OPEN
+    assert breaker.allow() and breaker.state == HALF_OPEN
+
+
+def test_call_deadline_bounds_the_retries():
+    handler = lambda method, path, query: (503, {'code': '503', 'msg': 'unavailable', 'data': None}, 0.3)
+    with UpstreamStandIn(handler) as upstream:
+        adapter = AsyncServiceApiAdapter(get_retries=5, retry_base_delay=0.001, call_deadline=0.5)
+        before = time.perf_counter()
+        res = call(adapter, lambda: adapter.simple_get(f'{upstream.url}/v1/users/1'))
+        elapsed = time.perf_counter() - before
+
+        assert isinstance(res, ServerException)
+        # the second attempt is cut at the deadline, no third one starts
+        assert 0.45 < elapsed < 0.65
+        assert upstream.calls == 2
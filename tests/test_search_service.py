@@ -0,0 +1,57 @@
+import asyncio
+import json
+from src.config.constant import SortingBy, Sorting
+from src.domain.search.model.search_model import SearchMentorProfileDTO
+from src.domain.search.search_service import SearchService, canonical_query
+from testing.stand_in import ServiceApiStandIn
+
+
+def search_upstream(method: str, url: str, params):
+    return {'mentors': [{'user_id': 1}], 'next_id': None, 'query': params}
+
+
+def query(**kwargs) -> (SearchMentorProfileDTO):
+    return SearchMentorProfileDTO(**kwargs)
+
+
+def test_equivalent_queries_share_the_canonical_params():
+    a = query(filter_skills=['python', 'go', 'python'], filter_topics=[' career'], next_id=10)
+    b = query(filter_skills=['go', 'python'], filter_topics=['career', ''],
+              sorting_by=SortingBy.UPDATED_TIME, sorting=Sorting.DESC, next_id=10)
+    assert canonical_query(a) == canonical_query(b) == [
+        ('filter_skills', 'go'), ('filter_skills', 'python'), ('filter_topics', 'career'),
+        ('sorting_by', 'updated_time'), ('sorting', '-1'), ('next_id', '10'),
+    ]
+    assert canonical_query(a) != canonical_query(query(filter_skills=['go', 'python'], next_id=20))
+
+
+def test_pages_are_served_from_cache_until_expired():
+    req = ServiceApiStandIn(search_upstream)
+    service = SearchService(req, lambda: 'search', ttl=0.1)
+
+    async def run():
+        first = await service.get_page_body(query(filter_skills=['python', 'go']))
+        second = await service.get_page_body(query(filter_skills=['go', 'python', 'go']))
+        await asyncio.sleep(0.15)
+        third = await service.get_page_body(query(filter_skills=['go', 'python']))
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third
+    body = json.loads(first)
+    assert body['code'] == '0' and body['data']['mentors'] == [{'user_id': 1}]
+    assert req.requests == [('GET', 'search/v1/mentors')] * 2
+    assert service.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 0.3333, 'pages': 1, 'evictions': 0}
+
+
+def test_page_cache_can_be_disabled():
+    req = ServiceApiStandIn(search_upstream)
+    service = SearchService(req, 'search', ttl=0)
+
+    async def run():
+        for _ in range(3):
+            await service.get_page_body(query())
+
+    asyncio.run(run())
+    assert len(req.requests) == 3
+    assert service.stats()['hit_rate'] is None
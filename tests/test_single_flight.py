@@ -0,0 +1,88 @@
+import asyncio
+from src.config.exception import NotFoundException, ServerException
+from src.infra.client.async_http_client_pool import AsyncHttpClientPool
+from src.infra.client.async_service_api_adapter import AsyncServiceApiAdapter
+from src.infra.client.single_flight import SingleFlight
+from testing.stand_in import UpstreamStandIn, ok_body
+
+
+def slow_handler(method: str, path: str, query):
+    if path.startswith('/missing'):
+        return 404, {'code': '404', 'msg': 'not found', 'data': None}, 0.05
+    return 200, ok_body({'path': path, 'query': query}), 0.05
+
+
+async def burst(adapter: AsyncServiceApiAdapter, urls, params=None):
+    async def one(url):
+        try:
+            return await adapter.simple_get(url, params)
+        except Exception as e:
+            return e
+
+    results = await asyncio.gather(*[one(url) for url in urls])
+    await adapter.client_pool.aclose()
+    return results
+
+
+def test_burst_of_identical_gets_collapses_to_one_call():
+    with UpstreamStandIn(slow_handler) as upstream:
+        adapter = AsyncServiceApiAdapter(AsyncHttpClientPool(), single_flight=True)
+        results = asyncio.run(burst(adapter, [f'{upstream.url}/v1/mentors/1'] * 200))
+
+        assert upstream.calls == 1
+        assert all(r == {'path': '/v1/mentors/1', 'query': {}} for r in results)
+        # every waiter gets its own copy
+        results[0]['path'] = 'changed'
+        assert results[1]['path'] == '/v1/mentors/1'
+        assert adapter.single_flight.shared == 199
+        assert len(adapter.single_flight) == 0
+
+
+def test_distinct_params_are_not_coalesced():
+    with UpstreamStandIn(slow_handler) as upstream:
+        adapter = AsyncServiceApiAdapter(AsyncHttpClientPool(), single_flight=True)
+        url = f'{upstream.url}/v1/mentors'
+
+        async def run():
+            return await asyncio.gather(
+                adapter.simple_get(url, {'size': 10}),
+                adapter.simple_get(url, {'size': 10}),
+                adapter.simple_get(url, {'size': 20}),
+            )
+
+        results = asyncio.run(run())
+        assert upstream.calls == 2
+        assert [r['query']['size'] for r in results] == ['10', '10', '20']
+
+
+def test_errors_reach_every_waiter():
+    with UpstreamStandIn(slow_handler) as upstream:
+        adapter = AsyncServiceApiAdapter(AsyncHttpClientPool(), single_flight=True)
+        results = asyncio.run(burst(adapter, [f'{upstream.url}/missing'] * 20))
+        assert upstream.calls == 1
+        assert all(isinstance(r, NotFoundException) for r in results)
+
+    # nothing listens anymore: connection errors are shared too
+    adapter = AsyncServiceApiAdapter(AsyncHttpClientPool(), single_flight=True)
+    results = asyncio.run(burst(adapter, [f'{upstream.url}/v1/mentors/1'] * 20))
+    assert all(isinstance(r, ServerException) for r in results)
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def run():
+        first = asyncio.ensure_future(flight.do('key', fetch))
+        second = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == ('done', True)
+    assert len(calls) == 1
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.config.service_client import service_client, stream_proxy
+from src.domain.mentor import mentor_service
+from src.router.v1 import mentor
+from testing.stand_in import UpstreamStandIn, ok_body
+import main
+
+
+def raw_handler(method: str, path: str, query):
+    # bytes are sent as is, the proxy must not re-encode them
+    return 200, b'{"code":"0",  "msg":"ok",  "data":{"path":"%s"}}' % path.encode(), 0
+
+
+def test_profile_upsert_is_passed_through(monkeypatch):
+    with UpstreamStandIn(raw_handler) as upstream:
+        monkeypatch.setattr(mentor_service, 'MENTOR_ROUTER_URL', upstream.url)
+        client = TestClient(main.app)
+        body = b'{"about": "mentor", "seniority_level": "senior", "unknown": 1}'
+
+        res = client.put('/api/v1/mentors/1/profile?dry_run=1', data=body, headers={
+            'content-type': 'application/json',
+            'if-match': '"v1"',
+            'cookie': 'session=secret',
+        })
+
+        assert res.status_code == 200
+        assert res.content == b'{"code":"0",  "msg":"ok",  "data":{"path":"/user-service/api/v1/mentors/1/profile"}}'
+        assert res.headers['content-type'] == 'application/json'
+
+        method, target, headers, received = upstream.received[-1]
+        assert (method, target) == ('PUT', '/user-service/api/v1/mentors/1/profile?dry_run=1')
+        # the validated body: the unknown field is dropped, the defaults are set
+        assert headers['content-type'] == 'application/json'
+        assert int(headers['content-length']) == len(received)
+        assert json.loads(received) == {
+            'personal_statement': None, 'about': 'mentor', 'seniority_level': 'senior', 'expertises': [],
+        }
+        assert headers['if-match'] == '"v1"'
+        assert not 'cookie' in headers
+
+
+def test_upstream_status_is_kept(monkeypatch):
+    handler = lambda method, path, query: (404, {'code': '40400', 'msg': 'not found', 'data': None}, 0)
+    with UpstreamStandIn(handler) as upstream:
+        monkeypatch.setattr(mentor_service, 'MENTOR_ROUTER_URL', upstream.url)
+        client = TestClient(main.app)
+
+        res = client.put('/api/v1/mentors/1/profile', json={'about': 'mentor'})
+        assert res.status_code == 404
+        assert res.json()['msg'] == 'not found'
+        method, target, headers, received = upstream.received[-1]
+        assert (method, target) == ('PUT', '/user-service/api/v1/mentors/1/profile')
+        assert not 'transfer-encoding' in headers
+
+
+def test_invalid_requests_are_rejected_before_the_upstream(monkeypatch):
+    with UpstreamStandIn(raw_handler) as upstream:
+        monkeypatch.setattr(mentor_service, 'MENTOR_ROUTER_URL', upstream.url)
+        client = TestClient(main.app)
+
+        assert client.put('/api/v1/mentors/x/profile', json={}).status_code == 422
+        assert client.put('/api/v1/mentors/1/profile', json={'expertises': 'x'}).status_code == 422
+        assert client.put('/api/v1/mentors/1/profile', data=b'not json', headers={
+            'content-type': 'application/json',
+        }).status_code == 422
+        assert upstream.received == []
+
+
+def test_profile_upsert_keeps_its_request_schema():
+    operation = main.app.openapi()['paths']['/api/v1/mentors/{user_id}/profile']['put']
+    schema = operation['requestBody']['content']['application/json']['schema']
+    assert schema['$ref'].endswith('/MentorProfileDTO')
+
+
+def test_get_racing_the_profile_write_is_not_cached(monkeypatch):
+    profile = {'name': 'old'}
+
+    def handler(method: str, path: str, query):
+        if method == 'PUT':
+            profile['name'] = 'new'
+            return 200, ok_body(dict(profile)), 0.05
+        # a read served before the write, answered after it
+        return 200, ok_body(dict(profile)), 0.15 if profile['name'] == 'old' else 0
+
+    with UpstreamStandIn(handler) as upstream:
+        monkeypatch.setattr(mentor_service, 'MENTOR_ROUTER_URL', upstream.url)
+        monkeypatch.setattr(mentor._mentor_service, 'profile_ttl', 30)
+        mentor._mentor_service.profiles.clear()
+        client = TestClient(main.app)
+
+        results = {}
+        read = threading.Thread(target=lambda: results.update(read=client.get('/api/v1/mentors/1/profile')))
+        read.start()
+        time.sleep(0.03)
+        assert client.put('/api/v1/mentors/1/profile', json={'about': 'new'}).status_code == 200
+        read.join()
+
+        assert results['read'].json()['data'] == {'name': 'old'}
+        assert client.get('/api/v1/mentors/1/profile').json()['data'] == {'name': 'new'}
+        mentor._mentor_service.profiles.clear()
+
+
+def test_upstream_failures_reach_the_breaker_and_listeners(monkeypatch):
+    handler = lambda method, path, query: (503, {'code': '50300', 'msg': 'unavailable', 'data': None}, 0)
+    observed = []
+    monkeypatch.setattr(service_client, 'notify', lambda url, secs, ok: observed.append((url, ok)))
+    with UpstreamStandIn(handler) as upstream:
+        monkeypatch.setattr(mentor_service, 'MENTOR_ROUTER_URL', upstream.url)
+        client = TestClient(main.app)
+
+        assert client.put('/api/v1/mentors/1/profile', json={'about': 'mentor'}).status_code == 503
+        assert observed == [(f'{upstream.url}/user-service/api/v1/mentors/1/profile', False)]
+        assert service_client.breaker(upstream.url).failures == 1
+
+
+def test_pass_through_requires_the_request_param():
+    with pytest.raises(TypeError):
+        @stream_proxy.pass_through
+        async def no_request(user_id: int):
+            return ''
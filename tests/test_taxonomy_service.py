@@ -0,0 +1,75 @@
+import asyncio
+import json
+from src.config.constant import InterestCategory, ProfessionCategory
+from src.config.exception import ServerException
+from src.domain.user.taxonomy_service import TaxonomyService
+from testing.stand_in import ServiceApiStandIn
+
+
+def taxonomy_handler(method: str, url: str, params):
+    if url.endswith('/users/interests'):
+        return {'interests': [{'id': 1, 'category': params['interest'], 'subject': 's', 'desc': {}}]}
+    category = 'industry' if url.endswith('/users/industries') else 'expertise'
+    return {'professions': [{'id': 1, 'category': category, 'subject': 's', 'metadata': {}}]}
+
+
+def test_loaded_once_and_served_per_category():
+    req = ServiceApiStandIn(taxonomy_handler)
+    service = TaxonomyService(req, 'user', ttl=3600)
+
+    async def run():
+        await service.load()
+        loaded = len(req.requests)
+        for _ in range(10):
+            skill = await service.get(InterestCategory.SKILL)
+            body = await service.get_body(ProfessionCategory.EXPERTISE)
+        return loaded, skill, body
+
+    loaded, skill, body = asyncio.run(run())
+    assert loaded == len(InterestCategory) + len(ProfessionCategory)
+    assert len(req.requests) == loaded
+    assert skill['interests'][0]['category'] == 'skill'
+    assert json.loads(body) == {'code': '0', 'msg': 'ok', 'data': taxonomy_handler('GET', 'user/v1/mentors/expertises', None)}
+
+
+def test_stale_entry_is_served_while_refreshing():
+    version = {'n': 1}
+    req = ServiceApiStandIn(lambda method, url, params: {'professions': [], 'version': version['n']}, latency=0.02)
+    service = TaxonomyService(req, 'user', ttl=0)
+
+    async def run():
+        first = await service.get(ProfessionCategory.INDUSTRY)
+        version['n'] = 2
+        # stale: served at once, refreshed in the background
+        stale = await service.get(ProfessionCategory.INDUSTRY)
+        stale_again = await service.get(ProfessionCategory.INDUSTRY)
+        await asyncio.sleep(0.05)
+        service.ttl = 3600
+        fresh = await service.get(ProfessionCategory.INDUSTRY)
+        return first, stale, stale_again, fresh
+
+    first, stale, stale_again, fresh = asyncio.run(run())
+    assert (first['version'], stale['version'], stale_again['version'], fresh['version']) == (1, 1, 1, 2)
+    # one initial load + a single refresh
+    assert len(req.requests) == 2
+
+
+def test_failed_refresh_keeps_the_entry():
+    fail = {'on': False}
+
+    def handler(method, url, params):
+        if fail['on']:
+            raise ServerException(msg='get_connection_error')
+        return {'professions': []}
+
+    service = TaxonomyService(ServiceApiStandIn(handler), 'user', ttl=0)
+
+    async def run():
+        first = await service.get(ProfessionCategory.EXPERTISE)
+        fail['on'] = True
+        await service.get(ProfessionCategory.EXPERTISE)
+        await asyncio.sleep(0.01)
+        return first, await service.get(ProfessionCategory.EXPERTISE)
+
+    first, after = asyncio.run(run())
+    assert first == after == {'professions': []}
@@ -0,0 +1,104 @@
+import asyncio
+from src.infra.cache.dynamodb_cache_adapter import DynamoDbCacheAdapter
+from src.infra.cache.memory_cache_adapter import MemoryCacheAdapter
+from src.infra.cache.tiered_cache_adapter import TieredCacheAdapter
+from src.infra.util.time_util import current_seconds
+from testing.stand_in import DynamoDbStandIn, dynamodb_resource
+
+
+def new_cache(max_size: int = 16, max_age: int = 10):
+    client = DynamoDbStandIn()
+    l2 = DynamoDbCacheAdapter(dynamodb_resource(client), table='cache')
+    return TieredCacheAdapter(l2, MemoryCacheAdapter(max_size), max_age), client
+
+
+def test_write_through_and_l1_hits():
+    cache, client = new_cache()
+
+    async def run():
+        await cache.set('1', {'user_id': 1, 'online': True}, ex=60)
+        user = await cache.get('1')
+        user.update({'online': False})
+        return user, await cache.get('1'), await cache.get('1', True)
+
+    mutated, user, user_with_ttl = asyncio.run(run())
+    assert user == {'user_id': 1, 'online': True}
+    assert current_seconds() < user_with_ttl['ttl'] <= current_seconds() + 60
+    assert client.calls == {'put_item': 1}
+    assert cache.stats()['hits'] == 3
+
+
+def test_read_through_keeps_the_stored_ttl():
+    cache, client = new_cache()
+
+    async def run():
+        await cache.l2.set('user@example.com', {'token': 'abc'}, ex=8)
+        first = await cache.get('user@example.com', True)
+        second = await cache.get('user@example.com', True)
+        plain = await cache.get('user@example.com')
+        return first, second, plain
+
+    first, second, plain = asyncio.run(run())
+    assert first == second
+    assert 'ttl' in first and not 'ttl' in plain
+    assert client.calls == {'put_item': 1, 'get_item': 1}
+    assert cache.stats()['misses'] == 1
+
+
+def test_delete_invalidates():
+    cache, client = new_cache()
+
+    async def run():
+        await cache.set('token', 'user@example.com')
+        await cache.delete('token')
+        return await cache.get('token')
+
+    assert asyncio.run(run()) is None
+    assert client.calls['get_item'] == 1
+
+
+def test_max_age_and_lru_bound():
+    cache, client = new_cache(max_size=2, max_age=0)
+
+    async def run():
+        for key in ['a', 'b', 'c']:
+            await cache.set(key, key)
+        return await cache.get('a')
+
+    assert asyncio.run(run()) == 'a'
+    # max_age=0: every read goes to L2
+    assert client.calls['get_item'] == 1
+    assert cache.stats()['evictions'] == 2
+
+
+class SlowReadCache(MemoryCacheAdapter):
+    '''
+    reads the value, then takes `delay` secs to return it
+    '''
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    async def get(self, key: str, with_ttl: bool = False):
+        result = await super().get(key, with_ttl)
+        await asyncio.sleep(self.delay)
+        return result
+
+
+def test_read_through_racing_a_write_does_not_fill_l1():
+    cache = TieredCacheAdapter(SlowReadCache(0.02), MemoryCacheAdapter(16), max_age=10)
+
+    async def run():
+        await cache.l2.set('user', {'name': 'old'})
+        read = asyncio.ensure_future(cache.get('user'))
+        await asyncio.sleep(0.005)
+        await cache.set('user', {'name': 'new'})
+        stale = await read
+        return stale, await cache.get('user')
+
+    stale, user = asyncio.run(run())
+    assert stale == {'name': 'old'}
+    # the old value read before the write is not kept in L1
+    assert user == {'name': 'new'}
+    assert cache.stats()['hits'] == 1
@@ -0,0 +1,99 @@
+import asyncio
+from fastapi.testclient import TestClient
+from src.domain.mentor import mentor_service
+from src.router.v1 import mentor
+from src.infra.util.timing import LatencyHistogram, RequestTiming, TimingMiddleware, \
+    request_timing, latencies, record, timed
+from testing.stand_in import UpstreamStandIn, ok_body
+import main
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in [0.5] * 50 + [20] * 40 + [300] * 9 + [12000]:
+        histogram.observe(ms / 1000)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 100
+    assert (snapshot['p50_ms'], snapshot['p90_ms'], snapshot['p99_ms']) == (1, 25, 500)
+    assert snapshot['max_ms'] == 12000
+    assert snapshot['buckets'] == {'le_1': 50, 'le_25': 40, 'le_500': 9, 'inf': 1}
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_concurrent_calls_add_up_in_the_request():
+    async def request():
+        timing = RequestTiming()
+        token = request_timing.set(timing)
+        try:
+            async def call(secs: float):
+                with timed('upstream_user'):
+                    await asyncio.sleep(secs)
+
+            await asyncio.gather(call(0.02), call(0.02))
+            record('cache:l2', 0.005)
+        finally:
+            request_timing.reset(token)
+        return timing
+
+    timing = asyncio.run(request())
+    secs, calls = timing.entries['upstream_user']
+    assert calls == 2 and secs >= 0.04
+    header = timing.server_timing()
+    assert 'upstream_user;dur=' in header and 'desc="2 calls"' in header
+    # not an http token
+    assert 'cache_l2;dur=5.0;desc="1 call"' in header
+    assert header.split(', ')[-1].startswith('total;dur=')
+
+
+def timing_middleware(client: TestClient) -> (TimingMiddleware):
+    # the middleware stack is built by the first request
+    client.get('/gateway/yolo')
+    app = main.app.middleware_stack
+    while not isinstance(app, TimingMiddleware):
+        app = app.app
+    return app
+
+
+def test_server_timing_header_is_opt_in():
+    client = TestClient(main.app)
+    assert not timing_middleware(client).server_timing
+    assert not 'server-timing' in client.get('/gateway/yolo').headers
+
+
+def test_server_timing_header_and_route_histogram(monkeypatch):
+    handler = lambda method, path, query: (200, ok_body({'user_id': 1}), 0.03)
+    with UpstreamStandIn(handler) as upstream:
+        monkeypatch.setattr(mentor_service, 'MENTOR_ROUTER_URL', upstream.url)
+        monkeypatch.setattr(mentor._mentor_service, 'profile_ttl', 0)
+        client = TestClient(main.app)
+        monkeypatch.setattr(timing_middleware(client), 'server_timing', True)
+        monkeypatch.setattr(main, 'METRICS_ENDPOINT', True)
+        latencies.clear()
+
+        res = client.get('/api/v1/mentors/1/profile')
+        assert res.status_code == 200
+        metrics = dict(m.split(';', 1) for m in res.headers['server-timing'].split(', '))
+        assert metrics['upstream'].startswith('dur=') and metrics['upstream'].endswith('desc="1 call"')
+        assert float(metrics['upstream'][4:].split(';')[0]) >= 30
+        assert 'total' in metrics
+
+    snapshot = client.get('/gateway/metrics').json()['latency']
+    route = snapshot['routes']['GET /api/v1/mentors/{user_id}/profile']
+    assert route['count'] == 1 and route['p50_ms'] >= 50
+    assert snapshot['dependencies']['upstream']['count'] == 1
+
+
+def test_unmatched_routes_share_a_histogram():
+    latencies.clear()
+    client = TestClient(main.app)
+    client.get('/no/such/path')
+    client.get('/no/such/other/path')
+    assert latencies.snapshot()['routes']['unmatched']['count'] == 2
+
+
+def test_metrics_endpoint_is_off_by_default():
+    client = TestClient(main.app)
+    res = client.get('/gateway/metrics')
+    assert res.status_code == 404
+    assert not 'latency' in res.text